@@ -2,7 +2,7 @@
 // RM Volley Dashboard
 // ====================================
 
-import { debounce, throttleRAF, processInChunks, deepEqual } from './utils.js';
+import { debounce, throttleRAF, processInChunks, deepEqual, loadMatchRows } from './utils.js';
 
 // ==================== Global State ====================
 let allMatches = [];
@@ -46,13 +46,7 @@ async function loadExcelFile() {
             console.warn('Firebase not configured:', error.message);
         }
 
-        const response = await fetch('Gare.xls');
-        const arrayBuffer = await response.arrayBuffer();
-        const workbook = XLSX.read(arrayBuffer, { type: 'array' });
-        const firstSheet = workbook.Sheets[workbook.SheetNames[0]];
-        const data = XLSX.utils.sheet_to_json(firstSheet);
-
-        allMatches = data;
+        allMatches = await loadMatchRows();
         await processData();
         renderAll();
         loadStandings();
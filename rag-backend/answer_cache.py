@@ -0,0 +1,207 @@
+"""
+Answer Cache Module
+Caches generated /ask answers per retrieved context, so repeated questions
+skip the LLM until the index is rebuilt
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+# Defaults - can be overridden via ANSWER_CACHE_SIZE / ANSWER_CACHE_TTL / ANSWER_CACHE_SIMILARITY
+DEFAULT_ANSWER_CACHE_SIZE = 256
+DEFAULT_ANSWER_CACHE_TTL = 3600
+# Near-duplicate reuse is opt-in: "ha vinto" and "ha perso" questions embed very close
+DEFAULT_ANSWER_CACHE_SIMILARITY = 0
+
+
+def normalize_question(question: str) -> str:
+    """Lowercase, collapsed whitespace, no trailing punctuation"""
+    return re.sub(r"\s+", " ", question).strip().lower().rstrip("?!. ")
+
+
+def make_context_key(route: Dict[str, Any],
+                     chunk_ids: List[str],
+                     index_version: str,
+                     temperature: float) -> str:
+    """
+    Key of everything an answer depends on besides the question wording
+
+    Args:
+        route: Detected team and intent flags (route_question)
+        chunk_ids: Ids of the retrieved chunks, in context order
+        index_version: Collection the chunks come from
+        temperature: LLM temperature
+
+    Returns:
+        SHA-256 hex digest
+    """
+    payload = {
+        "route": route,
+        "chunks": chunk_ids,
+        "index": index_version,
+        "temperature": temperature,
+        # The system prompt contains today's date
+        "date": date.today().isoformat()
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class AnswerCache:
+    """
+    Bounded LRU of answers with a time-to-live
+
+    An entry is found either by exact match (same context key and normalized
+    question) or, with a similarity threshold set, by a question in the same
+    context whose embedding has cosine similarity above the threshold. Because
+    the context key includes the retrieved chunk ids and the index version, a
+    near-duplicate question can only reuse an answer written from the same
+    chunks.
+    """
+
+    def __init__(self, max_size: int = None, ttl: float = None, similarity: float = None):
+        """
+        Initialize the cache
+
+        Args:
+            max_size: Maximum number of answers kept (default: from .env or 256, 0 disables)
+            ttl: Seconds an answer stays valid (default: from .env or 3600)
+            similarity: Minimum cosine similarity for near-duplicate hits
+                        (default: from .env or 0, disabled)
+        """
+        self.max_size = int(os.getenv("ANSWER_CACHE_SIZE", DEFAULT_ANSWER_CACHE_SIZE) if max_size is None else max_size)
+        self.ttl = float(os.getenv("ANSWER_CACHE_TTL", DEFAULT_ANSWER_CACHE_TTL) if ttl is None else ttl)
+        self.similarity = float(
+            os.getenv("ANSWER_CACHE_SIMILARITY", DEFAULT_ANSWER_CACHE_SIMILARITY) if similarity is None else similarity)
+        self.hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # (context key, question) -> entry
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether answers are cached at all"""
+        return self.max_size > 0
+
+    @property
+    def semantic(self) -> bool:
+        """Whether near-duplicate lookups are enabled"""
+        return self.enabled and self.similarity > 0
+
+    def _is_fresh(self, entry: Dict[str, Any]) -> bool:
+        """Entry younger than the TTL (caller holds the lock)"""
+        return time.monotonic() - entry["created"] <= self.ttl
+
+    def get(self, context_key: str, question: str) -> Optional[Dict[str, Any]]:
+        """
+        Exact lookup
+
+        Args:
+            context_key: Result of make_context_key
+            question: User question
+
+        Returns:
+            Cached entry (answer, question) or None
+        """
+        if not self.enabled:
+            return None
+        key = (context_key, normalize_question(question))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._is_fresh(entry):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            if entry is not None:
+                del self._entries[key]
+            return None
+
+    def get_similar(self, context_key: str, embedding: List[float]) -> Optional[Dict[str, Any]]:
+        """
+        Near-duplicate lookup among the answers written from the same context
+
+        Args:
+            context_key: Result of make_context_key
+            embedding: Query embedding of the new question
+
+        Returns:
+            Most similar cached entry above the threshold, or None
+        """
+        query = np.asarray(embedding, dtype=np.float32)
+        query = query / max(float(np.linalg.norm(query)), 1e-12)
+
+        with self._lock:
+            best_key, best_score = None, self.similarity
+            for key, entry in self._entries.items():
+                if key[0] != context_key or entry["embedding"] is None or not self._is_fresh(entry):
+                    continue
+                score = float(entry["embedding"] @ query)
+                if score >= best_score:
+                    best_key, best_score = key, score
+
+            if best_key is None:
+                return None
+            self._entries.move_to_end(best_key)
+            self.similar_hits += 1
+            return self._entries[best_key]
+
+    def record_miss(self):
+        """Count a lookup that ended in a generation"""
+        with self._lock:
+            self.misses += 1
+
+    def put(self, context_key: str, question: str, answer: str, embedding: Optional[List[float]] = None):
+        """
+        Store an answer, evicting the least recently used ones
+
+        Args:
+            context_key: Result of make_context_key
+            question: User question
+            answer: Generated answer
+            embedding: Query embedding, needed for near-duplicate lookups
+        """
+        if not self.enabled:
+            return
+        if embedding is not None:
+            embedding = np.asarray(embedding, dtype=np.float32)
+            embedding = embedding / max(float(np.linalg.norm(embedding)), 1e-12)
+
+        with self._lock:
+            key = (context_key, normalize_question(question))
+            self._entries[key] = {
+                "answer": answer,
+                "question": question,
+                "embedding": embedding,
+                "created": time.monotonic()
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop every cached answer (the index was rebuilt)"""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        total = self.hits + self.similar_hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "similarity": self.similarity,
+            "hits": self.hits,
+            "similar_hits": self.similar_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.similar_hits) / total, 3) if total else 0.0
+        }
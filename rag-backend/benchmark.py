@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+RM Volley RAG Benchmarks
+Micro-benchmarks for the indexing and serving paths
+
+Usage:
+    python benchmark.py chunks [--seasons 20]
+    python benchmark.py embed [--seasons 5] [--workers 4]
+    python benchmark.py onnx [--queries 200]
+    python benchmark.py search [--queries 200] [--k 10]
+    python benchmark.py load [--url http://localhost:8000] [--asks 4] [--searches 50]
+"""
+
+import argparse
+import os
+import time
+from pathlib import Path
+
+import pandas as pd
+
+
+def load_matches(seasons: int, data_dir: str = "../") -> pd.DataFrame:
+    """
+    Build a multi-season archive by repeating Gare.xls
+
+    Args:
+        seasons: Number of copies of the current season
+        data_dir: Directory containing Gare.xls
+
+    Returns:
+        DataFrame with unique 'Gara N' values across copies
+    """
+    df = pd.read_excel(Path(data_dir) / "Gare.xls")
+    copies = []
+    for season in range(seasons):
+        copy = df.copy()
+        copy["Gara N"] = copy["Gara N"].astype(str) + f"_{season}"
+        copies.append(copy)
+    return pd.concat(copies, ignore_index=True)
+
+
+def bench_chunks(args):
+    """Per-row create_match_chunk vs vectorized build_match_chunks"""
+    from indexer import VolleyballDataIndexer
+
+    # Only the chunk builders are used: skip model loading and ChromaDB setup
+    indexer = VolleyballDataIndexer.__new__(VolleyballDataIndexer)
+    indexer.indexed_count = 0
+
+    df = load_matches(args.seasons)
+    print(f"📊 {len(df)} matches ({args.seasons} seasons)")
+
+    started = time.perf_counter()
+    per_row = [indexer.create_match_chunk(row) for _, row in df.iterrows()]
+    per_row_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    documents, metadatas, ids = indexer.build_match_chunks(df)
+    vectorized_time = time.perf_counter() - started
+
+    identical = (
+        [c["text"] for c in per_row] == documents
+        and [c["id"] for c in per_row] == ids
+        and [str(c["metadata"]) for c in per_row] == [str(m) for m in metadatas]
+    )
+
+    print(f"   iterrows + create_match_chunk: {per_row_time * 1000:8.1f} ms")
+    print(f"   build_match_chunks:            {vectorized_time * 1000:8.1f} ms "
+          f"({per_row_time / max(vectorized_time, 1e-9):.1f}x faster)")
+    print(f"   Identical output: {'✅ yes' if identical else '❌ no'}")
+
+
+def bench_embed(args):
+    """Fixed-size batches vs length-sorted adaptive batches vs worker processes"""
+    import numpy as np
+
+    # Measure the model, not the persistent cache
+    os.environ["EMBEDDING_CACHE"] = "false"
+    from indexer import VolleyballDataIndexer
+    from embeddings import get_embedding_generator
+
+    indexer = VolleyballDataIndexer.__new__(VolleyballDataIndexer)
+    indexer.indexed_count = 0
+    documents, _, _ = indexer.build_match_chunks(load_matches(args.seasons))
+    embedder = get_embedding_generator()
+    passages = [embedder.passage_prefix + doc for doc in documents]
+    print(f"🔤 {len(passages)} passages, model {embedder.model_name}")
+
+    started = time.perf_counter()
+    baseline = embedder.model.encode(passages, batch_size=32, convert_to_numpy=True)
+    baseline_time = time.perf_counter() - started
+    print(f"   model.encode(batch_size=32):       {baseline_time:7.2f} s")
+
+    started = time.perf_counter()
+    adaptive = embedder.embed(passages, workers=1)
+    adaptive_time = time.perf_counter() - started
+    print(f"   adaptive batches, 1 process:       {adaptive_time:7.2f} s")
+
+    if args.workers > 1:
+        # Start the pool outside the timing: model loading is a one-off cost
+        embedder.embed(passages[:args.workers * 2], workers=args.workers)
+        started = time.perf_counter()
+        parallel = embedder.embed(passages, workers=args.workers)
+        parallel_time = time.perf_counter() - started
+        embedder.close_pool()
+        print(f"   adaptive batches, {args.workers} processes:     {parallel_time:7.2f} s")
+        adaptive = np.vstack([adaptive, parallel])
+        baseline = np.vstack([baseline, baseline])
+
+    print(f"   Max abs difference vs baseline: {np.abs(adaptive - baseline).max():.2e}")
+
+
+BENCH_QUESTIONS = [
+    "Quando gioca la prossima partita RM VOLLEY #18?",
+    "Com'è andata l'ultima partita dell'Under 16?",
+    "Qual è la classifica della Seconda Divisione Femminile?",
+    "RMVOLLEY#14 contro Pontenure",
+    "Risultati di gennaio 2026",
+]
+
+
+def measure_backend(backend: str, queries: int, connection):
+    """Query latency, peak memory and sample embeddings of one backend (runs in a child process)"""
+    import resource
+    import numpy as np
+
+    os.environ["EMBEDDING_CACHE"] = "false"
+    from embeddings import EmbeddingGenerator, DEFAULT_EMBEDDING_MODEL
+
+    started = time.perf_counter()
+    embedder = EmbeddingGenerator(os.getenv("EMBEDDING_MODEL", DEFAULT_EMBEDDING_MODEL), backend=backend)
+    load_time = time.perf_counter() - started
+
+    embedder.embed_query(BENCH_QUESTIONS[0])  # warm-up
+    latencies = []
+    for i in range(queries):
+        started = time.perf_counter()
+        embedder.embed_query(BENCH_QUESTIONS[i % len(BENCH_QUESTIONS)] + f" ({i})")
+        latencies.append(time.perf_counter() - started)
+
+    connection.send({
+        "backend": embedder.backend,
+        "load_time": load_time,
+        "p50": float(np.percentile(latencies, 50)),
+        "p95": float(np.percentile(latencies, 95)),
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "vectors": np.array([embedder.embed_query(q) for q in BENCH_QUESTIONS])
+    })
+
+
+def bench_onnx(args):
+    """PyTorch vs int8 ONNX Runtime query embedding, each in a fresh process"""
+    import multiprocessing
+    from onnx_backend import cosine_similarity
+
+    context = multiprocessing.get_context("spawn")
+    results = {}
+    for backend in ("torch", "onnx"):
+        receiver, sender = context.Pipe(duplex=False)
+        process = context.Process(target=measure_backend, args=(backend, args.queries, sender))
+        process.start()
+        results[backend] = receiver.recv()
+        process.join()
+
+    print(f"🔤 {args.queries} queries per backend")
+    for backend, result in results.items():
+        print(f"   {backend:5s} ({result['backend']}): load {result['load_time']:5.1f} s, "
+              f"p50 {result['p50'] * 1000:6.2f} ms, p95 {result['p95'] * 1000:6.2f} ms, "
+              f"peak RSS {result['peak_rss_mb']:7.1f} MB")
+
+    similarity = cosine_similarity(results["torch"]["vectors"], results["onnx"]["vectors"])
+    print(f"   Parity: min cosine {similarity.min():.4f}, mean {similarity.mean():.4f}")
+
+
+def time_queries(search, embeddings, where) -> list:
+    """Latency of search(embedding, where) for each embedding"""
+    latencies = []
+    for embedding in embeddings:
+        started = time.perf_counter()
+        search(embedding, where)
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def bench_search(args):
+    """ChromaDB HNSW query vs in-memory NumPy exact search (float32 and float16)"""
+    import numpy as np
+    import chromadb
+    from chromadb.config import Settings
+    from embeddings import get_embedding_generator
+    from index_version import get_active_collection_name
+    from vector_index import NumpyVectorIndex
+
+    db_path = os.getenv("DB_PATH", "./volleyball_db")
+    client = chromadb.PersistentClient(path=db_path, settings=Settings(anonymized_telemetry=False))
+    collection = client.get_collection(get_active_collection_name(db_path))
+
+    embedder = get_embedding_generator()
+    embeddings = [embedder.embed_query(BENCH_QUESTIONS[i % len(BENCH_QUESTIONS)] + f" ({i})")
+                  for i in range(args.queries)]
+    print(f"🔎 {args.queries} queries, top {args.k}, collection {collection.name} ({collection.count()} documents)")
+
+    backends = {"chroma": collection}
+    for dtype in ("float32", "float16"):
+        started = time.perf_counter()
+        backends[f"numpy {dtype}"] = NumpyVectorIndex(collection, dtype=dtype)
+        print(f"   numpy {dtype} load: {(time.perf_counter() - started) * 1000:.0f} ms, "
+              f"{backends[f'numpy {dtype}'].get_stats()['matrix_mb']} MB")
+
+    exact = backends["numpy float32"]
+    for label, where in (("no filter", None), ("type=match", {"type": "match"})):
+        reference = [set(exact.query([e], args.k, where=where)["ids"][0]) for e in embeddings]
+        print(f"   {label}:")
+        for name, backend in backends.items():
+            def search(embedding, where, backend=backend):
+                return backend.query(query_embeddings=[embedding], n_results=args.k, where=where)
+
+            search(embeddings[0], where)  # warm-up
+            latencies = time_queries(search, embeddings, where)
+            recall = np.mean([len(set(search(e, where)["ids"][0]) & ref) / max(len(ref), 1)
+                              for e, ref in zip(embeddings, reference)])
+            print(f"      {name:14s} p50 {np.percentile(latencies, 50) * 1000:6.2f} ms, "
+                  f"p95 {np.percentile(latencies, 95) * 1000:6.2f} ms, recall@{args.k} {recall:.3f}")
+
+
+async def measure_searches(client, url: str, count: int) -> list:
+    """Latency of count sequential /search requests"""
+    latencies = []
+    for i in range(count):
+        started = time.perf_counter()
+        response = await client.get(f"{url}/search", params={
+            "query": BENCH_QUESTIONS[i % len(BENCH_QUESTIONS)], "n_results": 5})
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+async def run_load(args):
+    """/search latency alone, then while /ask generations are in flight"""
+    import asyncio
+    import httpx
+    import numpy as np
+
+    async def ask(client, question):
+        started = time.perf_counter()
+        response = await client.post(f"{args.url}/ask", json={"question": question})
+        return response.status_code, time.perf_counter() - started
+
+    def report(label, latencies):
+        print(f"   {label:28s} p50 {np.percentile(latencies, 50) * 1000:7.1f} ms, "
+              f"p95 {np.percentile(latencies, 95) * 1000:7.1f} ms, max {max(latencies) * 1000:7.1f} ms")
+
+    async with httpx.AsyncClient(timeout=300) as client:
+        await measure_searches(client, args.url, 3)  # warm-up
+        print(f"🌐 {args.url}: {args.searches} sequential /search, {args.asks} concurrent /ask")
+        report("/search alone", await measure_searches(client, args.url, args.searches))
+
+        asks = [asyncio.create_task(ask(client, BENCH_QUESTIONS[i % len(BENCH_QUESTIONS)] + f" ({i})"))
+                for i in range(args.asks)]
+        await asyncio.sleep(0.5)  # let the generations start
+        busy = await measure_searches(client, args.url, args.searches)
+        in_flight = sum(1 for task in asks if not task.done())
+        report(f"/search, {in_flight} /ask in flight", busy)
+
+        answers = await asyncio.gather(*asks)
+        failed = sum(1 for status, _ in answers if status != 200)
+        report("/ask", [duration for _, duration in answers])
+        if failed:
+            print(f"   ⚠️  {failed} /ask requests failed")
+
+
+def bench_load(args):
+    """Event loop responsiveness of a running server under LLM load"""
+    import asyncio
+    asyncio.run(run_load(args))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RM Volley RAG benchmarks")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    chunks = subparsers.add_parser("chunks", help="Match chunk building (per-row vs vectorized)")
+    chunks.add_argument("--seasons", type=int, default=20, help="Copies of Gare.xls to index")
+    chunks.set_defaults(run=bench_chunks)
+
+    embed = subparsers.add_parser("embed", help="Passage embedding (batching and worker processes)")
+    embed.add_argument("--seasons", type=int, default=5, help="Copies of Gare.xls to embed")
+    embed.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    embed.set_defaults(run=bench_embed)
+
+    onnx = subparsers.add_parser("onnx", help="Query embedding latency and memory (torch vs onnx int8)")
+    onnx.add_argument("--queries", type=int, default=200, help="Queries per backend")
+    onnx.set_defaults(run=bench_onnx)
+
+    search = subparsers.add_parser("search", help="Vector search latency (ChromaDB vs NumPy brute force)")
+    search.add_argument("--queries", type=int, default=200, help="Queries per backend")
+    search.add_argument("--k", type=int, default=10, help="Results per query")
+    search.set_defaults(run=bench_search)
+
+    load = subparsers.add_parser("load", help="/search latency while /ask calls are in flight (running server)")
+    load.add_argument("--url", default="http://localhost:8000", help="API server URL")
+    load.add_argument("--asks", type=int, default=4, help="Concurrent /ask requests")
+    load.add_argument("--searches", type=int, default=50, help="Sequential /search requests per phase")
+    load.set_defaults(run=bench_load)
+
+    args = parser.parse_args()
+    args.run(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+"""
+Embedding Cache Module
+Persistent on-disk cache of text embeddings shared by the indexer and the query path
+"""
+
+import os
+import mmap
+import time
+import sqlite3
+import hashlib
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, List, Optional
+
+import numpy as np
+
+# Defaults - can be overridden via EMBEDDING_CACHE_DIR / EMBEDDING_CACHE_SIZE / EMBEDDING_CACHE
+DEFAULT_CACHE_DIR = "./embedding_cache"
+DEFAULT_CACHE_SIZE = 50000
+
+
+class EmbeddingCache:
+    """
+    Size-bounded embedding cache stored on disk
+
+    Vectors live in a memory-mapped float32 matrix (one row per slot) and a
+    SQLite table holds one row per slot with the key stored there and its
+    last use. The key is the SHA-256 of (model name, normalization, text), so
+    a different model or normalization never returns a stale vector. Free
+    slots have last_used 0, so "ORDER BY last_used LIMIT n" yields the free
+    slots first, then the least recently used ones to evict.
+
+    The indexer and the API server may share the cache: a writer first
+    claims its slots under a pending key, then writes the vectors, then
+    publishes the real keys; a reader checks that a slot still holds its key
+    after copying the vector, so it never returns a vector being overwritten.
+    """
+
+    PENDING_PREFIX = "pending:"
+
+    def __init__(self,
+                 model_name: str,
+                 dimension: int,
+                 normalization: str = "none",
+                 cache_dir: str = None,
+                 max_entries: int = None):
+        """
+        Initialize (or reopen) the cache for one model
+
+        Args:
+            model_name: Embedding model name (part of the key)
+            dimension: Embedding dimension of the model
+            normalization: Normalization applied to the vectors (part of the key)
+            cache_dir: Directory holding the cache files (default: from .env or "./embedding_cache")
+            max_entries: Maximum number of cached vectors (default: from .env or 50000)
+        """
+        self.model_name = model_name
+        self.dimension = dimension
+        self.normalization = normalization
+        self.cache_dir = Path(cache_dir or os.getenv("EMBEDDING_CACHE_DIR", DEFAULT_CACHE_DIR))
+        self.max_entries = int(max_entries or os.getenv("EMBEDDING_CACHE_SIZE", DEFAULT_CACHE_SIZE))
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        # One matrix per model and dimension: different models never share slots
+        model_tag = hashlib.sha256(f"{model_name}:{dimension}".encode("utf-8")).hexdigest()[:12]
+        self.vectors_path = self.cache_dir / f"vectors_{model_tag}.f32"
+        self.index_path = self.cache_dir / f"index_{model_tag}.sqlite"
+        self.row_bytes = self.dimension * 4
+
+        self.db = sqlite3.connect(str(self.index_path), check_same_thread=False, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS slots (
+                slot INTEGER PRIMARY KEY,
+                key TEXT UNIQUE,
+                last_used REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_slots_last_used ON slots (last_used);
+        """)
+
+        with self._transaction():
+            # A capacity change (EMBEDDING_CACHE_SIZE) invalidates the matrix layout
+            expected_bytes = self.max_entries * self.row_bytes
+            slot_count = self.db.execute("SELECT COUNT(*) FROM slots").fetchone()[0]
+            file_ok = self.vectors_path.exists() and self.vectors_path.stat().st_size == expected_bytes
+            if not file_ok or slot_count != self.max_entries:
+                self.db.execute("DELETE FROM slots")
+                self.db.executemany("INSERT INTO slots (slot, key, last_used) VALUES (?, NULL, 0)",
+                                    ((slot,) for slot in range(self.max_entries)))
+                with open(self.vectors_path, "wb") as f:
+                    f.truncate(expected_bytes)
+
+        with open(self.vectors_path, "r+b") as f:
+            self._mmap = mmap.mmap(f.fileno(), expected_bytes)
+        self.vectors = np.ndarray((self.max_entries, self.dimension), dtype=np.float32, buffer=self._mmap)
+
+    @contextmanager
+    def _transaction(self):
+        """Write transaction that locks the index against other processes up front"""
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            raise
+        self.db.execute("COMMIT")
+
+    def make_key(self, text: str) -> str:
+        """Cache key of a text for this model and normalization"""
+        payload = f"{self.model_name}\0{self.normalization}\0{text}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _lookup_slots(self, keys: List[str]) -> dict:
+        """Map the cached keys among keys to their slot (caller holds the lock)"""
+        found = {}
+        # SQLite limits the number of bound parameters per statement
+        for start in range(0, len(keys), 500):
+            batch = keys[start:start + 500]
+            placeholders = ", ".join("?" for _ in batch)
+            found.update(self.db.execute(
+                f"SELECT key, slot FROM slots WHERE key IN ({placeholders})", batch).fetchall())
+        return found
+
+    def _flush_rows(self, slots: List[int]):
+        """Write the pages holding the given matrix rows to disk"""
+        # Flush offsets must be aligned to the allocation granularity (a page on Linux)
+        page = mmap.ALLOCATIONGRANULARITY
+        for slot in sorted(set(slots)):
+            start = slot * self.row_bytes
+            aligned = start - start % page
+            self._mmap.flush(aligned, start + self.row_bytes - aligned)
+
+    def get_many(self, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """
+        Look up cached vectors
+
+        Args:
+            texts: Texts to look up
+
+        Returns:
+            One vector (copy) per text, or None where the text is not cached
+        """
+        keys = [self.make_key(text) for text in texts]
+
+        with self._lock:
+            found = self._lookup_slots(keys)
+            vectors = {key: np.array(self.vectors[slot]) for key, slot in found.items()}
+            if found:
+                # Another process may have reclaimed a slot between the lookup and the read
+                current = self._lookup_slots(list(found))
+                found = {key: slot for key, slot in found.items() if current.get(key) == slot}
+            if found:
+                with self._transaction():
+                    self.db.executemany("UPDATE slots SET last_used = ? WHERE slot = ? AND key = ?",
+                                        [(time.time(), slot, key) for key, slot in found.items()])
+
+            results = [vectors[key] if key in found else None for key in keys]
+
+        hits = sum(1 for result in results if result is not None)
+        self.hits += hits
+        self.misses += len(results) - hits
+        return results
+
+    def put_many(self, texts: List[str], vectors: np.ndarray):
+        """
+        Store vectors, evicting the least recently used entries if needed
+
+        Args:
+            texts: Texts the vectors were computed from
+            vectors: Matrix of shape (len(texts), dimension)
+        """
+        # Keep the last vector for duplicated texts
+        entries = dict(zip((self.make_key(text) for text in texts), np.asarray(vectors, dtype=np.float32)))
+        if not entries:
+            return
+
+        with self._lock:
+            with self._transaction():
+                now = time.time()
+                cached = self._lookup_slots(list(entries))
+                # A batch larger than the cache only keeps its last entries
+                new_keys = [key for key in entries if key not in cached][-self.max_entries:]
+
+                # Texts already cached keep their slot (same text and model, same vector)
+                self.db.executemany("UPDATE slots SET last_used = ? WHERE slot = ?",
+                                    [(now, slot) for slot in cached.values()])
+                if not new_keys:
+                    return
+
+                # Free slots first (last_used 0), then the least recently used ones,
+                # skipping the slots of this batch's cached texts
+                candidates = self.db.execute("SELECT slot FROM slots ORDER BY last_used LIMIT ?",
+                                             (len(new_keys) + len(cached),)).fetchall()
+                in_batch = set(cached.values())
+                slots = dict(zip(new_keys, [slot for (slot,) in candidates if slot not in in_batch]))
+
+                # Claim the slots: readers of the evicted keys stop trusting them from here on
+                claim = f"{self.PENDING_PREFIX}{os.getpid()}:{threading.get_ident()}:{now}"
+                self.db.executemany("UPDATE slots SET key = ?, last_used = ? WHERE slot = ?",
+                                    [(f"{claim}:{slot}", now, slot) for slot in slots.values()])
+
+            for key, slot in slots.items():
+                self.vectors[slot] = entries[key]
+            self._flush_rows(list(slots.values()))
+
+            # Publish the keys (a crash before this leaves pending slots, evicted as LRU later)
+            with self._transaction():
+                self.db.executemany("UPDATE slots SET key = ? WHERE slot = ? AND key = ?",
+                                    [(key, slot, f"{claim}:{slot}") for key, slot in slots.items()])
+
+    def encode(self, texts: List[str], encode_fn: Callable[[List[str]], np.ndarray]) -> np.ndarray:
+        """
+        Embed texts, running encode_fn only on the ones not in the cache
+
+        Args:
+            texts: Texts to embed
+            encode_fn: Function computing embeddings for a list of texts
+
+        Returns:
+            Matrix of shape (len(texts), dimension)
+        """
+        cached = self.get_many(texts)
+        # Each distinct missing text goes through the model once
+        missing = list(dict.fromkeys(texts[i] for i, vector in enumerate(cached) if vector is None))
+
+        if missing:
+            computed = np.asarray(encode_fn(missing), dtype=np.float32)
+            self.put_many(missing, computed)
+            by_text = dict(zip(missing, computed))
+            cached = [by_text[text] if vector is None else vector for text, vector in zip(texts, cached)]
+
+        if not texts:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        return np.vstack(cached)
+
+    def get_stats(self) -> dict:
+        """Get cache statistics"""
+        with self._lock:
+            entries = self.db.execute("SELECT COUNT(*) FROM slots WHERE key IS NOT NULL AND key NOT LIKE ?",
+                                      (f"{self.PENDING_PREFIX}%",)).fetchone()[0]
+        return {
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+
+def is_cache_enabled() -> bool:
+    """Whether the persistent cache is enabled (EMBEDDING_CACHE env var, default true)"""
+    return os.getenv("EMBEDDING_CACHE", "true").lower() not in ("false", "0", "no")
@@ -1,46 +1,198 @@
 """
 Embeddings Module
-Handles text embedding generation using SentenceTransformers
+Handles text embedding generation using SentenceTransformers (or ONNX Runtime)
 """
 
 import os
-from sentence_transformers import SentenceTransformer
-from typing import List, Union
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Union, Optional
 import numpy as np
+from embedding_cache import EmbeddingCache, is_cache_enabled
 
 # Default model - can be overridden via EMBEDDING_MODEL env var
 DEFAULT_EMBEDDING_MODEL = "intfloat/multilingual-e5-small"
 
+# E5 models are trained with these prefixes on queries and indexed passages
+E5_QUERY_PREFIX = "query: "
+E5_PASSAGE_PREFIX = "passage: "
+
+# Inference backend - can be overridden via EMBEDDING_BACKEND env var
+# torch: SentenceTransformer (PyTorch); onnx: int8 quantized ONNX Runtime (CPU)
+DEFAULT_BACKEND = "torch"
+
+# Batching - can be overridden via EMBEDDING_MAX_BATCH / EMBEDDING_BATCH_CHARS / EMBEDDING_WORKERS
+DEFAULT_MAX_BATCH_SIZE = 128
+DEFAULT_BATCH_CHARS = 12000
+DEFAULT_WORKERS = 1
+
+
+def plan_batches(texts: List[str], max_batch_size: int, max_batch_chars: int) -> List[List[int]]:
+    """
+    Group texts into length-sorted batches of adaptive size
+
+    Texts are sorted longest first, so each batch holds texts of similar length
+    (little padding). A batch of short texts can hold up to max_batch_size
+    items, a batch of long ones fewer: about max_batch_chars / longest text.
+
+    Args:
+        texts: Texts to embed
+        max_batch_size: Upper bound on texts per batch
+        max_batch_chars: Character budget per batch (proxy for padded tokens)
+
+    Returns:
+        Batches as lists of indexes into texts
+    """
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]), reverse=True)
+    batches = []
+    position = 0
+    while position < len(order):
+        longest = max(len(texts[order[position]]), 1)
+        size = max(1, min(max_batch_size, max_batch_chars // longest))
+        batches.append(order[position:position + size])
+        position += size
+    return batches
+
+
+# Model held by each worker process of the multi-process pool
+_worker_model = None
+
+
+def _init_worker(model_name: str, backend: str, threads: int):
+    """
+    Load the model once in a pool worker
+
+    Args:
+        model_name: Name of the SentenceTransformer model
+        backend: Backend of the parent generator ("torch" or "onnx"), so the
+                 workers produce the same vectors it caches
+        threads: Threads per worker (the cores are split between workers
+                 instead of oversubscribing them)
+    """
+    global _worker_model
+    if backend == "onnx":
+        # The parent already exported the model: this only loads it
+        from onnx_backend import OnnxEmbeddingModel
+        _worker_model = OnnxEmbeddingModel.load(model_name, threads)
+        return
+
+    import torch
+    from sentence_transformers import SentenceTransformer
+    torch.set_num_threads(threads)
+    _worker_model = SentenceTransformer(model_name)
+
+
+def _encode_in_worker(texts: List[str]) -> np.ndarray:
+    """Encode one batch in a pool worker"""
+    return _worker_model.encode(texts, batch_size=len(texts), convert_to_numpy=True)
+
 
 class EmbeddingGenerator:
     """Generate embeddings for text using SentenceTransformers"""
 
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+    def __init__(self, model_name: str = DEFAULT_EMBEDDING_MODEL, backend: str = None):
         """
         Initialize embedding generator
 
         Args:
             model_name: Name of the SentenceTransformer model
-                       Default: all-MiniLM-L6-v2 (384 dimensions, fast)
+                       Default: intfloat/multilingual-e5-small (384 dimensions, multilingual)
                        Alternatives:
-                       - all-mpnet-base-v2 (768 dims, better quality)
+                       - all-MiniLM-L6-v2 (384 dims, fast, English-focused)
                        - paraphrase-multilingual-MiniLM-L12-v2 (384 dims, multilingual)
+            backend: "torch" or "onnx" (default: from .env EMBEDDING_BACKEND or "torch").
+                     The onnx backend exports the model on first use, quantizes it to
+                     int8 and checks parity with PyTorch; on failure it falls back to torch.
         """
         print(f"Loading embedding model: {model_name}")
-        self.model = SentenceTransformer(model_name)
+        self.backend = (backend or os.getenv("EMBEDDING_BACKEND", DEFAULT_BACKEND)).lower()
+
+        if self.backend == "onnx":
+            try:
+                from onnx_backend import OnnxEmbeddingModel
+                self.model = OnnxEmbeddingModel.load(model_name)
+            except Exception as e:
+                print(f"⚠️  ONNX backend unavailable, using PyTorch: {e}")
+                self.backend = "torch"
+
+        if self.backend != "onnx":
+            from sentence_transformers import SentenceTransformer
+            self.backend = "torch"
+            self.model = SentenceTransformer(model_name)
+
         self.dimension = self.model.get_sentence_embedding_dimension()
-        print(f"Model loaded. Embedding dimension: {self.dimension}")
+        print(f"Model loaded ({self.backend}). Embedding dimension: {self.dimension}")
+
+        # Query/passage prefixes, required by e5 models and empty for the others
+        self.model_name = model_name
+        is_e5 = "e5" in model_name.lower()
+        self.query_prefix = E5_QUERY_PREFIX if is_e5 else ""
+        self.passage_prefix = E5_PASSAGE_PREFIX if is_e5 else ""
+
+        # Adaptive batching and multi-process pool for large reindexes
+        self.max_batch_size = int(os.getenv("EMBEDDING_MAX_BATCH", DEFAULT_MAX_BATCH_SIZE))
+        self.max_batch_chars = int(os.getenv("EMBEDDING_BATCH_CHARS", DEFAULT_BATCH_CHARS))
+        self.workers = int(os.getenv("EMBEDDING_WORKERS", DEFAULT_WORKERS))
+        self._pool = None
+        self._pool_workers = 0
+
+        # Persistent cache shared with the indexer (disable with EMBEDDING_CACHE=false)
+        self.cache = None
+        if is_cache_enabled():
+            try:
+                # int8 vectors differ slightly from PyTorch ones: keep them apart
+                normalization = "onnx-int8" if self.backend == "onnx" else "none"
+                self.cache = EmbeddingCache(model_name, self.dimension, normalization=normalization)
+            except Exception as e:
+                print(f"⚠️  Embedding cache disabled: {e}")
+
+    def get_pool(self, workers: int) -> ProcessPoolExecutor:
+        """
+        Get (or start) a pool of worker processes, each holding its own copy of the model
+
+        Args:
+            workers: Number of worker processes
+
+        Returns:
+            ProcessPoolExecutor running _encode_in_worker
+        """
+        if self._pool is not None and self._pool_workers != workers:
+            self.close_pool()
+        if self._pool is None:
+            threads = max(1, (os.cpu_count() or 1) // workers)
+            print(f"🚀 Starting {workers} embedding workers ({threads} threads each)")
+            self._pool = ProcessPoolExecutor(
+                max_workers=workers,
+                # spawn: never fork a process that already initialized torch
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.model_name, self.backend, threads)
+            )
+            self._pool_workers = workers
+        return self._pool
+
+    def close_pool(self):
+        """Stop the worker processes (they are restarted on demand)"""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+            self._pool_workers = 0
 
     def embed(self, text: Union[str, List[str]],
-              batch_size: int = 32,
-              show_progress: bool = False) -> Union[np.ndarray, List[List[float]]]:
+              batch_size: Optional[int] = None,
+              show_progress: bool = False,
+              workers: int = 1) -> Union[np.ndarray, List[List[float]]]:
         """
         Generate embeddings for text
 
+        Texts are encoded in length-sorted batches of adaptive size (see
+        plan_batches), in worker processes when workers > 1.
+
         Args:
             text: Single text string or list of texts
-            batch_size: Batch size for encoding
+            batch_size: Maximum batch size (default: from .env EMBEDDING_MAX_BATCH or 128)
             show_progress: Show progress bar
+            workers: Number of worker processes (1 = encode in this process)
 
         Returns:
             Embeddings as numpy array or list of lists
@@ -48,18 +200,31 @@ class EmbeddingGenerator:
         if isinstance(text, str):
             text = [text]
 
-        embeddings = self.model.encode(
-            text,
-            batch_size=batch_size,
-            show_progress_bar=show_progress,
-            convert_to_numpy=True
-        )
+        def encode(texts: List[str]) -> np.ndarray:
+            batches = plan_batches(texts, batch_size or self.max_batch_size, self.max_batch_chars)
+            batch_texts = [[texts[i] for i in batch] for batch in batches]
 
-        return embeddings
+            if workers > 1 and len(batches) > 1:
+                results = self.get_pool(workers).map(_encode_in_worker, batch_texts)
+            else:
+                results = (self.model.encode(b, batch_size=len(b), convert_to_numpy=True) for b in batch_texts)
+
+            if show_progress:
+                from tqdm import tqdm
+                results = tqdm(results, total=len(batches), desc="Batches")
+
+            embeddings = np.empty((len(texts), self.dimension), dtype=np.float32)
+            for batch, result in zip(batches, results):
+                embeddings[batch] = result
+            return embeddings
+
+        if self.cache is not None:
+            return self.cache.encode(text, encode)
+        return encode(text)
 
     def embed_query(self, query: str) -> List[float]:
         """
-        Embed a single query string
+        Embed a single query string (with the model's query prefix)
 
         Args:
             query: Query text
@@ -67,31 +232,55 @@ class EmbeddingGenerator:
         Returns:
             Embedding as list of floats
         """
-        embedding = self.model.encode([query])[0]
+        embedding = self.embed([self.query_prefix + query])[0]
         return embedding.tolist()
 
+    def embed_passages(self, passages: List[str],
+                       batch_size: Optional[int] = None,
+                       show_progress: bool = False,
+                       workers: Optional[int] = None) -> np.ndarray:
+        """
+        Embed documents to be indexed (with the model's passage prefix)
+
+        Args:
+            passages: Document texts
+            batch_size: Maximum batch size (default: from .env or 128)
+            show_progress: Show progress bar
+            workers: Number of worker processes (default: from .env EMBEDDING_WORKERS or 1)
+
+        Returns:
+            Embeddings as numpy array
+        """
+        return self.embed([self.passage_prefix + passage for passage in passages],
+                          batch_size=batch_size, show_progress=show_progress,
+                          workers=workers or self.workers)
+
+    def get_signature(self) -> str:
+        """Identify the model, backend and prefixes producing the index vectors"""
+        # torch and int8 onnx vectors differ: switching backend re-embeds every chunk
+        return f"{self.model_name}|{self.backend}|{self.passage_prefix}"
+
     def get_dimension(self) -> int:
         """Get embedding dimension"""
         return self.dimension
 
 
-# Singleton instance
-_embedding_generator = None
+# One generator per model name, shared by the retriever, the API and the indexer
+_embedding_generators = {}
 
 
 def get_embedding_generator(model_name: str = None) -> EmbeddingGenerator:
     """
-    Get or create singleton embedding generator
+    Get or create the shared embedding generator of a model
 
     Args:
         model_name: Name of the model to use (defaults to EMBEDDING_MODEL env var)
 
     Returns:
-        EmbeddingGenerator instance
+        EmbeddingGenerator instance for that model
     """
-    global _embedding_generator
-    if _embedding_generator is None:
-        # Use provided model_name, or env var, or default
-        model = model_name or os.getenv("EMBEDDING_MODEL", DEFAULT_EMBEDDING_MODEL)
-        _embedding_generator = EmbeddingGenerator(model)
-    return _embedding_generator
+    # Use provided model_name, or env var, or default
+    model = model_name or os.getenv("EMBEDDING_MODEL", DEFAULT_EMBEDDING_MODEL)
+    if model not in _embedding_generators:
+        _embedding_generators[model] = EmbeddingGenerator(model)
+    return _embedding_generators[model]
@@ -0,0 +1,136 @@
+"""
+Index Version Module
+Blue/green versioned collections: the indexer builds rm_volley_<timestamp>,
+then flips a pointer file that the retriever reads
+"""
+
+import os
+import json
+import secrets
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Legacy (unversioned) collection name, also the prefix of versioned collections
+COLLECTION_PREFIX = "rm_volley"
+
+# Pointer to the live collection, stored inside the ChromaDB directory
+POINTER_FILE = "active_collection.json"
+
+# Versions kept after a flip (the live one plus the previous one for rollback)
+DEFAULT_KEEP_VERSIONS = 2
+
+
+def new_collection_name() -> str:
+    """
+    Name of a new versioned collection (rm_volley_<timestamp>_<random>)
+
+    Microseconds plus a random suffix keep two builds started in the same
+    second apart; names still sort chronologically.
+    """
+    return f"{COLLECTION_PREFIX}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{secrets.token_hex(2)}"
+
+
+def get_pointer_path(db_path: str) -> Path:
+    """Path of the pointer file for a ChromaDB directory"""
+    return Path(db_path) / POINTER_FILE
+
+
+def read_active_version(db_path: str) -> Optional[Dict[str, Any]]:
+    """
+    Read the pointer to the live collection
+
+    Args:
+        db_path: Path to ChromaDB persistence directory
+
+    Returns:
+        Pointer contents (collection, created, count) or None if never flipped
+    """
+    try:
+        with open(get_pointer_path(db_path), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def get_active_collection_name(db_path: str) -> str:
+    """Name of the live collection (the legacy rm_volley before the first flip)"""
+    pointer = read_active_version(db_path)
+    return pointer["collection"] if pointer else COLLECTION_PREFIX
+
+
+def write_active_version(db_path: str, collection_name: str, count: int) -> Dict[str, Any]:
+    """
+    Atomically point the retriever to a new collection
+
+    The pointer is written to a temporary file and renamed over the old one,
+    so readers see either the old or the new version, never a partial file.
+
+    Args:
+        db_path: Path to ChromaDB persistence directory
+        collection_name: Collection to make live
+        count: Number of documents in the collection
+
+    Returns:
+        The new pointer contents
+    """
+    pointer = {
+        "collection": collection_name,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "count": count
+    }
+    path = get_pointer_path(db_path)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(pointer, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return pointer
+
+
+def list_versions(client) -> List[str]:
+    """
+    List versioned collections, oldest first
+
+    Args:
+        client: ChromaDB client
+
+    Returns:
+        Collection names matching rm_volley_<timestamp>
+    """
+    # list_collections returns Collection objects in older ChromaDB releases, names in newer ones
+    names = [getattr(c, "name", c) for c in client.list_collections()]
+    return sorted(name for name in names if name.startswith(f"{COLLECTION_PREFIX}_"))
+
+
+def collect_old_versions(client, active_name: str, keep: int = None) -> List[str]:
+    """
+    Delete old versioned collections (and the legacy one) after a flip
+
+    Args:
+        client: ChromaDB client
+        active_name: Live collection, never deleted
+        keep: Number of most recent versions to keep, the live one included
+              (default: from .env KEEP_INDEX_VERSIONS or 2)
+
+    Returns:
+        Names of the deleted collections
+    """
+    keep = max(1, int(keep or os.getenv("KEEP_INDEX_VERSIONS", DEFAULT_KEEP_VERSIONS)))
+    versions = [name for name in list_versions(client) if name != active_name]
+    stale = versions[:max(0, len(versions) - (keep - 1))]
+
+    # The unversioned collection is obsolete once a versioned one is live
+    names = [getattr(c, "name", c) for c in client.list_collections()]
+    if COLLECTION_PREFIX in names and active_name != COLLECTION_PREFIX:
+        stale.append(COLLECTION_PREFIX)
+
+    deleted = []
+    for name in stale:
+        try:
+            client.delete_collection(name)
+            deleted.append(name)
+        except Exception as e:
+            print(f"⚠️  Could not delete old collection '{name}': {e}")
+    return deleted
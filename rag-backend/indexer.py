@@ -6,11 +6,13 @@ for semantic search and retrieval.
 """
 
 import pandas as pd
+import numpy as np
 import json
+import hashlib
 import os
 import sys
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 
 # Disable ChromaDB telemetry before importing
 os.environ["ANONYMIZED_TELEMETRY"] = "false"
@@ -18,15 +20,23 @@ os.environ["CHROMA_TELEMETRY"] = "false"
 
 import chromadb
 from chromadb.config import Settings
-from sentence_transformers import SentenceTransformer
 from pathlib import Path
 from dotenv import load_dotenv
+from embeddings import get_embedding_generator, EmbeddingGenerator, DEFAULT_EMBEDDING_MODEL
+from match_keys import make_team_key, make_date_int
+from lexical_index import BM25Index, build_lexical_text, get_lexical_index_path, delete_lexical_index
+from index_version import (
+    new_collection_name, get_active_collection_name, write_active_version, collect_old_versions
+)
 
 # Load environment variables
 load_dotenv()
 
-# Default embedding model
-DEFAULT_EMBEDDING_MODEL = "intfloat/multilingual-e5-small"
+# Metadata key holding each chunk's content hash
+CONTENT_HASH_KEY = "content_hash"
+
+# Query run against a new collection before it goes live
+VALIDATION_QUERY = "partite RM VOLLEY"
 
 
 class VolleyballDataIndexer:
@@ -35,7 +45,10 @@ class VolleyballDataIndexer:
     def __init__(self,
                  data_dir: str = None,
                  db_path: str = None,
-                 model_name: str = None):
+                 model_name: str = None,
+                 incremental: bool = False,
+                 embedder: EmbeddingGenerator = None,
+                 workers: int = None):
         """
         Initialize the indexer
 
@@ -43,6 +56,14 @@ class VolleyballDataIndexer:
             data_dir: Directory containing Gare.xls and classifica.json (default: from .env or "../")
             db_path: Path to ChromaDB persistence directory (default: from .env or "./volleyball_db")
             model_name: SentenceTransformer model for embeddings (default: from .env)
+            incremental: Start from the live collection and only embed new or changed
+                         chunks, deleting chunks whose source record disappeared
+            embedder: Already loaded EmbeddingGenerator (default: the shared singleton,
+                      so the API server reindexes with its warm model)
+            workers: Embedding worker processes (default: from .env EMBEDDING_WORKERS or 1)
+
+        The data is always written to a new versioned collection (rm_volley_<timestamp>);
+        the live collection is untouched until publish() validates and flips to it.
         """
         # Use provided values or fall back to env vars or defaults
         self.data_dir = Path(data_dir or os.getenv("DATA_DIR", "../"))
@@ -52,32 +73,144 @@ class VolleyballDataIndexer:
         print(f"🔧 Initializing RM Volley RAG Indexer...")
         print(f"   Data directory: {self.data_dir.absolute()}")
         print(f"   Database path: {self.db_path}")
+        print(f"   Mode: {'incremental' if incremental else 'full rebuild'}")
 
-        # Initialize embedding model
+        # Same embedding model (and persistent cache) as the query path
         print(f"📦 Loading embedding model: {model_name}")
-        self.embedder = SentenceTransformer(model_name)
-        print(f"✅ Model loaded (embedding dimension: {self.embedder.get_sentence_embedding_dimension()})")
+        self.embedder = embedder or get_embedding_generator(model_name)
+        print(f"✅ Model loaded (embedding dimension: {self.embedder.get_dimension()})")
+        self.workers = workers or self.embedder.workers
+        if self.workers > 1:
+            print(f"   Embedding workers: {self.workers}")
 
         # Initialize ChromaDB
         self.client = chromadb.PersistentClient(
-            path=db_path,
+            path=self.db_path,
             settings=Settings(anonymized_telemetry=False)
         )
 
-        # Create or get collection
-        try:
-            self.client.delete_collection("rm_volley")
-            print("🗑️  Deleted existing collection")
-        except:
-            pass
+        self.incremental = incremental
 
+        # Build into a new version while the API keeps serving the live one
+        self.collection_name = new_collection_name()
         self.collection = self.client.create_collection(
-            name="rm_volley",
+            name=self.collection_name,
             metadata={"description": "RM Volley matches, standings, and statistics"}
         )
-        print("✅ Created new collection: rm_volley")
+        print(f"✅ Created new collection: {self.collection_name}")
+
+        if incremental:
+            copied = self.copy_live_collection()
+            print(f"   Seeded from live collection ({copied} documents)")
 
         self.indexed_count = 0
+        self.produced_count = 0
+        # Sources (matches, standings) that could not be read or produced no chunks
+        self.failures: Dict[str, str] = {}
+        self.summary = {"added": 0, "updated": 0, "removed": 0, "skipped": 0}
+
+    def copy_live_collection(self) -> int:
+        """
+        Copy documents and embeddings of the live collection into the new one
+
+        Returns:
+            Number of documents copied (0 if there is no live collection)
+        """
+        try:
+            live = self.client.get_collection(get_active_collection_name(self.db_path))
+        except Exception:
+            return 0
+
+        current = live.get(include=["documents", "metadatas", "embeddings"])
+        # Copy in batches to stay below ChromaDB's maximum batch size
+        for start in range(0, len(current["ids"]), 1000):
+            end = start + 1000
+            self.collection.add(
+                ids=current["ids"][start:end],
+                documents=current["documents"][start:end],
+                metadatas=current["metadatas"][start:end],
+                embeddings=current["embeddings"][start:end]
+            )
+        return len(current["ids"])
+
+    def validate(self) -> bool:
+        """
+        Check the new collection before it goes live
+
+        Every source must have been read and produced chunks (otherwise a
+        rebuild would go live without, say, any match), the collection must
+        contain at least every chunk produced in this run and answer a test
+        query.
+
+        Returns:
+            True if the collection can be published
+        """
+        if self.failures:
+            for source, reason in self.failures.items():
+                print(f"❌ Validation failed: {source}: {reason}")
+            return False
+
+        count = self.collection.count()
+        if count == 0:
+            print("❌ Validation failed: the new collection is empty")
+            return False
+        if count < self.produced_count:
+            print(f"❌ Validation failed: {count} documents, expected at least {self.produced_count}")
+            return False
+
+        results = self.collection.query(
+            query_embeddings=[self.embedder.embed_query(VALIDATION_QUERY)],
+            n_results=1
+        )
+        if not results["ids"] or not results["ids"][0]:
+            print("❌ Validation failed: test query returned no results")
+            return False
+
+        print(f"✅ Validation passed ({count} documents)")
+        return True
+
+    def build_lexical_index(self) -> BM25Index:
+        """
+        Build and save the BM25 index of the new collection
+
+        Built from the whole collection (copied chunks included), so it always
+        matches the version it is published with.
+
+        Returns:
+            The saved BM25Index
+        """
+        contents = self.collection.get(include=["documents", "metadatas"])
+        index = BM25Index.build(
+            contents["ids"],
+            [build_lexical_text(doc, meta) for doc, meta in zip(contents["documents"], contents["metadatas"])]
+        )
+        index.save(get_lexical_index_path(self.db_path, self.collection_name))
+        print(f"🔤 Lexical index: {index.get_stats()['tokens']} tokens over {len(index.ids)} documents")
+        return index
+
+    def publish(self) -> bool:
+        """
+        Validate the new collection, make it live and delete old versions
+
+        On failure the new collection is dropped and the live one is untouched.
+
+        Returns:
+            True if the new collection is now live
+        """
+        if not self.validate():
+            self.client.delete_collection(self.collection_name)
+            print(f"🗑️  Dropped {self.collection_name}; the live collection is unchanged")
+            return False
+
+        # Saved before the flip: the retriever loads it together with the collection
+        self.build_lexical_index()
+        write_active_version(self.db_path, self.collection_name, self.collection.count())
+        print(f"🔀 Live collection is now {self.collection_name}")
+
+        for name in collect_old_versions(self.client, self.collection_name):
+            delete_lexical_index(self.db_path, name)
+            print(f"🗑️  Deleted old collection: {name}")
+        return True
 
     def create_match_chunk(self, match: pd.Series) -> Dict[str, Any]:
         """
@@ -191,10 +324,17 @@ class VolleyballDataIndexer:
             "away_team": away_team,
             "league": league,
             "status": status,
+            "has_result": bool(pd.notna(result) and result),
         }
 
+        # Filterable keys: integer yyyymmdd date and normalized RM team
+        date_int = make_date_int(date_str)
+        if date_int is not None:
+            metadata["date_int"] = date_int
+
         if rm_team:
             metadata["rm_team"] = rm_team
+            metadata["team_key"] = make_team_key(rm_team)
             metadata["opponent"] = opponent
             metadata["is_home"] = is_home
             if team_category:
@@ -203,12 +343,173 @@ class VolleyballDataIndexer:
         if pd.notna(result) and result:
             metadata["result"] = str(result)
 
+        # Kick-off time and venue, shown by the templated schedule answers
+        match_time = match.get('Ora', '')
+        if pd.notna(match_time) and match_time:
+            metadata["time"] = str(match_time)
+        if pd.notna(venue) and venue:
+            metadata["venue"] = str(venue)
+
         return {
             "id": f"match_{match.get('Gara N', self.indexed_count)}",
             "text": text,
             "metadata": metadata
         }
 
+    def build_match_chunks(self, df: pd.DataFrame) -> Tuple[List[str], List[Dict], List[str]]:
+        """
+        Column-wise version of create_match_chunk for a whole DataFrame
+
+        RM team detection, category, winner and status translation are computed
+        with vectorized pandas string operations; only the final metadata dicts
+        are assembled row by row. The output is identical to calling
+        create_match_chunk on every row.
+
+        Args:
+            df: Match records as read from Gare.xls
+
+        Returns:
+            Tuple of (documents, metadatas, ids)
+        """
+        n = len(df)
+        if n == 0:
+            return [], [], []
+
+        def column(name, default=''):
+            # Raw values, as match.get(name, default) would return them
+            if name in df.columns:
+                return df[name].reset_index(drop=True).astype(object)
+            return pd.Series([default] * n, dtype=object)
+
+        def as_text(values):
+            # str(value) for every element, as the f-strings of create_match_chunk
+            return values.map(str)
+
+        def present(values):
+            # pd.notna(value) and value
+            return values.notna() & as_text(values).ne('')
+
+        def when(mask, values, prefix=''):
+            # Text part followed by the ". " separator, or '' where mask is False
+            return pd.Series(np.where(mask, prefix + as_text(values) + ". ", ""))
+
+        home = column('SquadraCasa')
+        away = column('SquadraOspite')
+        rm_pattern = r"RM VOLLEY|RMVOLLEY"
+        is_rm_home = as_text(home).str.upper().str.contains(rm_pattern, regex=True)
+        is_rm_away = as_text(away).str.upper().str.contains(rm_pattern, regex=True) & ~is_rm_home
+        has_rm = is_rm_home | is_rm_away
+
+        rm_team = home.where(is_rm_home, away.where(is_rm_away, None))
+        opponent = away.where(is_rm_home, home.where(is_rm_away, None))
+        rm_team_str = as_text(rm_team.fillna(''))
+
+        def has(token):
+            return rm_team_str.str.contains(token, regex=False)
+
+        team_category = pd.Series(np.select(
+            [has("#18") | has(" 18"),
+             has("#16") | has(" 16"),
+             has("#14") | has(" 14") | has(" 13") | has(" 15"),
+             has("#2") | has(" 2")],
+            ["Under 18 Femminile", "Under 16 Femminile", "Under 14 Femminile", "Seconda Divisione Femminile"],
+            default=""
+        )).where(has_rm, "")
+        has_category = team_category.ne("")
+
+        date_str = column('Data', 'Data sconosciuta').map(str)
+        home_team = column('SquadraCasa', 'Sconosciuto')
+        away_team = column('SquadraOspite', 'Sconosciuto')
+        header = "Partita del " + date_str + ": " + as_text(home_team) + " vs " + as_text(away_team)
+        header = header.where(~has_category, header + " (Squadra " + team_category + ")")
+
+        # Result and winner
+        result = column('Risultato')
+        has_result = present(result)
+        sets = as_text(result).str.extract(r"^\s*(\d+)\s*-\s*(\d+)\s*$")
+        has_sets = has_result & has_rm & sets[0].notna()
+        home_sets = pd.to_numeric(sets[0], errors="coerce")
+        away_sets = pd.to_numeric(sets[1], errors="coerce")
+        rm_won = (home_sets > away_sets).where(is_rm_home, away_sets > home_sets)
+        team_desc = rm_team_str.where(~has_category, rm_team_str + " (" + team_category + ")")
+        outcome = (team_desc + pd.Series(np.where(rm_won, " ha vinto ", " ha perso "))
+                   + as_text(result) + " contro " + as_text(opponent))
+
+        parziali = column('Parziali')
+        venue = column('Impianto')
+        league = column('Campionato')
+
+        # Match status translation
+        status = column('StatoDescrizione')
+        has_status = present(status)
+        status_lower = as_text(status).str.lower()
+        status_it = pd.Series(np.select(
+            [status_lower.str.contains("gara omologata", regex=False),
+             status_lower.str.contains("risultato ufficioso", regex=False),
+             status_lower.str.contains("da disputare", regex=False)],
+            ["partita omologata", "risultato non ufficiale", "da giocare"],
+            default=as_text(status)
+        ))
+
+        text = (
+            header + ". "
+            + when(has_result, result, "Risultato finale: ")
+            + when(has_sets, outcome)
+            + when(present(parziali), parziali, "Parziali: ")
+            + when(present(venue), venue, "Impianto: ")
+            + when(present(league), league, "Campionato: ")
+            + when(has_status, status_it, "Stato: ")
+        ).str[:-2] + "."
+
+        # Filterable keys: integer yyyymmdd date and normalized RM team
+        parsed_dates = pd.to_datetime(date_str.str.strip(), format="%d/%m/%Y", errors="coerce")
+        date_int = (parsed_dates.dt.year * 10000 + parsed_dates.dt.month * 100 + parsed_dates.dt.day).astype("Int64")
+        team_key = rm_team_str.str.upper().str.replace(r"[^A-Z0-9]", "", regex=True)
+
+        match_time = column('Ora')
+        has_time = present(match_time)
+        has_venue = present(venue)
+
+        gara = column('Gara N', None)
+        ids = [f"match_{self.indexed_count if value is None else value}" for value in gara.tolist()]
+
+        metadatas = []
+        for (match_id, date, home_value, away_value, league_value, status_value, rm, opp, is_home,
+             category, result_value, result_present, day, key, time_value, time_present,
+             venue_value, venue_present) in zip(
+                column('Gara N').tolist(), date_str.tolist(), home_team.tolist(), away_team.tolist(),
+                league.tolist(), status.tolist(), rm_team.tolist(), opponent.tolist(), is_rm_home.tolist(),
+                team_category.tolist(), result.tolist(), has_result.tolist(), date_int.tolist(),
+                team_key.tolist(), match_time.tolist(), has_time.tolist(), venue.tolist(), has_venue.tolist()):
+            metadata = {
+                "type": "match",
+                "match_id": str(match_id),
+                "date": date,
+                "home_team": home_value,
+                "away_team": away_value,
+                "league": league_value,
+                "status": status_value,
+                "has_result": bool(result_present),
+            }
+            if not pd.isna(day):
+                metadata["date_int"] = int(day)
+            if rm:
+                metadata["rm_team"] = rm
+                metadata["team_key"] = key
+                metadata["opponent"] = opp
+                metadata["is_home"] = bool(is_home)
+                if category:
+                    metadata["team_category"] = category
+            if result_present:
+                metadata["result"] = str(result_value)
+            if time_present:
+                metadata["time"] = str(time_value)
+            if venue_present:
+                metadata["venue"] = str(venue_value)
+            metadatas.append(metadata)
+
+        return text.tolist(), metadatas, ids
+
     def create_league_standing_chunk(self, teams: List[Dict], league_name: str) -> Dict[str, Any]:
         """
         Convert an entire league standings into a single semantic text chunk
@@ -342,6 +643,103 @@ class VolleyballDataIndexer:
             "metadata": metadata
         }
 
+    def content_hash(self, text: str, metadata: Dict[str, Any]) -> str:
+        """
+        Hash a chunk's text and metadata
+
+        The embedding model and passage prefix are part of the hash, so changing
+        the model re-embeds every chunk even in incremental mode.
+
+        Args:
+            text: Chunk text
+            metadata: Chunk metadata (without the content hash itself)
+
+        Returns:
+            Hex SHA-256 digest
+        """
+        payload = json.dumps([self.embedder.get_signature(), text, metadata],
+                             sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def encode(self, texts: List[str]):
+        """
+        Embed documents as passages, reusing vectors from the persistent cache
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            Embeddings as numpy array
+        """
+        embeddings = self.embedder.embed_passages(texts, show_progress=True, workers=self.workers)
+        if self.embedder.cache is not None:
+            cache_stats = self.embedder.cache.get_stats()
+            print(f"   Embedding cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses")
+        return embeddings
+
+    def sync_chunks(self, documents: List[str], metadatas: List[Dict], ids: List[str], doc_type: str) -> int:
+        """
+        Write chunks of one type to the collection
+
+        In full mode every chunk is embedded and added. In incremental mode
+        only chunks whose content hash changed are embedded and upserted, and
+        chunks of the same type whose id is no longer produced are deleted.
+
+        Args:
+            documents: Chunk texts
+            metadatas: Chunk metadatas
+            ids: Chunk ids (match_<Gara N>, standing_<league>)
+            doc_type: Metadata "type" of these chunks ("match" or "standing")
+
+        Returns:
+            Number of chunks embedded and written
+        """
+        for document, metadata in zip(documents, metadatas):
+            metadata[CONTENT_HASH_KEY] = self.content_hash(document, metadata)
+
+        existing = {}
+        if self.incremental:
+            current = self.collection.get(where={"type": doc_type}, include=["metadatas"])
+            existing = {doc_id: (meta or {}).get(CONTENT_HASH_KEY)
+                        for doc_id, meta in zip(current["ids"], current["metadatas"])}
+
+        # Only new or changed chunks go through the model
+        pending = [i for i, doc_id in enumerate(ids)
+                   if existing.get(doc_id) != metadatas[i][CONTENT_HASH_KEY]]
+        added = sum(1 for i in pending if ids[i] not in existing)
+        updated = len(pending) - added
+        skipped = len(ids) - len(pending)
+        removed_ids = sorted(set(existing) - set(ids))
+        self.produced_count += len(ids)
+
+        if pending:
+            print(f"   Generating embeddings for {len(pending)} chunks...")
+            embeddings = self.encode([documents[i] for i in pending]).tolist()
+
+            print(f"   Adding to vector database...")
+            write = self.collection.upsert if self.incremental else self.collection.add
+            write(
+                documents=[documents[i] for i in pending],
+                embeddings=embeddings,
+                metadatas=[metadatas[i] for i in pending],
+                ids=[ids[i] for i in pending]
+            )
+
+        if removed_ids:
+            print(f"   Removing {len(removed_ids)} stale chunks...")
+            self.collection.delete(ids=removed_ids)
+
+        self.summary["added"] += added
+        self.summary["updated"] += updated
+        self.summary["removed"] += len(removed_ids)
+        self.summary["skipped"] += skipped
+        if self.incremental:
+            print(f"   ➕ {added} added, ✏️  {updated} updated, ➖ {len(removed_ids)} removed, "
+                  f"= {skipped} unchanged")
+
+        self.indexed_count += len(pending)
+        return len(pending)
+
     def index_matches(self, excel_path: str = "Gare.xls") -> int:
         """
         Index match data from Excel file
@@ -350,12 +748,13 @@ class VolleyballDataIndexer:
             excel_path: Path to Gare.xls file (relative to data_dir)
 
         Returns:
-            Number of matches indexed
+            Number of matches embedded and written
         """
         full_path = self.data_dir / excel_path
 
         if not full_path.exists():
             print(f"⚠️  Match file not found: {full_path}")
+            self.failures["matches"] = f"file not found: {full_path}"
             return 0
 
         print(f"\n📊 Processing matches from {excel_path}...")
@@ -364,39 +763,17 @@ class VolleyballDataIndexer:
             df = pd.read_excel(full_path)
             print(f"   Loaded {len(df)} match records")
 
-            documents = []
-            metadatas = []
-            ids = []
-
-            for idx, row in df.iterrows():
-                chunk = self.create_match_chunk(row)
-                documents.append(chunk["text"])
-                metadatas.append(chunk["metadata"])
-                ids.append(chunk["id"])
-
-            # Generate embeddings in batches
-            print(f"   Generating embeddings...")
-            embeddings = self.embedder.encode(
-                documents,
-                show_progress_bar=True,
-                batch_size=32
-            ).tolist()
-
-            # Add to ChromaDB
-            print(f"   Adding to vector database...")
-            self.collection.add(
-                documents=documents,
-                embeddings=embeddings,
-                metadatas=metadatas,
-                ids=ids
-            )
+            documents, metadatas, ids = self.build_match_chunks(df)
+            if not ids:
+                self.failures["matches"] = f"no match records in {full_path}"
 
-            self.indexed_count += len(documents)
-            print(f"✅ Indexed {len(documents)} matches")
-            return len(documents)
+            indexed = self.sync_chunks(documents, metadatas, ids, "match")
+            print(f"✅ Indexed {indexed} matches")
+            return indexed
 
         except Exception as e:
             print(f"❌ Error indexing matches: {e}")
+            self.failures["matches"] = str(e)
             return 0
 
     def index_standings(self, json_path: str = "classifica.json") -> int:
@@ -407,12 +784,13 @@ class VolleyballDataIndexer:
             json_path: Path to classifica.json (relative to data_dir)
 
         Returns:
-            Number of standings indexed
+            Number of standings embedded and written
         """
         full_path = self.data_dir / json_path
 
         if not full_path.exists():
             print(f"⚠️  Standings file not found: {full_path}")
+            self.failures["standings"] = f"file not found: {full_path}"
             return 0
 
         print(f"\n🏆 Processing standings from {json_path}...")
@@ -434,30 +812,16 @@ class VolleyballDataIndexer:
                     documents.append(chunk["text"])
                     metadatas.append(chunk["metadata"])
                     ids.append(chunk["id"])
+            if not ids:
+                self.failures["standings"] = f"no standings in {full_path}"
 
-            # Generate embeddings
-            print(f"   Generating embeddings...")
-            embeddings = self.embedder.encode(
-                documents,
-                show_progress_bar=True,
-                batch_size=32
-            ).tolist()
-
-            # Add to ChromaDB
-            print(f"   Adding to vector database...")
-            self.collection.add(
-                documents=documents,
-                embeddings=embeddings,
-                metadatas=metadatas,
-                ids=ids
-            )
-
-            self.indexed_count += len(documents)
-            print(f"✅ Indexed {len(documents)} standings")
-            return len(documents)
+            indexed = self.sync_chunks(documents, metadatas, ids, "standing")
+            print(f"✅ Indexed {indexed} standings")
+            return indexed
 
         except Exception as e:
             print(f"❌ Error indexing standings: {e}")
+            self.failures["standings"] = str(e)
             return 0
 
     def get_stats(self) -> Dict[str, Any]:
@@ -465,7 +829,8 @@ class VolleyballDataIndexer:
         return {
             "total_chunks": self.indexed_count,
             "collection_count": self.collection.count(),
-            "embedding_dimension": self.embedder.get_sentence_embedding_dimension()
+            **self.summary,
+            "embedding_dimension": self.embedder.get_dimension()
         }
 
     def test_search(self, query: str, n_results: int = 3):
@@ -479,7 +844,7 @@ class VolleyballDataIndexer:
         print(f"\n🔍 Testing search: '{query}'")
 
         # Generate query embedding
-        query_embedding = self.embedder.encode([query])[0].tolist()
+        query_embedding = self.embedder.embed_query(query)
 
         # Search
         results = self.collection.query(
@@ -493,16 +858,63 @@ class VolleyballDataIndexer:
             print(f"      Type: {metadata.get('type')}, League: {metadata.get('league', 'N/A')}")
 
 
+def reindex(incremental: bool = True,
+            data_dir: str = None,
+            db_path: str = None,
+            embedder: EmbeddingGenerator = None) -> Dict[str, Any]:
+    """
+    Build and publish a new index version in the current process
+
+    Used by the API server to reindex with its already loaded embedding model.
+
+    Args:
+        incremental: Only embed new or changed chunks (see VolleyballDataIndexer)
+        data_dir: Directory containing the data files (default: from .env or "../")
+        db_path: Path to ChromaDB persistence directory (default: from .env or "./volleyball_db")
+        embedder: Loaded EmbeddingGenerator (default: the shared singleton)
+
+    Returns:
+        Indexing statistics plus the new collection name and whether it was published
+    """
+    indexer = VolleyballDataIndexer(
+        data_dir=data_dir,
+        db_path=db_path,
+        incremental=incremental,
+        embedder=embedder
+    )
+    try:
+        indexer.index_matches(os.getenv("MATCHES_FILE", "Gare.xls"))
+        indexer.index_standings(os.getenv("STANDINGS_FILE", "classifica.json"))
+    finally:
+        # Don't keep worker processes (and their model copies) alive in the server
+        indexer.embedder.close_pool()
+
+    stats = indexer.get_stats()
+    stats["collection"] = indexer.collection_name
+    stats["published"] = indexer.publish()
+    return stats
+
+
 def main():
     """Main indexing function"""
     print("=" * 60)
     print("🏐 RM VOLLEY RAG INDEXER")
     print("=" * 60)
 
+    # --incremental starts from the live collection and only re-embeds what changed
+    incremental = "--incremental" in sys.argv
+
+    # --workers N encodes in N processes (large multi-season reindexes)
+    workers = None
+    if "--workers" in sys.argv:
+        workers = int(sys.argv[sys.argv.index("--workers") + 1])
+
     # Initialize indexer
     indexer = VolleyballDataIndexer(
         data_dir="../",
-        db_path="./volleyball_db"
+        db_path="./volleyball_db",
+        incremental=incremental,
+        workers=workers
     )
 
     # Index matches
@@ -510,6 +922,7 @@ def main():
 
     # Index standings
     standings_indexed = indexer.index_standings("classifica.json")
+    indexer.embedder.close_pool()
 
     # Print statistics
     print("\n" + "=" * 60)
@@ -519,9 +932,19 @@ def main():
     print(f"Total chunks indexed: {stats['total_chunks']}")
     print(f"Collection count: {stats['collection_count']}")
     print(f"Embedding dimension: {stats['embedding_dimension']}")
+    print(f"Added: {stats['added']}, updated: {stats['updated']}, "
+          f"removed: {stats['removed']}, unchanged: {stats['skipped']}")
+
+    # Validate and atomically switch the API to the new collection
+    print("\n" + "=" * 60)
+    print("🔀 PUBLISHING NEW INDEX VERSION")
+    print("=" * 60)
+    if not indexer.publish():
+        print("\n❌ Indexing failed: the previous index is still live")
+        sys.exit(1)
 
     # Test searches
-    if stats['total_chunks'] > 0:
+    if stats['total_chunks'] > 0 and not incremental:
         print("\n" + "=" * 60)
         print("🧪 RUNNING TEST SEARCHES")
         print("=" * 60)
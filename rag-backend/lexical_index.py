@@ -0,0 +1,207 @@
+"""
+Lexical Index Module
+BM25 inverted index over the chunks of one collection version, for exact
+team and opponent lookups that the embedding model blurs
+"""
+
+import os
+import re
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# "RM VOLLEY #16", "RMVOLLEY#16", "rm volley 16" -> one token "rmvolley16"
+TEAM_PATTERN = re.compile(r"\brm\s*volley\s*#?\s*(\d+)")
+
+# Metadata fields holding team names, indexed next to the chunk text
+TEAM_FIELDS = ("home_team", "away_team", "rm_team", "opponent", "team", "leader")
+
+# Italian function words that carry no lookup value
+STOPWORDS = {
+    "il", "lo", "la", "le", "gli", "un", "una", "uno", "di", "del", "della", "dei", "delle",
+    "da", "dal", "dalla", "in", "nel", "nella", "con", "su", "per", "tra", "fra", "che",
+    "chi", "come", "cosa", "ha", "ho", "hanno", "è", "sono", "al", "alla", "ai", "alle",
+    "ed", "quando", "quale", "qual", "quali", "mi", "ci", "si", "non", "più",
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase lookup tokens
+
+    RM team names become a single token, so "RMVOLLEY#16" in a question
+    matches "RM VOLLEY #16" in a chunk but not "RM VOLLEY #18".
+
+    Args:
+        text: Chunk text or question
+
+    Returns:
+        Tokens (stopwords and single letters removed, numbers kept)
+    """
+    text = TEAM_PATTERN.sub(lambda m: f" rmvolley{m.group(1)} ", text.lower())
+    return [
+        token for token in re.findall(r"\w+", text)
+        if token not in STOPWORDS and (len(token) > 1 or token.isdigit())
+    ]
+
+
+def build_lexical_text(document: str, metadata: Optional[Dict[str, Any]]) -> str:
+    """Text indexed for a chunk: its document plus the team names in its metadata"""
+    teams = [str(metadata[field]) for field in TEAM_FIELDS if metadata and metadata.get(field)]
+    return " ".join([document] + teams)
+
+
+def get_lexical_index_path(db_path: str, collection_name: str) -> Path:
+    """Path of the lexical index of a collection version"""
+    return Path(db_path) / f"lexical_{collection_name}.json"
+
+
+class BM25Index:
+    """
+    Okapi BM25 over tokenized chunks
+
+    Postings are stored per token as parallel arrays of document positions
+    and term frequencies; a search adds each query token's contribution to a
+    score vector and keeps the top results with argpartition.
+    """
+
+    def __init__(self, ids: List[str], lengths: List[int], postings: Dict[str, List[List[int]]]):
+        """
+        Initialize from postings
+
+        Args:
+            ids: Document ids, by position
+            lengths: Number of tokens of each document
+            postings: token -> [[document positions], [term frequencies]]
+        """
+        self.ids = ids
+        self.lengths = np.asarray(lengths, dtype=np.float32)
+        self.postings = {
+            token: (np.asarray(docs, dtype=np.int32), np.asarray(freqs, dtype=np.float32))
+            for token, (docs, freqs) in postings.items()
+        }
+
+        count = len(ids)
+        self.average_length = float(self.lengths.mean()) if count else 0.0
+        self.idf = {
+            token: float(np.log(1 + (count - len(docs) + 0.5) / (len(docs) + 0.5)))
+            for token, (docs, _) in self.postings.items()
+        }
+
+    @classmethod
+    def build(cls, ids: List[str], texts: List[str]) -> "BM25Index":
+        """
+        Build the index from raw texts
+
+        Args:
+            ids: Document ids
+            texts: Text to index for each document
+
+        Returns:
+            BM25Index instance
+        """
+        lengths = []
+        postings: Dict[str, List[List[int]]] = {}
+        for position, text in enumerate(texts):
+            tokens = tokenize(text)
+            lengths.append(len(tokens))
+            counts: Dict[str, int] = {}
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            for token, freq in counts.items():
+                docs, freqs = postings.setdefault(token, [[], []])
+                docs.append(position)
+                freqs.append(freq)
+        return cls(ids, lengths, postings)
+
+    @classmethod
+    def load(cls, path: Path) -> "BM25Index":
+        """Load an index written by save()"""
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["ids"], data["lengths"], data["postings"])
+
+    def save(self, path: Path):
+        """Atomically write the index (temporary file renamed over the old one)"""
+        data = {
+            "ids": self.ids,
+            "lengths": self.lengths.astype(int).tolist(),
+            "postings": {
+                token: [docs.tolist(), freqs.astype(int).tolist()]
+                for token, (docs, freqs) in self.postings.items()
+            }
+        }
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def search(self, query: str, n_results: int = 10) -> List[str]:
+        """
+        Rank documents by BM25 score
+
+        Args:
+            query: Question text
+            n_results: Maximum number of results
+
+        Returns:
+            Ids of the matching documents (score > 0), best first
+        """
+        scores = np.zeros(len(self.ids), dtype=np.float32)
+        for token in set(tokenize(query)):
+            if token not in self.postings:
+                continue
+            docs, freqs = self.postings[token]
+            norm = freqs + BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[docs] / self.average_length)
+            scores[docs] += self.idf[token] * freqs * (BM25_K1 + 1) / norm
+
+        matched = np.flatnonzero(scores)
+        if len(matched) > n_results:
+            matched = matched[np.argpartition(-scores[matched], n_results - 1)[:n_results]]
+        matched = matched[np.argsort(-scores[matched], kind="stable")]
+        return [self.ids[i] for i in matched]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get index statistics"""
+        return {
+            "documents": len(self.ids),
+            "tokens": len(self.postings),
+            "average_length": round(self.average_length, 1)
+        }
+
+
+def load_lexical_index(db_path: str, collection_name: str) -> Optional[BM25Index]:
+    """
+    Load the lexical index of a collection version
+
+    Args:
+        db_path: Path to ChromaDB persistence directory
+        collection_name: Collection the index was built for
+
+    Returns:
+        BM25Index, or None if the collection was indexed without one
+    """
+    path = get_lexical_index_path(db_path, collection_name)
+    if not path.exists():
+        return None
+    try:
+        return BM25Index.load(path)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"⚠️  Could not load lexical index {path}: {e}")
+        return None
+
+
+def delete_lexical_index(db_path: str, collection_name: str):
+    """Delete the lexical index of a deleted collection version"""
+    get_lexical_index_path(db_path, collection_name).unlink(missing_ok=True)
+
+
+def is_hybrid_enabled() -> bool:
+    """Whether BM25 results are fused with vector results (HYBRID_SEARCH env var, default true)"""
+    return os.getenv("HYBRID_SEARCH", "true").lower() not in ("false", "0", "no")
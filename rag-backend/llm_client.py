@@ -3,8 +3,10 @@ LLM Client Module
 Handles interaction with LLM providers (Ollama local or Groq cloud)
 """
 
+import json
 import requests
-from typing import Optional
+import httpx
+from typing import AsyncIterator, Optional
 from datetime import datetime
 import os
 from abc import ABC, abstractmethod
@@ -16,6 +18,7 @@ class BaseLLMClient(ABC):
     def __init__(self, model: str, timeout: int = 60):
         self.model = model
         self.timeout = timeout
+        self._async_client = None
 
     @abstractmethod
     def is_available(self) -> bool:
@@ -31,6 +34,36 @@ class BaseLLMClient(ABC):
         """Generate text completion"""
         pass
 
+    @abstractmethod
+    async def ais_available(self) -> bool:
+        """Check if the LLM service is available, without blocking the event loop"""
+        pass
+
+    @abstractmethod
+    def astream(self,
+                prompt: str,
+                system_prompt: Optional[str] = None,
+                temperature: float = 0.7,
+                max_tokens: int = 512) -> AsyncIterator[str]:
+        """Generate text completion, yielding text pieces as the provider emits them"""
+        pass
+
+    def get_async_client(self) -> httpx.AsyncClient:
+        """
+        Shared async HTTP client (connection pooling across requests)
+
+        Created on first use, inside the event loop that will use it.
+        """
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(timeout=self.timeout)
+        return self._async_client
+
+    async def aclose(self):
+        """Close the async HTTP client"""
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+
     def _get_today_date(self) -> str:
         """Get today's date in Italian format"""
         return datetime.now().strftime("%d/%m/%Y")
@@ -123,6 +156,19 @@ Rispondi alla domanda copiando fedelmente i dati dal contesto:"""
             max_tokens=max_tokens
         )
 
+    def astream_rag_response(self,
+                             query: str,
+                             context: str,
+                             temperature: float = 0.5,
+                             max_tokens: int = 400) -> AsyncIterator[str]:
+        """Streaming version of generate_rag_response: yields the answer piece by piece"""
+        return self.astream(
+            prompt=self._get_rag_prompt(query, context),
+            system_prompt=self._get_system_prompt(),
+            temperature=temperature,
+            max_tokens=max_tokens
+        )
+
 
 class OllamaClient(BaseLLMClient):
     """Client for Ollama LLM API (local)"""
@@ -169,16 +215,17 @@ class OllamaClient(BaseLLMClient):
         except:
             return False
 
-    def generate(self,
-                 prompt: str,
-                 system_prompt: Optional[str] = None,
-                 temperature: float = 0.7,
-                 max_tokens: int = 512) -> str:
-        """Generate text completion using Ollama"""
+    def _build_payload(self,
+                       prompt: str,
+                       system_prompt: Optional[str],
+                       temperature: float,
+                       max_tokens: int,
+                       stream: bool = False) -> dict:
+        """Request body of /api/generate"""
         payload = {
             "model": self.model,
             "prompt": prompt,
-            "stream": False,
+            "stream": stream,
             "options": {
                 "temperature": temperature,
                 "num_predict": max_tokens,
@@ -187,6 +234,15 @@ class OllamaClient(BaseLLMClient):
 
         if system_prompt:
             payload["system"] = system_prompt
+        return payload
+
+    def generate(self,
+                 prompt: str,
+                 system_prompt: Optional[str] = None,
+                 temperature: float = 0.7,
+                 max_tokens: int = 512) -> str:
+        """Generate text completion using Ollama"""
+        payload = self._build_payload(prompt, system_prompt, temperature, max_tokens)
 
         try:
             response = requests.post(
@@ -203,6 +259,42 @@ class OllamaClient(BaseLLMClient):
         except Exception as e:
             raise RuntimeError(f"Ollama generation failed: {e}")
 
+    async def ais_available(self) -> bool:
+        """Check if Ollama server is available (async)"""
+        try:
+            response = await self.get_async_client().get(f"{self.base_url}/api/tags", timeout=5)
+            return response.status_code == 200
+        except Exception:
+            return False
+
+    async def astream(self,
+                      prompt: str,
+                      system_prompt: Optional[str] = None,
+                      temperature: float = 0.7,
+                      max_tokens: int = 512) -> AsyncIterator[str]:
+        """Stream a text completion from Ollama (one JSON object per line)"""
+        payload = self._build_payload(prompt, system_prompt, temperature, max_tokens, stream=True)
+
+        try:
+            async with self.get_async_client().stream(
+                    "POST", f"{self.base_url}/api/generate", json=payload) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line:
+                        continue
+                    chunk = json.loads(line)
+                    if chunk.get("error"):
+                        raise RuntimeError(chunk["error"])
+                    if chunk.get("response"):
+                        yield chunk["response"]
+                    if chunk.get("done"):
+                        break
+
+        except httpx.TimeoutException:
+            raise TimeoutError(f"Ollama request timed out after {self.timeout}s")
+        except Exception as e:
+            raise RuntimeError(f"Ollama generation failed: {e}")
+
 
 class GroqClient(BaseLLMClient):
     """Client for Groq LLM API (cloud)"""
@@ -253,12 +345,20 @@ class GroqClient(BaseLLMClient):
         except:
             return False
 
-    def generate(self,
-                 prompt: str,
-                 system_prompt: Optional[str] = None,
-                 temperature: float = 0.7,
-                 max_tokens: int = 512) -> str:
-        """Generate text completion using Groq"""
+    def _headers(self) -> dict:
+        """Authorization headers"""
+        return {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+
+    def _build_payload(self,
+                       prompt: str,
+                       system_prompt: Optional[str],
+                       temperature: float,
+                       max_tokens: int,
+                       stream: bool = False) -> dict:
+        """Request body of /chat/completions"""
         messages = []
 
         if system_prompt:
@@ -266,23 +366,27 @@ class GroqClient(BaseLLMClient):
 
         messages.append({"role": "user", "content": prompt})
 
-        payload = {
+        return {
             "model": self.model,
             "messages": messages,
             "temperature": temperature,
             "max_tokens": max_tokens,
+            "stream": stream,
         }
 
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
+    def generate(self,
+                 prompt: str,
+                 system_prompt: Optional[str] = None,
+                 temperature: float = 0.7,
+                 max_tokens: int = 512) -> str:
+        """Generate text completion using Groq"""
+        payload = self._build_payload(prompt, system_prompt, temperature, max_tokens)
 
         try:
             response = requests.post(
                 self.GROQ_API_URL,
                 json=payload,
-                headers=headers,
+                headers=self._headers(),
                 timeout=self.timeout
             )
             response.raise_for_status()
@@ -301,6 +405,53 @@ class GroqClient(BaseLLMClient):
         except Exception as e:
             raise RuntimeError(f"Groq generation failed: {e}")
 
+    async def ais_available(self) -> bool:
+        """Check if Groq API is available (async)"""
+        try:
+            response = await self.get_async_client().get(
+                "https://api.groq.com/openai/v1/models",
+                headers={"Authorization": f"Bearer {self.api_key}"},
+                timeout=10
+            )
+            return response.status_code == 200
+        except Exception:
+            return False
+
+    async def astream(self,
+                      prompt: str,
+                      system_prompt: Optional[str] = None,
+                      temperature: float = 0.7,
+                      max_tokens: int = 512) -> AsyncIterator[str]:
+        """Stream a text completion from Groq (OpenAI-style server-sent events)"""
+        payload = self._build_payload(prompt, system_prompt, temperature, max_tokens, stream=True)
+
+        try:
+            async with self.get_async_client().stream(
+                    "POST", self.GROQ_API_URL, json=payload, headers=self._headers()) as response:
+                if response.status_code == 401:
+                    raise ValueError("Invalid Groq API key")
+                if response.status_code == 429:
+                    raise RuntimeError("Groq rate limit exceeded. Please wait and try again.")
+                if response.is_error:
+                    raise RuntimeError(f"Groq API error: {(await response.aread()).decode()}")
+
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        break
+                    delta = json.loads(data)["choices"][0].get("delta", {})
+                    if delta.get("content"):
+                        yield delta["content"]
+
+        except httpx.TimeoutException:
+            raise TimeoutError(f"Groq request timed out after {self.timeout}s")
+        except (ValueError, RuntimeError):
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Groq generation failed: {e}")
+
 
 # Singleton instance
 _llm_client = None
@@ -3,12 +3,19 @@ RM Volley RAG API Server
 FastAPI backend for volleyball statistics RAG system
 """
 
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Header
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, AsyncIterator, Tuple
 import uvicorn
 import os
+import json
+import time
+import asyncio
+import secrets
+import functools
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from dotenv import load_dotenv
 
@@ -22,6 +29,26 @@ os.environ["CHROMA_TELEMETRY"] = "false"
 from retriever import get_retriever
 from llm_client import get_llm_client
 from embeddings import get_embedding_generator
+from index_version import get_pointer_path
+from answer_cache import AnswerCache, make_context_key, normalize_question
+from single_flight import SingleFlight, SharedGeneration
+from structured_answers import StandingsFile, get_structured_intent, is_structured_enabled, render_structured_answer
+from pathlib import Path
+
+# Index location and hot reload settings
+DB_PATH = os.getenv("DB_PATH", "./volleyball_db")
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+INDEX_WATCH = os.getenv("INDEX_WATCH", "false").lower() == "true"
+INDEX_WATCH_INTERVAL = float(os.getenv("INDEX_WATCH_INTERVAL", "30"))
+REINDEX_ON_CHANGE = os.getenv("REINDEX_ON_CHANGE", "false").lower() == "true"
+DATA_DIR = os.getenv("DATA_DIR", "../")
+MATCHES_FILE = os.getenv("MATCHES_FILE", "Gare.xls")
+STANDINGS_FILE = os.getenv("STANDINGS_FILE", "classifica.json")
+DATA_FILES = [MATCHES_FILE, STANDINGS_FILE]
+
+# Concurrency limits: threads running retrieval (embedding + search), simultaneous LLM generations
+RETRIEVAL_WORKERS = int(os.getenv("RETRIEVAL_WORKERS", "4"))
+LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "2"))
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -55,6 +82,7 @@ class QueryRequest(BaseModel):
     n_results: int = Field(10, description="Number of context chunks to retrieve", ge=1, le=20)
     temperature: float = Field(0.5, description="LLM temperature", ge=0.0, le=1.0)
     filter_type: Optional[str] = Field(None, description="Filter by type: 'match' or 'standing'")
+    force_llm: bool = Field(False, description="Generate the answer with the LLM even for standings and schedule questions")
 
 
 class QueryResponse(BaseModel):
@@ -64,6 +92,9 @@ class QueryResponse(BaseModel):
     context_used: str = Field(..., description="Retrieved context")
     query: str = Field(..., description="Original query")
     timestamp: str = Field(..., description="Response timestamp")
+    cached: bool = Field(False, description="Answer served from the answer cache")
+    coalesced: bool = Field(False, description="Answer shared with an identical in-flight request")
+    structured: bool = Field(False, description="Answer rendered from a template, without the LLM")
 
 
 class HealthResponse(BaseModel):
@@ -78,12 +109,107 @@ class HealthResponse(BaseModel):
 retriever = None
 llm_client = None
 embedder = None
+reload_lock = None  # asyncio.Lock, created on startup inside the server's event loop
+reindex_lock = None
+retrieval_pool = None  # ThreadPoolExecutor for blocking retrieval calls
+llm_semaphore = None  # asyncio.Semaphore bounding concurrent LLM generations
+answer_cache = None  # AnswerCache of generated answers, cleared when the index changes
+single_flight = None  # SingleFlight sharing identical in-flight generations
+standings_file = StandingsFile(Path(DATA_DIR) / STANDINGS_FILE)  # classifica.json for templated answers
+
+
+async def run_blocking(func, *args, **kwargs):
+    """Run a blocking call (model inference, ChromaDB) in the retrieval pool and await its result"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(retrieval_pool, functools.partial(func, *args, **kwargs))
+
+
+def require_admin_token(x_admin_token: Optional[str]):
+    """
+    Reject an admin request without the configured token
+
+    Fails closed: while ADMIN_TOKEN is unset the admin endpoints answer 403.
+
+    Args:
+        x_admin_token: Value of the X-Admin-Token header
+
+    Raises:
+        HTTPException: 403 if ADMIN_TOKEN is unset or the header doesn't match
+    """
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled: set ADMIN_TOKEN")
+    if not secrets.compare_digest((x_admin_token or "").encode("utf-8"), ADMIN_TOKEN.encode("utf-8")):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+async def reload_index() -> Dict[str, Any]:
+    """Switch the retriever to the collection published by the indexer (model and LLM stay loaded)"""
+    async with reload_lock:
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(None, lambda: get_retriever(DB_PATH).reload())
+    # Answers were written from the previous version's chunks
+    if result["reloaded"]:
+        answer_cache.clear()
+    return result
+
+
+async def reindex_in_process(incremental: bool = True) -> Dict[str, Any]:
+    """
+    Rebuild the index inside the server with the already loaded embedding model,
+    then switch the retriever to the new version
+    """
+    from indexer import reindex
+
+    async with reindex_lock:
+        loop = asyncio.get_running_loop()
+        stats = await loop.run_in_executor(
+            None, lambda: reindex(incremental=incremental, data_dir=DATA_DIR, db_path=DB_PATH, embedder=embedder)
+        )
+    if stats["published"]:
+        stats["reload"] = await reload_index()
+    return stats
+
+
+def get_mtimes(paths: List[Path]) -> List[Optional[float]]:
+    """Modification times of the given files (None if missing)"""
+    return [path.stat().st_mtime if path.exists() else None for path in paths]
+
+
+async def watch_index_version():
+    """
+    Reload the index whenever the indexer publishes a new version
+
+    With REINDEX_ON_CHANGE=true a change of the data files also triggers an
+    in-process incremental reindex.
+    """
+    pointer_path = get_pointer_path(DB_PATH)
+    data_paths = [Path(DATA_DIR) / name for name in DATA_FILES]
+    last_mtime = get_mtimes([pointer_path])
+    last_data_mtimes = get_mtimes(data_paths)
+    print(f"👀 Watching {pointer_path} every {INDEX_WATCH_INTERVAL:.0f}s")
+
+    while True:
+        await asyncio.sleep(INDEX_WATCH_INTERVAL)
+        try:
+            data_mtimes = get_mtimes(data_paths)
+            if REINDEX_ON_CHANGE and data_mtimes != last_data_mtimes and not reindex_lock.locked():
+                last_data_mtimes = data_mtimes
+                print("🔄 Data files changed, reindexing...")
+                await reindex_in_process()
+
+            mtime = get_mtimes([pointer_path])
+            if mtime != last_mtime:
+                last_mtime = mtime
+                await reload_index()
+        except Exception as e:
+            print(f"⚠️  Index reload failed: {e}")
 
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize components on startup"""
-    global retriever, llm_client, embedder
+    global retriever, llm_client, embedder, reload_lock, reindex_lock, retrieval_pool, llm_semaphore, answer_cache
+    global single_flight
 
     print("=" * 60)
     print("🏐 RM VOLLEY RAG API SERVER")
@@ -92,7 +218,7 @@ async def startup_event():
     try:
         # Initialize retriever
         print("\n📊 Initializing retriever...")
-        retriever = get_retriever(db_path="./volleyball_db")
+        retriever = get_retriever(db_path=DB_PATH)
 
         # Initialize embedder
         print("\n🔤 Initializing embedder...")
@@ -102,6 +228,16 @@ async def startup_event():
         print("\n🤖 Initializing LLM client...")
         llm_client = get_llm_client()
 
+        # Optional watcher on the index version pointer
+        reload_lock = asyncio.Lock()
+        reindex_lock = asyncio.Lock()
+        retrieval_pool = ThreadPoolExecutor(max_workers=RETRIEVAL_WORKERS, thread_name_prefix="retrieval")
+        llm_semaphore = asyncio.Semaphore(LLM_CONCURRENCY)
+        answer_cache = AnswerCache()
+        single_flight = SingleFlight()
+        if INDEX_WATCH:
+            asyncio.create_task(watch_index_version())
+
         print("\n✅ All components initialized successfully!")
         print("=" * 60)
 
@@ -114,6 +250,15 @@ async def startup_event():
         raise
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release the HTTP connections and the retrieval threads"""
+    if llm_client is not None:
+        await llm_client.aclose()
+    if retrieval_pool is not None:
+        retrieval_pool.shutdown(wait=False)
+
+
 @app.get("/", response_model=Dict[str, str])
 async def root():
     """Root endpoint"""
@@ -123,8 +268,11 @@ async def root():
         "endpoints": {
             "health": "/health",
             "ask": "/ask (POST)",
+            "ask_stream": "/ask/stream (POST, Server-Sent Events)",
             "search": "/search (GET)",
-            "stats": "/stats"
+            "stats": "/stats",
+            "reload": "/admin/reload (POST)",
+            "reindex": "/admin/reindex (POST)"
         }
     }
 
@@ -132,16 +280,240 @@ async def root():
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
     """Health check endpoint"""
-    stats = retriever.get_collection_stats()
+    stats = await run_blocking(retriever.get_collection_stats)
 
     return HealthResponse(
         status="healthy",
         database_count=stats["count"],
-        ollama_available=llm_client.is_available(),
+        ollama_available=await llm_client.ais_available(),
         model=llm_client.model
     )
 
 
+def route_question(question: str) -> Dict[str, Any]:
+    """
+    Detect the team and the intent of a question
+
+    Args:
+        question: User question
+
+    Returns:
+        Dictionary with detected_team and the is_*_query flags
+    """
+    # Detect if query is about a specific team
+    import re
+    team_patterns = [
+        r"RM\s*VOLLEY\s*#?(\d+)",
+        r"RMVOLLEY\s*#?(\d+)",
+        r"RM\s*VOLLEY\s*PIACENZA"
+    ]
+
+    detected_team = None
+    for pattern in team_patterns:
+        match = re.search(pattern, question.upper())
+        if match:
+            if match.groups():
+                detected_team = f"RM VOLLEY #{match.group(1)}"
+            else:
+                detected_team = "RM VOLLEY PIACENZA"
+            break
+
+    # Detect if query is about standings/classifica
+    standings_keywords = ["classifica", "posizione", "punti", "graduatoria", "campionato"]
+    is_standings_query = any(kw in question.lower() for kw in standings_keywords)
+
+    # Detect if query is about general statistics (needs both past AND next match)
+    stats_keywords = ["statistiche", "statistica", "bilancio", "andamento", "forma", "stagione"]
+    is_stats_query = any(kw in question.lower() for kw in stats_keywords)
+
+    # Detect if query is about past matches (results)
+    past_keywords = ["recente", "giocato", "giocata", "performance", "risultat",
+                    "ultima", "ieri", "scorsa", "contro", "com'è andata", "come è andata",
+                    "vinto", "perso", "pareggio", "punteggio", "score"]
+    is_past_query = any(kw in question.lower() for kw in past_keywords)
+
+    # Detect if query is about future matches
+    future_keywords = ["prossima", "prossime", "calendario", "quando gioca",
+                     "prossimo", "futura", "future", "da giocare"]
+    is_future_query = any(kw in question.lower() for kw in future_keywords)
+
+    return {
+        "detected_team": detected_team,
+        "is_standings_query": is_standings_query,
+        "is_stats_query": is_stats_query,
+        "is_past_query": is_past_query,
+        "is_future_query": is_future_query
+    }
+
+
+def retrieve_for_question(request: QueryRequest, route: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Retrieve the context of a question according to its route (blocking: runs in the retrieval pool)
+
+    Args:
+        request: /ask request
+        route: Result of route_question
+
+    Returns:
+        Retrieved documents, metadatas, distances and ids
+    """
+    detected_team = route["detected_team"]
+    is_standings_query = route["is_standings_query"]
+    is_stats_query = route["is_stats_query"]
+    is_past_query = route["is_past_query"]
+    is_future_query = route["is_future_query"]
+
+    filter_metadata = None
+    if request.filter_type:
+        filter_metadata = {"type": request.filter_type}
+
+    # PRIORITY: If asking for standings, use standings-only retrieval
+    if is_standings_query and not is_past_query and not is_future_query and not is_stats_query:
+        return retriever.retrieve_standings(
+            query=request.question,
+            n_results=request.n_results
+        )
+    # Statistics query: get both past matches AND next match
+    elif detected_team and is_stats_query:
+        # Get past matches
+        past_results = retriever.retrieve_by_team(
+            team_name=detected_team,
+            n_results=request.n_results - 1,  # Leave room for next match
+            only_played=True,
+            only_future=False
+        )
+        # Get next match
+        future_results = retriever.retrieve_by_team(
+            team_name=detected_team,
+            n_results=1,
+            only_played=False,
+            only_future=True
+        )
+        # Combine results
+        return {
+            "documents": past_results["documents"] + future_results["documents"],
+            "metadatas": past_results["metadatas"] + future_results["metadatas"],
+            "distances": past_results["distances"] + future_results["distances"],
+            "ids": past_results["ids"] + future_results["ids"]
+        }
+    # Use team-specific retrieval if a team was detected and query is about matches
+    elif detected_team and is_past_query and not is_future_query:
+        return retriever.retrieve_by_team(
+            team_name=detected_team,
+            n_results=request.n_results,
+            only_played=True,
+            only_future=False
+        )
+    elif detected_team and is_future_query:
+        # If asking for "la prossima" (singular), return only 1 result
+        # If asking for "le prossime" (plural), return more
+        is_singular = "prossima" in request.question.lower() and "prossime" not in request.question.lower()
+        n_future = 1 if is_singular else request.n_results
+
+        return retriever.retrieve_by_team(
+            team_name=detected_team,
+            n_results=n_future,
+            only_played=False,
+            only_future=True  # Only future matches, sorted closest first
+        )
+    else:
+        return retriever.retrieve(
+            query=request.question,
+            n_results=request.n_results,
+            filter_metadata=filter_metadata
+        )
+
+
+async def prepare_answer(request: QueryRequest) -> Dict[str, Any]:
+    """
+    Route a question and retrieve its context (shared by /ask and /ask/stream)
+
+    Args:
+        request: /ask request
+
+    Returns:
+        Dictionary with route, results, context, max_tokens for the LLM,
+        the answer cache key and the templated answer (None if the LLM answers)
+    """
+    # Step 1: Detect the team and the intent of the question
+    route = route_question(request.question)
+    is_standings_query = route["is_standings_query"]
+    is_stats_query = route["is_stats_query"]
+
+    # Step 2: Retrieve relevant context (model inference and search run in the retrieval pool)
+    results = await run_blocking(retrieve_for_question, request, route)
+
+    # Step 3: Format context for LLM
+    # Use larger context for statistics queries (need all matches + next match)
+    context_max_length = 4000 if is_stats_query else 2000
+    context = retriever.format_results_for_llm(results, max_length=context_max_length)
+
+    # Use higher max_tokens for standings and statistics queries
+    if is_standings_query:
+        max_tokens = 800
+    elif is_stats_query:
+        max_tokens = 600  # Statistics need more room for complete response
+    else:
+        max_tokens = 400
+
+    cache_key = make_context_key(route, results["ids"], retriever.collection_name, request.temperature)
+
+    # Step 4: Standings and schedule questions are answered from a template, unless the LLM is forced
+    structured = None
+    intent = get_structured_intent(route, request.question)
+    if intent and not request.force_llm and is_structured_enabled():
+        structured = await run_blocking(render_structured_answer, intent, route, results, standings_file)
+
+    return {"route": route, "results": results, "context": context, "max_tokens": max_tokens,
+            "cache_key": cache_key, "structured": structured}
+
+
+async def lookup_answer(request: QueryRequest, prepared: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Answer cached for this question and context: exact match first, then a
+    near-duplicate question (query embedding similarity) over the same chunks
+    """
+    cached = answer_cache.get(prepared["cache_key"], request.question)
+    if cached is None and answer_cache.semantic:
+        prepared["embedding"] = await run_blocking(retriever.embed_query, request.question)
+        cached = answer_cache.get_similar(prepared["cache_key"], prepared["embedding"])
+    if cached is None:
+        answer_cache.record_miss()
+    return cached
+
+
+def store_answer(request: QueryRequest, prepared: Dict[str, Any], answer: str):
+    """Cache a generated answer (empty answers are not cached)"""
+    if answer:
+        answer_cache.put(prepared["cache_key"], request.question, answer, prepared.get("embedding"))
+
+
+async def generate_answer(request: QueryRequest, prepared: Dict[str, Any]) -> AsyncIterator[str]:
+    """Stream the LLM answer (at most LLM_CONCURRENCY at once), then cache it"""
+    pieces = []
+    async with llm_semaphore:
+        async for piece in llm_client.astream_rag_response(
+                query=request.question,
+                context=prepared["context"],
+                temperature=request.temperature,
+                max_tokens=prepared["max_tokens"]):
+            pieces.append(piece)
+            yield piece
+    store_answer(request, prepared, "".join(pieces))
+
+
+def join_generation(request: QueryRequest, prepared: Dict[str, Any]) -> Tuple[SharedGeneration, bool]:
+    """
+    Generation of this answer: the one already in flight for the same question
+    and context (same key as the answer cache), or a new one
+
+    Returns:
+        The shared generation and whether this request started it
+    """
+    key = (prepared["cache_key"], normalize_question(request.question))
+    return single_flight.join(key, lambda: generate_answer(request, prepared))
+
+
 @app.post("/ask", response_model=QueryResponse)
 async def ask_question(request: QueryRequest):
     """
@@ -157,138 +529,103 @@ async def ask_question(request: QueryRequest):
     ```
     """
     try:
-        # Step 1: Detect if query is about a specific team
-        import re
-        team_patterns = [
-            r"RM\s*VOLLEY\s*#?(\d+)",
-            r"RMVOLLEY\s*#?(\d+)",
-            r"RM\s*VOLLEY\s*PIACENZA"
-        ]
-
-        detected_team = None
-        for pattern in team_patterns:
-            match = re.search(pattern, request.question.upper())
-            if match:
-                if match.groups():
-                    detected_team = f"RM VOLLEY #{match.group(1)}"
-                else:
-                    detected_team = "RM VOLLEY PIACENZA"
-                break
-
-        # Step 2: Retrieve relevant context
-        filter_metadata = None
-        if request.filter_type:
-            filter_metadata = {"type": request.filter_type}
-
-        # Detect if query is about standings/classifica
-        standings_keywords = ["classifica", "posizione", "punti", "graduatoria", "campionato"]
-        is_standings_query = any(kw in request.question.lower() for kw in standings_keywords)
-
-        # Detect if query is about general statistics (needs both past AND next match)
-        stats_keywords = ["statistiche", "statistica", "bilancio", "andamento", "forma", "stagione"]
-        is_stats_query = any(kw in request.question.lower() for kw in stats_keywords)
-
-        # Detect if query is about past matches (results)
-        past_keywords = ["recente", "giocato", "giocata", "performance", "risultat",
-                        "ultima", "ieri", "scorsa", "contro", "com'è andata", "come è andata",
-                        "vinto", "perso", "pareggio", "punteggio", "score"]
-        is_past_query = any(kw in request.question.lower() for kw in past_keywords)
-
-        # Detect if query is about future matches
-        future_keywords = ["prossima", "prossime", "calendario", "quando gioca",
-                         "prossimo", "futura", "future", "da giocare"]
-        is_future_query = any(kw in request.question.lower() for kw in future_keywords)
-
-        # PRIORITY: If asking for standings, use standings-only retrieval
-        if is_standings_query and not is_past_query and not is_future_query and not is_stats_query:
-            results = retriever.retrieve_standings(
-                query=request.question,
-                n_results=request.n_results
-            )
-        # Statistics query: get both past matches AND next match
-        elif detected_team and is_stats_query:
-            # Get past matches
-            past_results = retriever.retrieve_by_team(
-                team_name=detected_team,
-                n_results=request.n_results - 1,  # Leave room for next match
-                only_played=True,
-                only_future=False
-            )
-            # Get next match
-            future_results = retriever.retrieve_by_team(
-                team_name=detected_team,
-                n_results=1,
-                only_played=False,
-                only_future=True
-            )
-            # Combine results
-            results = {
-                "documents": past_results["documents"] + future_results["documents"],
-                "metadatas": past_results["metadatas"] + future_results["metadatas"],
-                "distances": past_results["distances"] + future_results["distances"],
-                "ids": past_results["ids"] + future_results["ids"]
-            }
-        # Use team-specific retrieval if a team was detected and query is about matches
-        elif detected_team and is_past_query and not is_future_query:
-            results = retriever.retrieve_by_team(
-                team_name=detected_team,
-                n_results=request.n_results,
-                only_played=True,
-                only_future=False
-            )
-        elif detected_team and is_future_query:
-            # If asking for "la prossima" (singular), return only 1 result
-            # If asking for "le prossime" (plural), return more
-            is_singular = "prossima" in request.question.lower() and "prossime" not in request.question.lower()
-            n_future = 1 if is_singular else request.n_results
-
-            results = retriever.retrieve_by_team(
-                team_name=detected_team,
-                n_results=n_future,
-                only_played=False,
-                only_future=True  # Only future matches, sorted closest first
-            )
-        else:
-            results = retriever.retrieve(
-                query=request.question,
-                n_results=request.n_results,
-                filter_metadata=filter_metadata
-            )
-
-        # Step 2: Format context for LLM
-        # Use larger context for statistics queries (need all matches + next match)
-        context_max_length = 4000 if is_stats_query else 2000
-        context = retriever.format_results_for_llm(results, max_length=context_max_length)
-
-        # Step 3: Generate answer
-        # Use higher max_tokens for standings and statistics queries
-        if is_standings_query:
-            max_tokens = 800
-        elif is_stats_query:
-            max_tokens = 600  # Statistics need more room for complete response
-        else:
-            max_tokens = 400
-
-        answer = llm_client.generate_rag_response(
-            query=request.question,
-            context=context,
-            temperature=request.temperature,
-            max_tokens=max_tokens
-        )
+        prepared = await prepare_answer(request)
+        answer = prepared["structured"]
+        cached = None if answer is not None else await lookup_answer(request, prepared)
+
+        started_generation = True
+        if cached is not None:
+            answer = cached["answer"]
+        elif answer is None:
+            # Identical questions arriving meanwhile wait for this same generation
+            generation, started_generation = join_generation(request, prepared)
+            answer = await generation.result()
 
-        # Step 4: Return response
         return QueryResponse(
             answer=answer,
-            sources=results["metadatas"],
-            context_used=context,
+            sources=prepared["results"]["metadatas"],
+            context_used=prepared["context"],
             query=request.question,
-            timestamp=datetime.now().isoformat()
+            timestamp=datetime.now().isoformat(),
+            cached=cached is not None,
+            coalesced=not started_generation,
+            structured=prepared["structured"] is not None
         )
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"RAG query failed: {str(e)}")
 
 
+def sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@app.post("/ask/stream")
+async def ask_question_stream(request: QueryRequest):
+    """
+    Streaming RAG endpoint (Server-Sent Events), same request body as /ask
+
+    Events, in order:
+    - sources: {"sources": [...], "context_used": ..., "query": ...} as soon as retrieval is done
+    - token: {"text": ...} for each piece of the answer, as the LLM emits it
+    - done: {"answer": ..., "ttft_ms": ..., "total_ms": ..., "cached": ..., "coalesced": ...,
+             "structured": ..., "timestamp": ...}
+    - error: {"detail": ...} instead of done if anything fails
+
+    Identical questions asked while an answer is being generated share its
+    stream: a late subscriber first receives the tokens already produced.
+    """
+    started = time.perf_counter()
+
+    async def events():
+        try:
+            prepared = await prepare_answer(request)
+            yield sse_event("sources", {
+                "sources": prepared["results"]["metadatas"],
+                "context_used": prepared["context"],
+                "query": request.question
+            })
+
+            pieces = []
+            ttft = None
+            started_generation = True
+            structured = prepared["structured"]
+            cached = None if structured is not None else await lookup_answer(request, prepared)
+            if structured is not None or cached is not None:
+                # The whole templated or cached answer is a single token event
+                answer = structured if structured is not None else cached["answer"]
+                ttft = time.perf_counter() - started
+                pieces.append(answer)
+                yield sse_event("token", {"text": answer})
+            else:
+                generation, started_generation = join_generation(request, prepared)
+                async for piece in generation.subscribe():
+                    if ttft is None:
+                        ttft = time.perf_counter() - started
+                    pieces.append(piece)
+                    yield sse_event("token", {"text": piece})
+
+            yield sse_event("done", {
+                "answer": "".join(pieces),
+                "ttft_ms": round(ttft * 1000, 1) if ttft is not None else None,
+                "total_ms": round((time.perf_counter() - started) * 1000, 1),
+                "cached": cached is not None,
+                "coalesced": not started_generation,
+                "structured": structured is not None,
+                "timestamp": datetime.now().isoformat()
+            })
+
+        except Exception as e:
+            yield sse_event("error", {"detail": f"RAG query failed: {str(e)}"})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @app.get("/search")
 async def search_documents(
     query: str = Query(..., description="Search query"),
@@ -305,7 +642,8 @@ async def search_documents(
         if filter_type:
             filter_metadata = {"type": filter_type}
 
-        results = retriever.retrieve(
+        results = await run_blocking(
+            retriever.retrieve,
             query=query,
             n_results=n_results,
             filter_metadata=filter_metadata
@@ -338,22 +676,29 @@ async def search_documents(
 async def get_statistics():
     """Get database and system statistics"""
     try:
-        collection_stats = retriever.get_collection_stats()
+        collection_stats = await run_blocking(retriever.get_collection_stats)
 
         return {
             "database": {
                 "name": collection_stats["name"],
                 "document_count": collection_stats["count"],
-                "embedding_dimension": collection_stats["embedding_dimension"]
+                "embedding_dimension": collection_stats["embedding_dimension"],
+                "published": collection_stats["published"],
+                "vector_index": collection_stats["vector_index"],
+                "lexical_index": collection_stats["lexical_index"]
             },
             "llm": {
                 "model": llm_client.model,
                 "base_url": llm_client.base_url,
-                "available": llm_client.is_available()
+                "available": await llm_client.ais_available()
             },
             "embedder": {
-                "dimension": embedder.get_dimension()
-            }
+                "dimension": embedder.get_dimension(),
+                "query_cache": collection_stats["query_cache"],
+                "persistent_cache": embedder.cache.get_stats() if embedder.cache else None
+            },
+            "answer_cache": answer_cache.get_stats(),
+            "single_flight": single_flight.get_stats()
         }
 
     except Exception as e:
@@ -367,7 +712,7 @@ async def search_matches(
 ):
     """Search only match documents"""
     try:
-        results = retriever.retrieve_matches(query, n_results)
+        results = await run_blocking(retriever.retrieve_matches, query, n_results)
 
         return {
             "query": query,
@@ -397,7 +742,7 @@ async def search_standings(
 ):
     """Search only standings documents"""
     try:
-        results = retriever.retrieve_standings(query, n_results)
+        results = await run_blocking(retriever.retrieve_standings, query, n_results)
 
         return {
             "query": query,
@@ -420,6 +765,46 @@ async def search_standings(
         raise HTTPException(status_code=500, detail=f"Standings search failed: {str(e)}")
 
 
+@app.post("/admin/reload")
+async def admin_reload(x_admin_token: Optional[str] = Header(None)):
+    """
+    Switch to the latest index version without restarting the server
+
+    Requires the X-Admin-Token header (disabled while ADMIN_TOKEN is unset).
+    """
+    require_admin_token(x_admin_token)
+
+    try:
+        return await reload_index()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Reload failed: {str(e)}")
+
+
+@app.post("/admin/reindex")
+async def admin_reindex(
+    full: bool = Query(False, description="Rebuild every chunk instead of only the changed ones"),
+    x_admin_token: Optional[str] = Header(None)
+):
+    """
+    Reindex the data files in-process, reusing the loaded embedding model,
+    and switch to the new index version
+
+    Requires the X-Admin-Token header (disabled while ADMIN_TOKEN is unset).
+    """
+    require_admin_token(x_admin_token)
+    if reindex_lock.locked():
+        raise HTTPException(status_code=409, detail="Reindex already running")
+
+    try:
+        stats = await reindex_in_process(incremental=not full)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Reindex failed: {str(e)}")
+
+    if not stats["published"]:
+        raise HTTPException(status_code=500, detail="Reindex failed validation: the previous index is still live")
+    return stats
+
+
 @app.get("/team/{team_name}")
 async def get_team_info(
     team_name: str,
@@ -427,7 +812,7 @@ async def get_team_info(
 ):
     """Get information about a specific team"""
     try:
-        results = retriever.retrieve_by_team(team_name, n_results)
+        results = await run_blocking(retriever.retrieve_by_team, team_name, n_results)
 
         return {
             "team": team_name,
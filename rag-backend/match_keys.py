@@ -0,0 +1,44 @@
+"""
+Match Keys Module
+Normalized team and date keys stored as filterable match metadata
+"""
+
+import re
+from datetime import datetime
+from typing import Optional
+
+
+def make_team_key(team_name: str) -> str:
+    """
+    Normalize a team name for exact metadata filters
+
+    "RM VOLLEY #18", "RMVOLLEY#18" and "rm volley 18" all become "RMVOLLEY18".
+
+    Args:
+        team_name: Team name as written in Gare.xls or in a question
+
+    Returns:
+        Uppercase alphanumeric key
+    """
+    return re.sub(r"[^A-Z0-9]", "", str(team_name).upper())
+
+
+def make_date_int(date_str: str) -> Optional[int]:
+    """
+    Convert a dd/mm/yyyy date to an integer yyyymmdd (sortable, range-filterable)
+
+    Args:
+        date_str: Date as written in Gare.xls
+
+    Returns:
+        Integer date, or None if the date can't be parsed
+    """
+    try:
+        return int(datetime.strptime(str(date_str).strip(), "%d/%m/%Y").strftime("%Y%m%d"))
+    except ValueError:
+        return None
+
+
+def today_int() -> int:
+    """Today's date as an integer yyyymmdd"""
+    return int(datetime.now().strftime("%Y%m%d"))
@@ -0,0 +1,197 @@
+"""
+ONNX Backend Module
+Runs a SentenceTransformer model with ONNX Runtime and dynamic int8 quantization (CPU only)
+"""
+
+import os
+import json
+from pathlib import Path
+from typing import List
+
+import numpy as np
+
+# Exported models - can be overridden via ONNX_MODEL_DIR env var
+DEFAULT_ONNX_DIR = "./onnx_models"
+
+# Minimum cosine similarity with the PyTorch embeddings accepted at export time
+PARITY_THRESHOLD = 0.99
+
+# Sentences used for the parity check (Italian, like the indexed data)
+PARITY_SENTENCES = [
+    "query: Quando gioca la prossima partita RM VOLLEY #18?",
+    "passage: Partita del 11/10/2025: CASTELLANA VOLLEY GIALLA vs RMVOLLEY#14. Risultato finale: 3-1.",
+    "query: classifica Under 16 Femminile",
+    "passage: 1. RMVOLLEY#18 - 30 punti (10 vittorie, 0 sconfitte, set 30-2)",
+]
+
+
+def get_export_dir(model_name: str) -> Path:
+    """Directory holding the exported and quantized model"""
+    base_dir = Path(os.getenv("ONNX_MODEL_DIR", DEFAULT_ONNX_DIR))
+    return base_dir / model_name.replace("/", "__")
+
+
+def export_model(model_name: str, export_dir: Path):
+    """
+    Export a SentenceTransformer model to ONNX and quantize it to int8
+
+    Writes model.onnx (fp32), model.int8.onnx (dynamic int8 weights), the
+    tokenizer files and pipeline.json (pooling, normalization, max length).
+
+    Args:
+        model_name: SentenceTransformer model name
+        export_dir: Output directory
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+    from sentence_transformers.models import Pooling, Normalize
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+
+    print(f"📦 Exporting {model_name} to ONNX...")
+    st_model = SentenceTransformer(model_name, device="cpu")
+    transformer = st_model[0]
+    pooling = next((m for m in st_model if isinstance(m, Pooling)), None)
+
+    export_dir.mkdir(parents=True, exist_ok=True)
+    transformer.tokenizer.save_pretrained(str(export_dir))
+
+    sample = transformer.tokenizer(["export sample"], padding=True, return_tensors="pt")
+    input_names = list(sample.keys())
+    fp32_path = export_dir / "model.onnx"
+    int8_path = export_dir / "model.int8.onnx"
+
+    with torch.no_grad():
+        torch.onnx.export(
+            transformer.auto_model,
+            tuple(sample[name] for name in input_names),
+            str(fp32_path),
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes={name: {0: "batch", 1: "sequence"} for name in input_names + ["last_hidden_state"]},
+            opset_version=14
+        )
+
+    quantize_dynamic(str(fp32_path), str(int8_path), weight_type=QuantType.QInt8)
+
+    pipeline = {
+        "model_name": model_name,
+        "input_names": input_names,
+        "pooling": "cls" if pooling is not None and pooling.pooling_mode_cls_token else "mean",
+        "normalize": any(isinstance(m, Normalize) for m in st_model),
+        "max_seq_length": st_model.max_seq_length,
+        "dimension": st_model.get_sentence_embedding_dimension()
+    }
+    with open(export_dir / "pipeline.json", "w", encoding="utf-8") as f:
+        json.dump(pipeline, f, indent=2)
+
+    # Parity check against the PyTorch pipeline before the export is used
+    reference = st_model.encode(PARITY_SENTENCES, convert_to_numpy=True)
+    quantized = OnnxEmbeddingModel(export_dir).encode(PARITY_SENTENCES)
+    similarity = cosine_similarity(reference, quantized)
+    print(f"   Parity vs PyTorch: min cosine {similarity.min():.4f}")
+    if similarity.min() < PARITY_THRESHOLD:
+        int8_path.unlink()
+        raise RuntimeError(f"int8 model diverges from PyTorch (min cosine {similarity.min():.4f})")
+
+    fp32_path.unlink()
+    print(f"✅ Quantized model saved to {int8_path}")
+
+
+def cosine_similarity(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Row-wise cosine similarity of two embedding matrices"""
+    a = a / np.linalg.norm(a, axis=1, keepdims=True)
+    b = b / np.linalg.norm(b, axis=1, keepdims=True)
+    return (a * b).sum(axis=1)
+
+
+class OnnxEmbeddingModel:
+    """
+    Int8 ONNX Runtime version of a SentenceTransformer model
+
+    Exposes the subset of the SentenceTransformer API used by EmbeddingGenerator
+    (encode, get_sentence_embedding_dimension). Loading it does not import torch.
+    """
+
+    def __init__(self, export_dir: Path, threads: int = 0):
+        """
+        Load an exported model
+
+        Args:
+            export_dir: Directory written by export_model
+            threads: Intra-op threads of the session (0 = ONNX Runtime default)
+        """
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        with open(export_dir / "pipeline.json", "r", encoding="utf-8") as f:
+            self.pipeline = json.load(f)
+
+        self.tokenizer = AutoTokenizer.from_pretrained(str(export_dir))
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(
+            str(export_dir / "model.int8.onnx"),
+            sess_options=options,
+            providers=["CPUExecutionProvider"]
+        )
+
+    @classmethod
+    def load(cls, model_name: str, threads: int = 0) -> "OnnxEmbeddingModel":
+        """
+        Load the int8 model, exporting and quantizing it on first use
+
+        Args:
+            model_name: SentenceTransformer model name
+            threads: Intra-op threads of the session (0 = ONNX Runtime default)
+
+        Returns:
+            OnnxEmbeddingModel instance
+        """
+        export_dir = get_export_dir(model_name)
+        if not (export_dir / "model.int8.onnx").exists():
+            export_model(model_name, export_dir)
+        return cls(export_dir, threads)
+
+    def get_sentence_embedding_dimension(self) -> int:
+        """Get embedding dimension"""
+        return self.pipeline["dimension"]
+
+    def encode(self, sentences: List[str], batch_size: int = 32, convert_to_numpy: bool = True,
+               **kwargs) -> np.ndarray:
+        """
+        Embed sentences like SentenceTransformer.encode
+
+        Args:
+            sentences: Texts to embed
+            batch_size: Batch size for inference
+
+        Returns:
+            Embeddings as numpy array
+        """
+        outputs = []
+        for start in range(0, len(sentences), batch_size):
+            batch = sentences[start:start + batch_size]
+            encoded = self.tokenizer(
+                batch,
+                padding=True,
+                truncation=True,
+                max_length=self.pipeline["max_seq_length"],
+                return_tensors="np"
+            )
+            feeds = {name: encoded[name].astype(np.int64) for name in self.pipeline["input_names"]}
+            hidden = self.session.run(["last_hidden_state"], feeds)[0]
+
+            if self.pipeline["pooling"] == "cls":
+                pooled = hidden[:, 0]
+            else:
+                mask = encoded["attention_mask"][..., None].astype(np.float32)
+                pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+
+            if self.pipeline["normalize"]:
+                pooled = pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+            outputs.append(pooled.astype(np.float32))
+
+        if not outputs:
+            return np.zeros((0, self.get_sentence_embedding_dimension()), dtype=np.float32)
+        return np.vstack(outputs)
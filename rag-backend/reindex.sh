@@ -15,11 +15,48 @@ else
     exit 1
 fi
 
-# Run indexer
-python indexer.py
+# Skip re-indexing when the data files and the indexer are unchanged since the last run
+# (same DB_PATH/DATA_DIR as the indexer: environment, then .env, then defaults)
+DB_PATH="${DB_PATH:-$(grep -s '^DB_PATH=' .env | cut -d= -f2-)}"
+DB_PATH="${DB_PATH:-./volleyball_db}"
+DATA_DIR="${DATA_DIR:-$(grep -s '^DATA_DIR=' .env | cut -d= -f2-)}"
+DATA_DIR="${DATA_DIR:-../}"
+INPUTS_MARKER="$DB_PATH/.indexed_inputs.sha256"
+INPUTS=("$DATA_DIR/Gare.xls" "$DATA_DIR/classifica.json" indexer.py match_keys.py lexical_index.py)
+if command -v sha256sum >/dev/null 2>&1; then
+    INPUTS_HASH=$(cat "${INPUTS[@]}" 2>/dev/null | sha256sum | cut -d' ' -f1)
+else
+    INPUTS_HASH=$(cat "${INPUTS[@]}" 2>/dev/null | shasum -a 256 | cut -d' ' -f1)
+fi
+
+if [ "$1" != "--force" ] && [ -f "$INPUTS_MARKER" ] && [ "$(cat "$INPUTS_MARKER")" == "$INPUTS_HASH" ]; then
+    echo "ℹ️  Gare.xls, classifica.json and the indexer unchanged since the last indexing, nothing to do"
+    echo "   Use ./reindex.sh --force to rebuild anyway (e.g. after changing EMBEDDING_MODEL)"
+    exit 0
+fi
+
+# Run indexer: incremental by default (only new or changed chunks are embedded),
+# full rebuild with --force
+if [ "$1" == "--force" ]; then
+    python indexer.py || exit 1
+else
+    python indexer.py --incremental || exit 1
+fi
+mkdir -p "$DB_PATH" && echo "$INPUTS_HASH" > "$INPUTS_MARKER"
 
 echo ""
 echo "✅ Re-indexing complete!"
 echo ""
-echo "Restart the server to use the new index:"
-echo "  ./start.sh"
+
+# Tell a running server to switch to the new index (no restart needed)
+API_URL="http://localhost:${API_PORT:-8000}"
+ADMIN_TOKEN="${ADMIN_TOKEN:-$(grep -s '^ADMIN_TOKEN=' .env | cut -d= -f2-)}"
+if [ -z "$ADMIN_TOKEN" ]; then
+    echo "ADMIN_TOKEN not set: restart a running server to use the new index"
+    echo "  ./start.sh"
+elif curl -sf -X POST "$API_URL/admin/reload" -H "X-Admin-Token: $ADMIN_TOKEN" >/dev/null 2>&1; then
+    echo "🔀 Running server switched to the new index"
+else
+    echo "Server not reachable at $API_URL: it will use the new index when started"
+    echo "  ./start.sh"
+fi
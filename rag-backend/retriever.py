@@ -4,30 +4,116 @@ Handles vector similarity search using ChromaDB
 """
 
 import os
+import re
+import time
+import threading
+from collections import OrderedDict
 
 # Disable ChromaDB telemetry before importing
 os.environ["ANONYMIZED_TELEMETRY"] = "false"
 os.environ["CHROMA_TELEMETRY"] = "false"
 
 import chromadb
+import numpy as np
 from chromadb.config import Settings
 from typing import List, Dict, Any, Optional
 from embeddings import get_embedding_generator
+from index_version import get_active_collection_name, read_active_version
+from match_keys import make_team_key, today_int
+from vector_index import NumpyVectorIndex, get_vector_backend
+from lexical_index import load_lexical_index, is_hybrid_enabled
+
+
+# Query embedding cache - can be overridden via QUERY_CACHE_SIZE / QUERY_CACHE_TTL (seconds)
+DEFAULT_QUERY_CACHE_SIZE = 512
+DEFAULT_QUERY_CACHE_TTL = 3600
+
+# Reciprocal rank fusion constant - can be overridden via RRF_K
+DEFAULT_RRF_K = 60
+
+
+class QueryEmbeddingCache:
+    """Bounded LRU of normalized query text -> embedding, with a time-to-live"""
+
+    def __init__(self, max_size: int = None, ttl: float = None):
+        """
+        Initialize the cache
+
+        Args:
+            max_size: Maximum number of queries kept (default: from .env or 512, 0 disables)
+            ttl: Seconds an embedding stays valid (default: from .env or 3600)
+        """
+        self.max_size = int(os.getenv("QUERY_CACHE_SIZE", DEFAULT_QUERY_CACHE_SIZE) if max_size is None else max_size)
+        self.ttl = float(os.getenv("QUERY_CACHE_TTL", DEFAULT_QUERY_CACHE_TTL) if ttl is None else ttl)
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        """Cache key: collapsed whitespace, case kept (the embedding depends on it)"""
+        return re.sub(r"\s+", " ", query).strip()
+
+    def get(self, key: str) -> Optional[List[float]]:
+        """Cached embedding for a normalized query, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] <= self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: str, embedding: List[float]):
+        """Store an embedding, evicting the least recently used queries"""
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), embedding)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop every cached embedding"""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0
+        }
 
 
 class VectorRetriever:
     """Retrieve relevant documents using vector similarity search"""
 
-    def __init__(self, db_path: str = "./volleyball_db", collection_name: str = "rm_volley"):
+    def __init__(self, db_path: str = "./volleyball_db", collection_name: Optional[str] = None):
         """
         Initialize retriever
 
         Args:
             db_path: Path to ChromaDB persistence directory
             collection_name: Name of the collection to query
+                             (default: the live version published by the indexer)
         """
         self.db_path = db_path
+        collection_name = collection_name or get_active_collection_name(db_path)
         self.collection_name = collection_name
+        self.backend = get_vector_backend()
+        self.hybrid = is_hybrid_enabled()
+        self.rrf_k = int(os.getenv("RRF_K", DEFAULT_RRF_K))
 
         # Initialize ChromaDB client
         self.client = chromadb.PersistentClient(
@@ -37,7 +123,8 @@ class VectorRetriever:
 
         # Get collection
         try:
-            self.collection = self.client.get_collection(collection_name)
+            self.collection = self.open_collection(collection_name)
+            self.lexical_index = self.open_lexical_index(collection_name)
             print(f"✅ Connected to collection '{collection_name}' ({self.collection.count()} documents)")
         except Exception as e:
             raise RuntimeError(
@@ -47,6 +134,91 @@ class VectorRetriever:
 
         # Initialize embedding generator
         self.embedder = get_embedding_generator()
+        self.query_cache = QueryEmbeddingCache()
+        # Per collection: whether match metadata has the exact-filter keys
+        self._filter_keys: Dict[str, bool] = {}
+        # Per collection: the team_key values of its matches
+        self._team_keys: Dict[str, List[str]] = {}
+
+    def open_collection(self, collection_name: str):
+        """
+        Open a collection with the configured backend (VECTOR_BACKEND)
+
+        Args:
+            collection_name: ChromaDB collection name
+
+        Returns:
+            The ChromaDB collection, or an in-memory NumpyVectorIndex snapshot of it
+        """
+        collection = self.client.get_collection(collection_name)
+        if self.backend == "numpy":
+            started = time.perf_counter()
+            collection = NumpyVectorIndex(collection)
+            print(f"🧮 Loaded '{collection_name}' into memory "
+                  f"({collection.dtype.name}, {time.perf_counter() - started:.2f}s)")
+        return collection
+
+    def open_lexical_index(self, collection_name: str):
+        """BM25 index saved by the indexer for a collection (None if missing or HYBRID_SEARCH=false)"""
+        if not self.hybrid:
+            return None
+        index = load_lexical_index(self.db_path, collection_name)
+        if index is None:
+            print(f"⚠️  No lexical index for '{collection_name}': vector search only")
+        return index
+
+    def reload(self) -> Dict[str, Any]:
+        """
+        Switch to the collection currently published by the indexer
+
+        The embedding model and the ChromaDB client are reused; queries already
+        running keep the old collection handle (the indexer keeps the previous
+        version around), new queries use the new one.
+
+        Returns:
+            Dictionary with previous and current collection names, document count
+            and whether the collection changed
+        """
+        previous = self.collection_name
+        collection_name = get_active_collection_name(self.db_path)
+
+        if collection_name != previous:
+            try:
+                collection = self.open_collection(collection_name)
+                lexical_index = self.open_lexical_index(collection_name)
+            except Exception as e:
+                raise RuntimeError(f"Failed to load collection '{collection_name}': {e}")
+
+            # Single attribute swap: concurrent queries see either the old or the new collection
+            self.collection, self.lexical_index, self.collection_name = collection, lexical_index, collection_name
+            print(f"🔀 Switched to collection '{collection_name}' ({collection.count()} documents)")
+
+        return {
+            "previous": previous,
+            "current": self.collection_name,
+            "count": self.collection.count(),
+            "reloaded": collection_name != previous
+        }
+
+    def embed_query(self, query: str) -> List[float]:
+        """
+        Embed a query, reusing the embedding of an identical recent query
+
+        The normalized text itself is embedded (original casing, whitespace
+        collapsed), so every query sharing a cache key gets the same vector.
+
+        Args:
+            query: Query text
+
+        Returns:
+            Embedding as list of floats
+        """
+        key = self.query_cache.normalize(query)
+        embedding = self.query_cache.get(key)
+        if embedding is None:
+            embedding = self.embedder.embed_query(key)
+            self.query_cache.put(key, embedding)
+        return embedding
 
     def retrieve(self,
                  query: str,
@@ -63,28 +235,100 @@ class VectorRetriever:
         Returns:
             Dictionary with documents, metadatas, distances, and ids
         """
-        # Generate query embedding
-        query_embedding = self.embedder.embed_query(query)
+        collection, lexical_index = self.collection, self.lexical_index
+
+        # Generate query embedding (cached)
+        query_embedding = self.embed_query(query)
+
+        # With a lexical index both rankings go deeper than n_results before fusion
+        depth = n_results * 2 if lexical_index is not None else n_results
 
         # Build query parameters
         query_params = {
             "query_embeddings": [query_embedding],
-            "n_results": n_results
+            "n_results": depth
         }
 
         if filter_metadata:
             query_params["where"] = filter_metadata
 
         # Execute search
-        results = self.collection.query(**query_params)
+        results = collection.query(**query_params)
 
-        return {
+        vector_results = {
             "documents": results["documents"][0],
             "metadatas": results["metadatas"][0],
             "distances": results["distances"][0],
             "ids": results["ids"][0]
         }
 
+        if lexical_index is None:
+            return vector_results
+        lexical_ids = lexical_index.search(query, depth)
+        return self.fuse_results(collection, query_embedding, vector_results, lexical_ids,
+                                 n_results, filter_metadata)
+
+    def fuse_results(self,
+                     collection,
+                     query_embedding: List[float],
+                     vector_results: Dict[str, Any],
+                     lexical_ids: List[str],
+                     n_results: int,
+                     filter_metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Merge vector and BM25 rankings with reciprocal rank fusion
+
+        Each document scores sum(1 / (RRF_K + rank)) over the rankings it
+        appears in, so chunks found by both searches come first and an exact
+        team or opponent name match can outrank a vaguely similar chunk.
+
+        Args:
+            collection: Collection the rankings come from
+            query_embedding: Query embedding (distances of lexical-only hits)
+            vector_results: Vector search results
+            lexical_ids: BM25 ranking
+            n_results: Number of results to return
+            filter_metadata: Metadata filter the vector search used
+
+        Returns:
+            Dictionary with documents, metadatas, distances, and ids
+        """
+        # BM25 ignores metadata: keep only the hits the filter allows
+        if lexical_ids and filter_metadata:
+            allowed = set(collection.get(ids=lexical_ids, where=filter_metadata, include=[])["ids"])
+            lexical_ids = [doc_id for doc_id in lexical_ids if doc_id in allowed]
+
+        scores: Dict[str, float] = {}
+        for ranking in (vector_results["ids"], lexical_ids):
+            for rank, doc_id in enumerate(ranking, start=1):
+                scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (self.rrf_k + rank)
+        fused = sorted(scores, key=scores.get, reverse=True)
+
+        found = {
+            doc_id: (doc, meta, dist)
+            for doc, meta, dist, doc_id in zip(vector_results["documents"], vector_results["metadatas"],
+                                               vector_results["distances"], vector_results["ids"])
+        }
+
+        # Lexical-only hits: fetch them and compute the same squared L2 distance as the vector search
+        missing = [doc_id for doc_id in fused[:n_results] if doc_id not in found]
+        if missing:
+            extra = collection.get(ids=missing, include=["documents", "metadatas", "embeddings"])
+            query_vector = np.asarray(query_embedding, dtype=np.float32)
+            for doc, meta, embedding, doc_id in zip(extra["documents"], extra["metadatas"],
+                                                    extra["embeddings"], extra["ids"]):
+                difference = np.asarray(embedding, dtype=np.float32) - query_vector
+                found[doc_id] = (doc, meta, float(difference @ difference))
+
+        # Ids missing from the collection (index swapped mid-query) are skipped
+        fused = [doc_id for doc_id in fused if doc_id in found][:n_results]
+        return {
+            "documents": [found[doc_id][0] for doc_id in fused],
+            "metadatas": [found[doc_id][1] for doc_id in fused],
+            "distances": [found[doc_id][2] for doc_id in fused],
+            "ids": fused
+        }
+
     def retrieve_matches(self, query: str, n_results: int = 5) -> Dict[str, Any]:
         """
         Retrieve only match documents
@@ -111,10 +355,49 @@ class VectorRetriever:
         """
         return self.retrieve(query, n_results, filter_metadata={"type": "standing"})
 
+    def has_filter_keys(self) -> bool:
+        """Whether the live collection stores team_key/date_int/has_result (indexed after they were added)"""
+        collection_name = self.collection_name
+        if collection_name not in self._filter_keys:
+            sample = self.collection.get(where={"type": "match"}, limit=1, include=["metadatas"])
+            self._filter_keys[collection_name] = bool(sample["metadatas"]) and "team_key" in sample["metadatas"][0]
+        return self._filter_keys[collection_name]
+
+    def resolve_team_keys(self, team_name: str) -> List[str]:
+        """
+        team_key values of the live collection a team name refers to
+
+        An exact key wins; otherwise every key containing the name, so a
+        partial name ("RMVOLLEY", "volley 1") matches like the substring
+        search on rm_team did before the keys existed.
+
+        Args:
+            team_name: Team name or part of it
+
+        Returns:
+            Matching team keys (empty if none)
+        """
+        collection, collection_name = self.collection, self.collection_name
+        if collection_name not in self._team_keys:
+            metadatas = collection.get(where={"type": "match"}, include=["metadatas"])["metadatas"]
+            self._team_keys[collection_name] = sorted({meta["team_key"] for meta in metadatas if meta.get("team_key")})
+        team_keys = self._team_keys[collection_name]
+
+        key = make_team_key(team_name)
+        if not key:
+            return []
+        if key in team_keys:
+            return [key]
+        return [team_key for team_key in team_keys if key in team_key]
+
     def retrieve_by_team(self, team_name: str, n_results: int = 10, only_played: bool = True, only_future: bool = False) -> Dict[str, Any]:
         """
         Retrieve documents related to a specific team
 
+        The team and date conditions are exact metadata filters, so no query
+        embedding is computed and every match of the team is considered. A
+        partial team name selects every team whose key contains it.
+
         Args:
             team_name: Name of the team (e.g., "RM VOLLEY #18")
             n_results: Number of results
@@ -126,6 +409,46 @@ class VectorRetriever:
             - Past matches: most recent first
             - Future matches: closest upcoming first
         """
+        if not self.has_filter_keys():
+            print("⚠️  Collection has no team_key metadata: run the indexer again")
+            return self.retrieve_by_team_semantic(team_name, n_results, only_played, only_future)
+
+        team_keys = self.resolve_team_keys(team_name)
+        if not team_keys:
+            return {"documents": [], "metadatas": [], "distances": [], "ids": []}
+
+        conditions = [{"type": "match"}, {"team_key": {"$in": team_keys}}]
+        if only_played:
+            conditions.append({"has_result": True})
+        if only_future:
+            conditions += [{"has_result": False}, {"date_int": {"$gt": today_int()}}]
+        else:
+            # Matches without a parseable date can't be placed in time
+            conditions.append({"date_int": {"$gt": 0}})
+
+        results = self.collection.get(where={"$and": conditions}, include=["documents", "metadatas"])
+
+        # Future matches: closest upcoming first; past matches: most recent first
+        order = sorted(
+            range(len(results["ids"])),
+            key=lambda i: results["metadatas"][i]["date_int"],
+            reverse=not only_future
+        )[:n_results]
+
+        return {
+            "documents": [results["documents"][i] for i in order],
+            "metadatas": [results["metadatas"][i] for i in order],
+            "distances": [0.0] * len(order),
+            "ids": [results["ids"][i] for i in order]
+        }
+
+    def retrieve_by_team_semantic(self, team_name: str, n_results: int = 10, only_played: bool = True, only_future: bool = False) -> Dict[str, Any]:
+        """
+        Retrieve team matches by similarity search and filter them in Python
+
+        Fallback for collections indexed before team_key/date_int/has_result
+        were stored. Same arguments and result as retrieve_by_team.
+        """
         from datetime import datetime
 
         # Retrieve more results to filter - need enough to cover all team's matches
@@ -232,10 +555,16 @@ class VectorRetriever:
 
     def get_collection_stats(self) -> Dict[str, Any]:
         """Get statistics about the collection"""
+        version = read_active_version(self.db_path) or {}
         return {
             "name": self.collection_name,
             "count": self.collection.count(),
-            "embedding_dimension": self.embedder.get_dimension()
+            "embedding_dimension": self.embedder.get_dimension(),
+            "published": version.get("created"),
+            "query_cache": self.query_cache.get_stats(),
+            "lexical_index": self.lexical_index.get_stats() if self.lexical_index is not None else None,
+            "vector_index": (self.collection.get_stats() if self.backend == "numpy"
+                             else {"backend": "chroma"})
         }
 
     def format_results_for_llm(self, results: Dict[str, Any], max_length: int = 2000) -> str:
@@ -275,12 +604,13 @@ class VectorRetriever:
 _retriever = None
 
 
-def get_retriever(db_path: str = "./volleyball_db") -> VectorRetriever:
+def get_retriever(db_path: str = "./volleyball_db", reload: bool = False) -> VectorRetriever:
     """
     Get or create singleton retriever instance
 
     Args:
         db_path: Path to ChromaDB database
+        reload: Switch an existing instance to the collection published by the indexer
 
     Returns:
         VectorRetriever instance
@@ -288,6 +618,8 @@ def get_retriever(db_path: str = "./volleyball_db") -> VectorRetriever:
     global _retriever
     if _retriever is None:
         _retriever = VectorRetriever(db_path)
+    elif reload:
+        _retriever.reload()
     return _retriever
 
 
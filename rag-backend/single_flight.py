@@ -0,0 +1,120 @@
+"""
+Single Flight Module
+Coalesces identical in-flight LLM generations: concurrent requests for the
+same answer share one generation and its token stream
+"""
+
+import asyncio
+from typing import Any, AsyncIterator, Callable, Dict, Hashable, List, Optional, Tuple
+
+
+class SharedGeneration:
+    """
+    One running generation and the pieces it has produced so far
+
+    Subscribers replay the pieces already produced, then wait for new ones,
+    so a request that joins late still receives the whole answer.
+    """
+
+    def __init__(self):
+        self.pieces: List[str] = []
+        self.done = False
+        self.error: Optional[Exception] = None
+        self.subscribers = 1
+        self.task: Optional[asyncio.Task] = None
+        self._changed = asyncio.Condition()
+
+    async def run(self, source: AsyncIterator[str]):
+        """Consume the source generation, waking subscribers at each piece"""
+        try:
+            async for piece in source:
+                async with self._changed:
+                    self.pieces.append(piece)
+                    self._changed.notify_all()
+        except Exception as e:
+            self.error = e
+        finally:
+            async with self._changed:
+                self.done = True
+                self._changed.notify_all()
+
+    async def subscribe(self) -> AsyncIterator[str]:
+        """
+        Yield every piece of the generation, from the first one
+
+        Raises:
+            RuntimeError: If the generation failed
+        """
+        position = 0
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(lambda: position < len(self.pieces) or self.done)
+                pieces = self.pieces[position:]
+                position = len(self.pieces)
+                done = self.done
+
+            for piece in pieces:
+                yield piece
+
+            if done:
+                if self.error is not None:
+                    raise RuntimeError(str(self.error))
+                return
+
+    async def result(self) -> str:
+        """Wait for the generation to finish and return the full text"""
+        return "".join([piece async for piece in self.subscribe()])
+
+
+class SingleFlight:
+    """
+    Registry of in-flight generations by key
+
+    The first request for a key starts the generation in its own task (so it
+    keeps running for the others if that client disconnects); requests with
+    the same key arriving before it finishes subscribe to it instead of
+    starting another one. Must be used from a single event loop.
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[Hashable, SharedGeneration] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    def join(self, key: Hashable, source_factory: Callable[[], AsyncIterator[str]]) -> Tuple[SharedGeneration, bool]:
+        """
+        Get the in-flight generation for a key, starting it if there is none
+
+        Args:
+            key: Identity of the answer (same key = same answer)
+            source_factory: Creates the generation (an async iterator of text pieces)
+
+        Returns:
+            The shared generation and whether this call started it
+        """
+        generation = self._in_flight.get(key)
+        if generation is not None:
+            generation.subscribers += 1
+            self.coalesced += 1
+            return generation, False
+
+        generation = SharedGeneration()
+        self._in_flight[key] = generation
+        self.started += 1
+        generation.task = asyncio.create_task(self._run(key, generation, source_factory()))
+        return generation, True
+
+    async def _run(self, key: Hashable, generation: SharedGeneration, source: AsyncIterator[str]):
+        """Run a generation, then unregister it"""
+        try:
+            await generation.run(source)
+        finally:
+            self._in_flight.pop(key, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get coalescing statistics"""
+        return {
+            "in_flight": len(self._in_flight),
+            "started": self.started,
+            "coalesced": self.coalesced
+        }
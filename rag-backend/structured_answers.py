@@ -0,0 +1,240 @@
+"""
+Structured Answers Module
+Templated answers for the intents the router recognizes (standings, next
+matches), rendered from classifica.json and match metadata without the LLM
+"""
+
+import os
+import json
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from match_keys import make_team_key, today_int
+
+WEEKDAYS = ["lunedì", "martedì", "mercoledì", "giovedì", "venerdì", "sabato", "domenica"]
+
+# Wording asking for more than a lookup (predictions, explanations): always LLM
+OPEN_ENDED_KEYWORDS = ["vincerà", "vincera", "vince", "pronostic", "previsio", "perché", "perche", "consigli"]
+
+
+def is_structured_enabled() -> bool:
+    """Whether standings and schedule questions get templated answers (STRUCTURED_ANSWERS env var, default true)"""
+    return os.getenv("STRUCTURED_ANSWERS", "true").lower() not in ("false", "0", "no")
+
+
+def get_structured_intent(route: Dict[str, Any], question: str) -> Optional[str]:
+    """
+    Intent of a question that has a templated answer
+
+    Mirrors the branches of retrieve_for_question, so the retrieved results
+    are the ones the template needs.
+
+    Args:
+        route: Detected team and intent flags (route_question)
+        question: User question
+
+    Returns:
+        "standings", "next_matches", or None for open-ended questions (LLM)
+    """
+    if any(kw in question.lower() for kw in OPEN_ENDED_KEYWORDS):
+        return None
+    if route["is_standings_query"] and not (
+            route["is_past_query"] or route["is_future_query"] or route["is_stats_query"]):
+        return "standings"
+    if route["detected_team"] and route["is_future_query"] and not route["is_stats_query"]:
+        return "next_matches"
+    return None
+
+
+def safe_int(value, default=0):
+    """Integer standings field ('-', '' and None count as default)"""
+    try:
+        return int(value) if value not in [None, '', '-', 'nan'] else default
+    except (ValueError, TypeError):
+        return default
+
+
+class StandingsFile:
+    """classifica.json, parsed once and read again only when the file changes"""
+
+    def __init__(self, path: str):
+        """
+        Initialize the reader
+
+        Args:
+            path: Path to classifica.json
+        """
+        self.path = Path(path)
+        self._mtime = None
+        self._leagues = None
+        self._lock = threading.Lock()
+
+    def get_leagues(self) -> Optional[Dict[str, List[Dict]]]:
+        """
+        Current standings
+
+        Returns:
+            League name -> team records, or None if the file can't be read
+        """
+        try:
+            mtime = self.path.stat().st_mtime_ns
+        except OSError:
+            return None
+
+        with self._lock:
+            if mtime != self._mtime:
+                try:
+                    with open(self.path, "r", encoding="utf-8") as f:
+                        self._leagues = json.load(f)
+                except (OSError, ValueError) as e:
+                    print(f"⚠️  Could not read standings {self.path}: {e}")
+                    return None
+                self._mtime = mtime
+            return self._leagues
+
+
+def render_league(league_name: str, teams: List[Dict], team: Optional[str] = None) -> str:
+    """
+    Standings table of one league, in the order of the Pos. column
+
+    Args:
+        league_name: Name of the league
+        teams: Team records from classifica.json
+        team: Team asked about, whose position is repeated at the end
+
+    Returns:
+        Italian text
+    """
+    sorted_teams = sorted(teams, key=lambda t: safe_int(t.get('Pos.', 999)))
+    lines = [f"Classifica {league_name}:"]
+    for record in sorted_teams:
+        lines.append(
+            f"{safe_int(record.get('Pos.', 0))}. {record.get('Squadra', 'Unknown')} - "
+            f"{safe_int(record.get('Punti', 0))} punti "
+            f"({safe_int(record.get('PV', 0))} vittorie, {safe_int(record.get('PP', 0))} sconfitte, "
+            f"set {safe_int(record.get('SF', 0))}-{safe_int(record.get('SS', 0))})"
+        )
+
+    if team:
+        key = make_team_key(team)
+        for record in sorted_teams:
+            if make_team_key(record.get('Squadra', '')) == key:
+                lines.append("")
+                lines.append(f"{record['Squadra']} è in posizione {safe_int(record.get('Pos.', 0))} "
+                             f"con {safe_int(record.get('Punti', 0))} punti.")
+    return "\n".join(lines)
+
+
+def render_standings(leagues: Dict[str, List[Dict]],
+                     league_names: List[str],
+                     team: Optional[str] = None) -> Optional[str]:
+    """
+    Standings answer
+
+    With a team, every league the team plays in; otherwise the league of the
+    best retrieved standings chunk.
+
+    Args:
+        leagues: classifica.json content
+        league_names: Leagues of the retrieved standings chunks, best first
+        team: Team named in the question, if any
+
+    Returns:
+        Italian answer, or None if no league matches
+    """
+    if team:
+        key = make_team_key(team)
+        names = [name for name, teams in leagues.items()
+                 if any(make_team_key(record.get('Squadra', '')) == key for record in teams)]
+    else:
+        names = [name for name in league_names[:1] if name in leagues]
+
+    if not names:
+        return None
+    return "\n\n".join(render_league(name, leagues[name], team) for name in names)
+
+
+def describe_match(metadata: Dict[str, Any]) -> str:
+    """One match: day, time, teams, home/away, league and venue"""
+    day = metadata.get("date", "")
+    if metadata.get("date_int"):
+        match_date = datetime.strptime(str(metadata["date_int"]), "%Y%m%d")
+        day = f"{WEEKDAYS[match_date.weekday()]} {match_date.strftime('%d/%m/%Y')}"
+    if metadata.get("time"):
+        day += f" alle {metadata['time']}"
+
+    text = f"{day}: {metadata.get('home_team', '')} vs {metadata.get('away_team', '')}"
+    if metadata.get("is_home") is not None:
+        text += " (in casa)" if metadata["is_home"] else " (in trasferta)"
+    if metadata.get("league"):
+        text += f". Campionato: {metadata['league']}"
+    if metadata.get("venue"):
+        text += f". Impianto: {metadata['venue']}"
+    return text + "."
+
+
+def render_next_matches(team: str, metadatas: List[Dict[str, Any]]) -> Optional[str]:
+    """
+    Schedule answer from the metadata of the team's future matches
+
+    Matches dated before today (the semantic fallback of retrieve_by_team
+    can return them) or without a date are left out.
+
+    Args:
+        team: Team named in the question
+        metadatas: Retrieved matches, closest first (retrieve_by_team)
+
+    Returns:
+        Italian answer, or None if only past or undated matches were
+        retrieved (the question then goes to the LLM)
+    """
+    if not metadatas:
+        return f"Non ci sono partite in programma per {team}."
+
+    today = today_int()
+    metadatas = [metadata for metadata in metadatas
+                 if isinstance(metadata.get("date_int"), int) and metadata["date_int"] >= today]
+    if not metadatas:
+        return None
+
+    team_name = metadatas[0].get("rm_team") or team
+    if len(metadatas) == 1:
+        return f"La prossima partita di {team_name} è {describe_match(metadatas[0])}"
+    lines = [f"Le prossime partite di {team_name}:"]
+    lines += [f"- {describe_match(metadata)}" for metadata in metadatas]
+    return "\n".join(lines)
+
+
+def render_structured_answer(intent: str,
+                             route: Dict[str, Any],
+                             results: Dict[str, Any],
+                             standings: StandingsFile) -> Optional[str]:
+    """
+    Templated answer for a structured intent
+
+    Args:
+        intent: Result of get_structured_intent
+        route: Detected team and intent flags
+        results: Results of retrieve_for_question for this route
+        standings: classifica.json reader
+
+    Returns:
+        Italian answer, or None if the data for the template is missing
+        (the question then goes to the LLM)
+    """
+    if intent == "standings":
+        leagues = standings.get_leagues()
+        if not leagues:
+            return None
+        league_names = []
+        for metadata in results["metadatas"]:
+            if metadata.get("type") == "standing" and metadata.get("league") not in league_names:
+                league_names.append(metadata.get("league"))
+        return render_standings(leagues, league_names, route["detected_team"])
+
+    if intent == "next_matches":
+        return render_next_matches(route["detected_team"], results["metadatas"])
+
+    return None
@@ -111,8 +111,11 @@ def test_database() -> bool:
             settings=Settings(anonymized_telemetry=False)
         )
 
+        from index_version import get_active_collection_name
+        collection_name = get_active_collection_name("./volleyball_db")
+
         try:
-            collection = client.get_collection("rm_volley")
+            collection = client.get_collection(collection_name)
             count = collection.count()
 
             print_success(f"Database found with {count} documents")
@@ -125,7 +128,7 @@ def test_database() -> bool:
             return True
 
         except Exception as e:
-            print_error("Collection 'rm_volley' not found")
+            print_error(f"Collection '{collection_name}' not found")
             print_info("Run: python indexer.py")
             return False
 
@@ -0,0 +1,28 @@
+"""Tests for the admin endpoint token check"""
+
+import pytest
+
+pytest.importorskip("chromadb")
+pytest.importorskip("dotenv")
+
+from fastapi import HTTPException
+
+import main
+
+
+def test_admin_endpoints_are_disabled_without_token(monkeypatch):
+    monkeypatch.setattr(main, "ADMIN_TOKEN", "")
+    with pytest.raises(HTTPException) as error:
+        main.require_admin_token(None)
+    assert error.value.status_code == 403
+    with pytest.raises(HTTPException):
+        main.require_admin_token("")
+
+
+def test_admin_token_must_match(monkeypatch):
+    monkeypatch.setattr(main, "ADMIN_TOKEN", "s3cret")
+    main.require_admin_token("s3cret")
+    for wrong in (None, "", "s3cre", "S3CRET"):
+        with pytest.raises(HTTPException) as error:
+            main.require_admin_token(wrong)
+        assert error.value.status_code == 403
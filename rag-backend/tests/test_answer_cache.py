@@ -0,0 +1,80 @@
+"""Tests for the /ask answer cache"""
+
+import pytest
+
+from answer_cache import AnswerCache, make_context_key, normalize_question
+
+ROUTE = {"detected_team": "RM VOLLEY #18", "is_future_query": True}
+
+
+def test_normalize_question():
+    assert normalize_question("  Quando GIOCA   rm volley 18?! ") == "quando gioca rm volley 18"
+
+
+def test_context_key_depends_on_chunks_and_version():
+    key = make_context_key(ROUTE, ["a", "b"], "rm_volley_1", 0.7)
+    assert key == make_context_key(ROUTE, ["a", "b"], "rm_volley_1", 0.7)
+    assert key != make_context_key(ROUTE, ["b", "a"], "rm_volley_1", 0.7)
+    assert key != make_context_key(ROUTE, ["a", "b"], "rm_volley_2", 0.7)
+
+
+def test_near_duplicates_are_off_by_default(monkeypatch):
+    monkeypatch.delenv("ANSWER_CACHE_SIMILARITY", raising=False)
+    cache = AnswerCache(max_size=4, ttl=60)
+    assert cache.enabled
+    assert not cache.semantic
+
+
+def test_exact_hit_ignores_case_and_punctuation():
+    cache = AnswerCache(max_size=4, ttl=60, similarity=0)
+    cache.put("ctx", "Quando gioca RM VOLLEY #18?", "Sabato")
+
+    assert cache.get("ctx", "quando gioca rm volley #18")["answer"] == "Sabato"
+    assert cache.get("other", "quando gioca rm volley #18") is None
+    assert cache.get_stats()["hits"] == 1
+
+
+def test_lru_eviction_and_ttl():
+    cache = AnswerCache(max_size=2, ttl=60, similarity=0)
+    cache.put("ctx", "uno", "1")
+    cache.put("ctx", "due", "2")
+    cache.get("ctx", "uno")
+    cache.put("ctx", "tre", "3")
+    assert cache.get("ctx", "due") is None
+    assert cache.get("ctx", "uno") is not None
+
+    expired = AnswerCache(max_size=2, ttl=-1, similarity=0)
+    expired.put("ctx", "uno", "1")
+    assert expired.get("ctx", "uno") is None
+
+
+def test_disabled_cache_stores_nothing():
+    cache = AnswerCache(max_size=0, ttl=60, similarity=0)
+    cache.put("ctx", "uno", "1")
+    assert cache.get("ctx", "uno") is None
+    assert cache.get_stats()["size"] == 0
+
+
+def test_similar_hit_needs_same_context_and_threshold():
+    cache = AnswerCache(max_size=4, ttl=60, similarity=0.95)
+    cache.put("ctx", "Quando gioca la 18?", "Sabato", embedding=[1.0, 0.0])
+
+    assert cache.get_similar("ctx", [0.99, 0.05])["answer"] == "Sabato"
+    assert cache.get_similar("ctx", [0.6, 0.8]) is None
+    assert cache.get_similar("other", [1.0, 0.0]) is None
+    assert cache.get_stats()["similar_hits"] == 1
+
+
+def test_clear():
+    cache = AnswerCache(max_size=4, ttl=60, similarity=0)
+    cache.put("ctx", "uno", "1")
+    cache.clear()
+    assert cache.get("ctx", "uno") is None
+
+
+@pytest.mark.parametrize("size", [1, 3])
+def test_size_never_exceeds_max(size):
+    cache = AnswerCache(max_size=size, ttl=60, similarity=0)
+    for i in range(5):
+        cache.put("ctx", f"domanda {i}", str(i))
+    assert cache.get_stats()["size"] == size
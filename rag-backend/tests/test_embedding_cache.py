@@ -0,0 +1,116 @@
+"""Tests for the persistent embedding cache"""
+
+import numpy as np
+import pytest
+
+from embedding_cache import EmbeddingCache
+
+
+def make_cache(tmp_path, max_entries=4, dimension=3):
+    return EmbeddingCache("test-model", dimension, cache_dir=str(tmp_path), max_entries=max_entries)
+
+
+def vector(value, dimension=3):
+    return np.full(dimension, value, dtype=np.float32)
+
+
+def test_put_and_get(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put_many(["a", "b"], np.stack([vector(1), vector(2)]))
+
+    a, b, c = cache.get_many(["a", "b", "c"])
+
+    np.testing.assert_array_equal(a, vector(1))
+    np.testing.assert_array_equal(b, vector(2))
+    assert c is None
+    assert cache.get_stats()["entries"] == 2
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = make_cache(tmp_path, max_entries=2)
+    cache.put_many(["a"], np.stack([vector(1)]))
+    cache.put_many(["b"], np.stack([vector(2)]))
+    cache.get_many(["a"])  # b becomes the least recently used
+
+    cache.put_many(["c"], np.stack([vector(3)]))
+
+    a, b, c = cache.get_many(["a", "b", "c"])
+    assert b is None
+    np.testing.assert_array_equal(a, vector(1))
+    np.testing.assert_array_equal(c, vector(3))
+
+
+def test_batch_larger_than_cache_keeps_last_entries(tmp_path):
+    cache = make_cache(tmp_path, max_entries=2)
+    cache.put_many(["a", "b", "c"], np.stack([vector(1), vector(2), vector(3)]))
+
+    assert [v is not None for v in cache.get_many(["a", "b", "c"])] == [False, True, True]
+
+
+def test_cached_texts_of_a_batch_keep_their_slot(tmp_path):
+    cache = make_cache(tmp_path, max_entries=2)
+    cache.put_many(["a", "b"], np.stack([vector(1), vector(2)]))
+
+    # "a" is both cached and the least recently used: only "b" may be evicted
+    cache.put_many(["a", "c"], np.stack([vector(1), vector(3)]))
+
+    a, b, c = cache.get_many(["a", "b", "c"])
+    assert b is None
+    np.testing.assert_array_equal(a, vector(1))
+    np.testing.assert_array_equal(c, vector(3))
+
+
+def test_reopen_shares_vectors_across_instances(tmp_path):
+    make_cache(tmp_path).put_many(["a"], np.stack([vector(1)]))
+
+    np.testing.assert_array_equal(make_cache(tmp_path).get_many(["a"])[0], vector(1))
+
+
+def test_capacity_change_resets_cache(tmp_path):
+    make_cache(tmp_path, max_entries=4).put_many(["a"], np.stack([vector(1)]))
+
+    cache = make_cache(tmp_path, max_entries=8)
+
+    assert cache.get_many(["a"]) == [None]
+    assert cache.get_stats()["entries"] == 0
+
+
+def test_read_discards_slot_reclaimed_by_another_writer(tmp_path, monkeypatch):
+    reader = make_cache(tmp_path, max_entries=1)
+    writer = make_cache(tmp_path, max_entries=1)
+    reader.put_many(["a"], np.stack([vector(1)]))
+
+    # The writer evicts "a" after the reader looked its slot up, before it re-checks it
+    lookup = reader._lookup_slots
+    calls = []
+
+    def racing_lookup(keys):
+        found = lookup(keys)
+        if not calls:
+            writer.put_many(["b"], np.stack([vector(2)]))
+        calls.append(keys)
+        return found
+
+    monkeypatch.setattr(reader, "_lookup_slots", racing_lookup)
+    assert reader.get_many(["a"]) == [None]
+
+
+def test_pending_slots_are_not_counted(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.db.execute("UPDATE slots SET key = 'pending:crashed:0', last_used = 1 WHERE slot = 0")
+
+    assert cache.get_stats()["entries"] == 0
+    cache.put_many(["a", "b", "c", "d"], np.stack([vector(i) for i in range(4)]))
+    assert cache.get_stats()["entries"] == 4
+
+
+@pytest.mark.parametrize("dimension", [3, 384])
+def test_flush_covers_rows_across_pages(tmp_path, dimension):
+    cache = make_cache(tmp_path, max_entries=20, dimension=dimension)
+    texts = [str(i) for i in range(20)]
+    cache.put_many(texts, np.stack([vector(i, dimension) for i in range(20)]))
+
+    reopened = make_cache(tmp_path, max_entries=20, dimension=dimension)
+    for i, value in enumerate(reopened.get_many(texts)):
+        np.testing.assert_array_equal(value, vector(i, dimension))
@@ -0,0 +1,91 @@
+"""Tests for the embedding generator helpers (no model is loaded)"""
+
+import sys
+
+import embeddings
+
+
+class FakeGenerator:
+    def __init__(self, model_name):
+        self.model_name = model_name
+
+
+def test_get_embedding_generator_is_keyed_by_model(monkeypatch):
+    monkeypatch.setattr(embeddings, "EmbeddingGenerator", FakeGenerator)
+    monkeypatch.setattr(embeddings, "_embedding_generators", {})
+
+    small = embeddings.get_embedding_generator("model-a")
+    assert embeddings.get_embedding_generator("model-a") is small
+
+    other = embeddings.get_embedding_generator("model-b")
+    assert other is not small
+    assert other.model_name == "model-b"
+
+
+def test_get_embedding_generator_defaults_to_env_model(monkeypatch):
+    monkeypatch.setattr(embeddings, "EmbeddingGenerator", FakeGenerator)
+    monkeypatch.setattr(embeddings, "_embedding_generators", {})
+    monkeypatch.setenv("EMBEDDING_MODEL", "model-env")
+
+    assert embeddings.get_embedding_generator().model_name == "model-env"
+
+
+def test_plan_batches_covers_every_text_once():
+    texts = ["a" * n for n in (5, 50, 1, 20, 300, 7, 0)]
+
+    batches = embeddings.plan_batches(texts, max_batch_size=3, max_batch_chars=100)
+
+    assert sorted(i for batch in batches for i in batch) == list(range(len(texts)))
+    assert all(len(batch) <= 3 for batch in batches)
+
+
+def test_plan_batches_sorts_longest_first_and_sizes_by_length():
+    texts = ["x" * 10] * 6 + ["y" * 100]
+
+    batches = embeddings.plan_batches(texts, max_batch_size=8, max_batch_chars=200)
+
+    # The long text goes first, with room for one more of its length
+    assert batches[0][0] == 6
+    assert len(batches[0]) == 2
+    assert [len(batch) for batch in batches[1:]] == [5]
+
+
+def test_plan_batches_keeps_oversized_texts():
+    batches = embeddings.plan_batches(["z" * 1000, ""], max_batch_size=4, max_batch_chars=10)
+    assert batches == [[0], [1]]
+
+
+def test_plan_batches_empty():
+    assert embeddings.plan_batches([], 8, 100) == []
+
+
+def test_worker_loads_onnx_backend(monkeypatch):
+    loaded = []
+
+    class FakeOnnxModel:
+        @classmethod
+        def load(cls, model_name, threads=0):
+            loaded.append((model_name, threads))
+            return cls()
+
+    fake_module = type(sys)("onnx_backend")
+    fake_module.OnnxEmbeddingModel = FakeOnnxModel
+    monkeypatch.setitem(sys.modules, "onnx_backend", fake_module)
+    monkeypatch.setattr(embeddings, "_worker_model", None)
+
+    embeddings._init_worker("model-a", "onnx", 2)
+
+    assert loaded == [("model-a", 2)]
+    assert isinstance(embeddings._worker_model, FakeOnnxModel)
+
+
+def test_signature_changes_with_backend():
+    generator = embeddings.EmbeddingGenerator.__new__(embeddings.EmbeddingGenerator)
+    generator.model_name = "model-a"
+    generator.passage_prefix = "passage: "
+
+    generator.backend = "torch"
+    torch_signature = generator.get_signature()
+    generator.backend = "onnx"
+
+    assert generator.get_signature() != torch_signature
@@ -0,0 +1,81 @@
+"""Tests for the reciprocal rank fusion of vector and BM25 results"""
+
+import pytest
+
+pytest.importorskip("chromadb")
+
+from retriever import VectorRetriever
+from vector_index import NumpyVectorIndex
+
+
+class FakeCollection:
+    name = "rm_volley_test"
+
+    def __init__(self):
+        self.ids = ["a", "b", "c", "d"]
+        self.metadatas = [{"type": "match"}, {"type": "match"}, {"type": "standing"}, {"type": "match"}]
+        self.embeddings = [[0.0, 0.0], [1.0, 0.0], [0.0, 2.0], [3.0, 0.0]]
+
+    def count(self):
+        return len(self.ids)
+
+    def get(self, include=None, limit=None, offset=0):
+        return {
+            "ids": self.ids[offset:offset + limit],
+            "documents": [f"doc {i}" for i in self.ids[offset:offset + limit]],
+            "metadatas": self.metadatas[offset:offset + limit],
+            "embeddings": self.embeddings[offset:offset + limit],
+        }
+
+
+@pytest.fixture
+def collection():
+    return NumpyVectorIndex(FakeCollection())
+
+
+@pytest.fixture
+def retriever():
+    retriever = VectorRetriever.__new__(VectorRetriever)
+    retriever.rrf_k = 60
+    return retriever
+
+
+def vector_results(collection, ids):
+    found = collection.get(ids=ids)
+    order = [found["ids"].index(doc_id) for doc_id in ids]
+    return {
+        "ids": ids,
+        "documents": [found["documents"][i] for i in order],
+        "metadatas": [found["metadatas"][i] for i in order],
+        "distances": [float(i) for i in range(len(ids))],
+    }
+
+
+def test_documents_in_both_rankings_come_first(retriever, collection):
+    fused = retriever.fuse_results(collection, [0.0, 0.0], vector_results(collection, ["a", "b"]),
+                                   ["b", "d"], n_results=3)
+
+    assert fused["ids"] == ["b", "a", "d"]
+    assert fused["documents"] == ["doc b", "doc a", "doc d"]
+
+
+def test_lexical_only_hits_get_their_vector_distance(retriever, collection):
+    fused = retriever.fuse_results(collection, [0.0, 0.0], vector_results(collection, ["a"]),
+                                   ["d"], n_results=2)
+
+    assert fused["ids"] == ["a", "d"]
+    assert fused["distances"] == [0.0, 9.0]
+
+
+def test_lexical_hits_respect_the_metadata_filter(retriever, collection):
+    fused = retriever.fuse_results(collection, [0.0, 0.0], vector_results(collection, ["a"]),
+                                   ["c", "d"], n_results=3, filter_metadata={"type": "match"})
+
+    assert fused["ids"] == ["a", "d"]
+
+
+def test_ids_missing_from_the_collection_are_skipped(retriever, collection):
+    fused = retriever.fuse_results(collection, [0.0, 0.0], vector_results(collection, ["a"]),
+                                   ["gone"], n_results=2)
+
+    assert fused["ids"] == ["a"]
@@ -0,0 +1,14 @@
+"""Tests for the versioned collection names"""
+
+from index_version import COLLECTION_PREFIX, new_collection_name
+
+
+def test_new_collection_names_are_unique_within_a_second():
+    names = {new_collection_name() for _ in range(200)}
+    assert len(names) == 200
+    assert all(name.startswith(f"{COLLECTION_PREFIX}_") for name in names)
+
+
+def test_new_collection_names_sort_after_old_format():
+    # Versions built before the suffix was added must still sort as older
+    assert sorted(["rm_volley_20000101_000000", new_collection_name()])[0] == "rm_volley_20000101_000000"
@@ -0,0 +1,63 @@
+"""Tests for the checks that keep a broken rebuild from going live"""
+
+import pytest
+
+pytest.importorskip("chromadb")
+
+from indexer import VolleyballDataIndexer
+
+
+class FakeCollection:
+    """Collection that already holds documents and answers every query"""
+
+    def count(self):
+        return 10
+
+    def query(self, **kwargs):
+        return {"ids": [["match_1"]]}
+
+
+class FakeEmbedder:
+    def embed_query(self, text):
+        return [0.0]
+
+
+@pytest.fixture
+def indexer(tmp_path):
+    # Skip __init__: no ChromaDB client or embedding model is needed here
+    indexer = VolleyballDataIndexer.__new__(VolleyballDataIndexer)
+    indexer.data_dir = tmp_path
+    indexer.collection = FakeCollection()
+    indexer.embedder = FakeEmbedder()
+    indexer.produced_count = 0
+    indexer.failures = {}
+    return indexer
+
+
+def test_validate_passes_without_failures(indexer):
+    assert indexer.validate()
+
+
+def test_missing_source_blocks_publishing(indexer):
+    assert indexer.index_standings("classifica.json") == 0
+    assert "standings" in indexer.failures
+    assert not indexer.validate()
+
+
+def test_source_without_chunks_blocks_publishing(indexer, tmp_path):
+    (tmp_path / "classifica.json").write_text("{}", encoding="utf-8")
+    indexer.sync_chunks = lambda documents, metadatas, ids, doc_type: 0
+
+    indexer.index_standings("classifica.json")
+
+    assert "standings" in indexer.failures
+    assert not indexer.validate()
+
+
+def test_unreadable_source_blocks_publishing(indexer, tmp_path):
+    (tmp_path / "classifica.json").write_text("not json", encoding="utf-8")
+
+    indexer.index_standings("classifica.json")
+
+    assert "standings" in indexer.failures
+    assert not indexer.validate()
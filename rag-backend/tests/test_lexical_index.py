@@ -0,0 +1,51 @@
+"""Tests for BM25 tokenization and search"""
+
+from lexical_index import BM25Index, build_lexical_text, tokenize
+
+
+def test_tokenize_joins_rm_team_names():
+    assert tokenize("RMVOLLEY#16 contro RM VOLLEY #18") == ["rmvolley16", "contro", "rmvolley18"]
+    assert tokenize("rm volley 18") == ["rmvolley18"]
+
+
+def test_tokenize_drops_stopwords_and_single_letters():
+    assert tokenize("Quando gioca la squadra a Roma il 5?") == ["gioca", "squadra", "roma", "5"]
+
+
+def test_build_lexical_text_adds_team_fields():
+    text = build_lexical_text("Partita", {"home_team": "RM VOLLEY #18", "away_team": "Volley Club", "league": "D"})
+    assert text == "Partita RM VOLLEY #18 Volley Club"
+    assert build_lexical_text("Partita", None) == "Partita"
+
+
+def build_index():
+    return BM25Index.build(
+        ["m16", "m18", "standing"],
+        [
+            "RM VOLLEY #16 contro Volley Club sabato",
+            "RM VOLLEY #18 contro Pallavolo Roma domenica",
+            "Classifica Serie D: Pallavolo Roma prima, Volley Club seconda",
+        ]
+    )
+
+
+def test_search_matches_exact_team_only():
+    index = build_index()
+    assert index.search("Quando gioca RMVOLLEY#18?") == ["m18"]
+
+
+def test_search_ranks_and_limits():
+    index = build_index()
+    assert index.search("Pallavolo Roma domenica") == ["m18", "standing"]
+    assert index.search("Pallavolo Roma domenica", n_results=1) == ["m18"]
+    assert index.search("parole sconosciute") == []
+
+
+def test_save_and_load_round_trip(tmp_path):
+    index = build_index()
+    path = tmp_path / "lexical.json"
+    index.save(path)
+
+    loaded = BM25Index.load(path)
+    assert loaded.search("Volley Club") == index.search("Volley Club")
+    assert loaded.get_stats() == index.get_stats()
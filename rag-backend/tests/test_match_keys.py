@@ -0,0 +1,38 @@
+"""Tests for the normalized team and date keys"""
+
+import pytest
+
+from match_keys import make_date_int, make_team_key, today_int
+
+
+@pytest.mark.parametrize("name", ["RM VOLLEY #18", "RMVOLLEY#18", "rm volley 18", " Rm-Volley 18 "])
+def test_make_team_key_ignores_case_spaces_and_punctuation(name):
+    assert make_team_key(name) == "RMVOLLEY18"
+
+
+def test_make_team_key_keeps_teams_apart():
+    assert make_team_key("RM VOLLEY #18") != make_team_key("RM VOLLEY #1")
+
+
+def test_make_team_key_non_string():
+    assert make_team_key(18) == "18"
+
+
+@pytest.mark.parametrize("value,expected", [
+    ("05/01/2026", 20260105),
+    (" 31/12/2025 ", 20251231),
+    ("2026-01-05", None),
+    ("", None),
+    (None, None),
+    ("31/02/2026", None),
+])
+def test_make_date_int(value, expected):
+    assert make_date_int(value) == expected
+
+
+def test_date_ints_sort_chronologically():
+    assert make_date_int("31/12/2025") < make_date_int("01/01/2026")
+
+
+def test_today_int_is_a_date():
+    assert len(str(today_int())) == 8
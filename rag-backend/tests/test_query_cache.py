@@ -0,0 +1,61 @@
+"""Tests for the query embedding cache of the retriever"""
+
+import pytest
+
+pytest.importorskip("chromadb")
+
+from retriever import QueryEmbeddingCache, VectorRetriever
+
+
+class RecordingEmbedder:
+    def __init__(self):
+        self.queries = []
+
+    def embed_query(self, text):
+        self.queries.append(text)
+        return [float(len(self.queries))]
+
+
+@pytest.fixture
+def retriever():
+    # Skip __init__: no collection or model is needed to embed queries
+    retriever = VectorRetriever.__new__(VectorRetriever)
+    retriever.embedder = RecordingEmbedder()
+    retriever.query_cache = QueryEmbeddingCache(max_size=8, ttl=60)
+    return retriever
+
+
+def test_whitespace_variants_share_one_embedding(retriever):
+    first = retriever.embed_query("Quando gioca  RM Volley 18? ")
+    second = retriever.embed_query("Quando gioca RM Volley 18?")
+
+    assert first == second
+    assert retriever.embedder.queries == ["Quando gioca RM Volley 18?"]
+
+
+def test_embed_query_keeps_original_casing(retriever):
+    retriever.embed_query("Quando gioca RMVOLLEY#18?")
+    retriever.embed_query("quando gioca rmvolley#18?")
+
+    # Passages were embedded with their casing: queries keep theirs too
+    assert retriever.embedder.queries == ["Quando gioca RMVOLLEY#18?", "quando gioca rmvolley#18?"]
+
+
+def test_query_cache_evicts_least_recently_used():
+    cache = QueryEmbeddingCache(max_size=2, ttl=60)
+    cache.put("a", [1.0])
+    cache.put("b", [2.0])
+    cache.get("a")
+    cache.put("c", [3.0])
+
+    assert cache.get("b") is None
+    assert cache.get("a") == [1.0]
+    assert cache.get("c") == [3.0]
+
+
+def test_query_cache_expires_entries():
+    cache = QueryEmbeddingCache(max_size=2, ttl=-1)
+    cache.put("a", [1.0])
+
+    assert cache.get("a") is None
+    assert cache.get_stats()["size"] == 0
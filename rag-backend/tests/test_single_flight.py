@@ -0,0 +1,72 @@
+"""Tests for the coalescing of identical in-flight generations"""
+
+import asyncio
+
+from single_flight import SingleFlight
+
+
+def make_source(pieces, started, release=None, fail=False):
+    """Generation factory counting how many generations were started"""
+    def factory():
+        async def generate():
+            started.append(1)
+            for piece in pieces:
+                if release is not None:
+                    await release.wait()
+                yield piece
+            if fail:
+                raise ValueError("LLM down")
+        return generate()
+    return factory
+
+
+def test_concurrent_requests_share_one_generation():
+    async def scenario():
+        flight, started, release = SingleFlight(), [], asyncio.Event()
+        first, is_leader = flight.join("key", make_source(["Sabato ", "alle 18"], started, release))
+        second, is_follower_leader = flight.join("key", make_source(["altro"], started))
+
+        results = asyncio.gather(first.result(), second.result())
+        release.set()
+        return await results, is_leader, is_follower_leader, flight, started
+
+    (first, second), is_leader, is_follower_leader, flight, started = asyncio.run(scenario())
+
+    assert first == second == "Sabato alle 18"
+    assert (is_leader, is_follower_leader) == (True, False)
+    assert len(started) == 1
+    assert flight.get_stats() == {"in_flight": 0, "started": 1, "coalesced": 1}
+
+
+def test_late_subscriber_replays_earlier_pieces():
+    async def scenario():
+        flight, started = SingleFlight(), []
+        generation, _ = flight.join("key", make_source(["a", "b", "c"], started))
+        await generation.task
+        return [piece async for piece in generation.subscribe()]
+
+    assert asyncio.run(scenario()) == ["a", "b", "c"]
+
+
+def test_finished_generation_is_not_reused():
+    async def scenario():
+        flight, started = SingleFlight(), []
+        generation, _ = flight.join("key", make_source(["a"], started))
+        await generation.result()
+        await generation.task
+        again, is_leader = flight.join("key", make_source(["b"], started))
+        return await again.result(), is_leader, started
+
+    text, is_leader, started = asyncio.run(scenario())
+    assert (text, is_leader, len(started)) == ("b", True, 2)
+
+
+def test_errors_reach_every_subscriber():
+    async def scenario():
+        flight, started = SingleFlight(), []
+        first, _ = flight.join("key", make_source(["a"], started, fail=True))
+        second, _ = flight.join("key", make_source(["a"], started))
+        return await asyncio.gather(first.result(), second.result(), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(result, RuntimeError) and "LLM down" in str(result) for result in results)
@@ -0,0 +1,100 @@
+"""Tests for the templated standings and schedule answers"""
+
+import json
+
+import pytest
+
+import structured_answers
+from structured_answers import (
+    StandingsFile, get_structured_intent, render_next_matches, render_standings,
+    render_structured_answer,
+)
+
+LEAGUES = {
+    "Serie D": [
+        {"Pos.": "2", "Squadra": "RM VOLLEY #18", "Punti": "20", "PV": "7", "PP": "2", "SF": "23", "SS": "10"},
+        {"Pos.": "1", "Squadra": "Pallavolo Roma", "Punti": "24", "PV": "8", "PP": "1", "SF": "25", "SS": "6"},
+    ],
+    "Under 16": [
+        {"Pos.": "1", "Squadra": "RM VOLLEY #16", "Punti": "-", "PV": "", "PP": None, "SF": "0", "SS": "0"},
+    ],
+}
+
+
+def make_route(team=None, standings=False, past=False, future=False, stats=False):
+    return {"detected_team": team, "is_standings_query": standings, "is_past_query": past,
+            "is_future_query": future, "is_stats_query": stats}
+
+
+def make_match(date_int, home="RM VOLLEY #18", away="Pallavolo Roma"):
+    return {"date_int": date_int, "time": "18:00", "home_team": home, "away_team": away,
+            "is_home": True, "rm_team": "RM VOLLEY #18", "league": "Serie D", "venue": "Palestra"}
+
+
+@pytest.fixture(autouse=True)
+def fixed_today(monkeypatch):
+    monkeypatch.setattr(structured_answers, "today_int", lambda: 20260110)
+
+
+@pytest.mark.parametrize("route,question,expected", [
+    (make_route(standings=True), "Classifica serie D", "standings"),
+    (make_route(team="RM VOLLEY #18", future=True), "Quando gioca la 18?", "next_matches"),
+    (make_route(team="RM VOLLEY #18", future=True), "La 18 vincerà sabato?", None),
+    (make_route(standings=True, past=True), "Com'era la classifica?", None),
+    (make_route(future=True), "Prossime partite?", None),
+])
+def test_get_structured_intent(route, question, expected):
+    assert get_structured_intent(route, question) == expected
+
+
+def test_render_standings_orders_by_position_and_repeats_team():
+    text = render_standings(LEAGUES, [], "rm volley 18")
+
+    lines = text.splitlines()
+    assert lines[0] == "Classifica Serie D:"
+    assert lines[1].startswith("1. Pallavolo Roma - 24 punti")
+    assert lines[2] == "2. RM VOLLEY #18 - 20 punti (7 vittorie, 2 sconfitte, set 23-10)"
+    assert lines[-1] == "RM VOLLEY #18 è in posizione 2 con 20 punti."
+
+
+def test_render_standings_without_team_uses_best_league():
+    text = render_standings(LEAGUES, ["Under 16", "Serie D"])
+    assert text == "Classifica Under 16:\n1. RM VOLLEY #16 - 0 punti (0 vittorie, 0 sconfitte, set 0-0)"
+    assert render_standings(LEAGUES, ["Serie C"]) is None
+
+
+def test_render_next_matches_single_and_list():
+    single = render_next_matches("RM VOLLEY #18", [make_match(20260117)])
+    assert single == ("La prossima partita di RM VOLLEY #18 è sabato 17/01/2026 alle 18:00: "
+                      "RM VOLLEY #18 vs Pallavolo Roma (in casa). Campionato: Serie D. Impianto: Palestra.")
+
+    several = render_next_matches("RM VOLLEY #18", [make_match(20260110), make_match(20260117)])
+    assert several.splitlines()[0] == "Le prossime partite di RM VOLLEY #18:"
+    assert len(several.splitlines()) == 3
+
+
+def test_render_next_matches_drops_past_matches():
+    text = render_next_matches("RM VOLLEY #18", [make_match(20260103), make_match(20260117)])
+    assert "03/01/2026" not in text
+    assert text.startswith("La prossima partita di RM VOLLEY #18 è sabato 17/01/2026")
+
+
+@pytest.mark.parametrize("metadatas", [[make_match(20260103)], [make_match(None)]])
+def test_render_next_matches_without_future_matches_goes_to_llm(metadatas):
+    assert render_next_matches("RM VOLLEY #18", metadatas) is None
+
+
+def test_render_next_matches_none_retrieved():
+    assert render_next_matches("RM VOLLEY #18", []) == "Non ci sono partite in programma per RM VOLLEY #18."
+
+
+def test_render_structured_answer_standings(tmp_path):
+    path = tmp_path / "classifica.json"
+    path.write_text(json.dumps(LEAGUES), encoding="utf-8")
+    results = {"metadatas": [{"type": "standing", "league": "Serie D"}, {"type": "match"}]}
+
+    text = render_structured_answer("standings", make_route(standings=True), results, StandingsFile(str(path)))
+
+    assert text.startswith("Classifica Serie D:")
+    assert render_structured_answer("standings", make_route(standings=True), results,
+                                    StandingsFile(str(tmp_path / "missing.json"))) is None
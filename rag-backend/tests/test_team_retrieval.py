@@ -0,0 +1,67 @@
+"""Tests for the metadata-filtered team retrieval"""
+
+import pytest
+
+pytest.importorskip("chromadb")
+
+from retriever import VectorRetriever
+from vector_index import NumpyVectorIndex
+
+
+class FakeCollection:
+    name = "rm_volley_test"
+
+    def __init__(self, metadatas):
+        self.ids = [f"match_{i}" for i in range(len(metadatas))]
+        self.metadatas = metadatas
+
+    def count(self):
+        return len(self.ids)
+
+    def get(self, include=None, limit=None, offset=0):
+        end = offset + limit
+        return {
+            "ids": self.ids[offset:end],
+            "documents": [f"doc {i}" for i in self.ids[offset:end]],
+            "metadatas": self.metadatas[offset:end],
+            "embeddings": [[0.0, 0.0]] * len(self.ids[offset:end]),
+        }
+
+
+def played(team_key, date_int):
+    return {"type": "match", "rm_team": team_key, "team_key": team_key, "date_int": date_int, "has_result": True}
+
+
+@pytest.fixture
+def retriever():
+    retriever = VectorRetriever.__new__(VectorRetriever)
+    retriever.collection = NumpyVectorIndex(FakeCollection([
+        played("RMVOLLEY18", 20251201),
+        played("RMVOLLEY1", 20251210),
+        played("RMVOLLEY16", 20251205),
+        {"type": "standing", "league": "Serie D"},
+    ]))
+    retriever.collection_name = "rm_volley_test"
+    retriever._filter_keys = {}
+    retriever._team_keys = {}
+    return retriever
+
+
+def test_exact_team_name(retriever):
+    assert retriever.retrieve_by_team("RM VOLLEY #18")["ids"] == ["match_0"]
+    # "#1" is a key of its own, not a prefix of #16 and #18
+    assert retriever.retrieve_by_team("RM VOLLEY #1")["ids"] == ["match_1"]
+
+
+def test_partial_team_name_matches_every_team_containing_it(retriever):
+    results = retriever.retrieve_by_team("RMVOLLEY")
+
+    # Most recent first
+    assert results["ids"] == ["match_1", "match_2", "match_0"]
+    assert retriever.resolve_team_keys("volley 16") == ["RMVOLLEY16"]
+    assert retriever.resolve_team_keys("volley 1") == ["RMVOLLEY1", "RMVOLLEY16", "RMVOLLEY18"]
+
+
+def test_unknown_team_returns_nothing(retriever):
+    assert retriever.retrieve_by_team("Pallavolo Roma")["ids"] == []
+    assert retriever.retrieve_by_team("###")["ids"] == []
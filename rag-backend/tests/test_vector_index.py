@@ -0,0 +1,77 @@
+"""Tests for the in-memory NumPy vector index"""
+
+import numpy as np
+import pytest
+
+from vector_index import NumpyVectorIndex
+
+
+class FakeCollection:
+    """Minimal ChromaDB collection serving get() in pages"""
+
+    name = "rm_volley_test"
+
+    def __init__(self, ids, metadatas, embeddings):
+        self.ids = ids
+        self.metadatas = metadatas
+        self.embeddings = embeddings
+
+    def count(self):
+        return len(self.ids)
+
+    def get(self, include=None, limit=None, offset=0):
+        end = offset + limit
+        return {
+            "ids": self.ids[offset:end],
+            "documents": [f"doc {i}" for i in self.ids[offset:end]],
+            "metadatas": self.metadatas[offset:end],
+            "embeddings": self.embeddings[offset:end],
+        }
+
+
+@pytest.fixture
+def index():
+    metadatas = [
+        {"type": "match", "team_key": "RMVOLLEY18", "date_int": 20260105},
+        {"type": "match", "team_key": "RMVOLLEY1", "date_int": 20260112},
+        {"type": "standing", "league": "Serie D"},
+        {"type": "match", "team_key": "RMVOLLEY18", "date_int": "n/d"},
+    ]
+    embeddings = [[1.0, 0.0], [0.0, 1.0], [1.0, 1.0], [0.5, 0.0]]
+    return NumpyVectorIndex(FakeCollection(["a", "b", "c", "d"], metadatas, embeddings))
+
+
+def ids_where(index, where):
+    return index.get(where=where)["ids"]
+
+
+def test_query_orders_by_squared_l2(index):
+    results = index.query(query_embeddings=[[1.0, 0.0]], n_results=3)
+
+    assert results["ids"] == [["a", "d", "c"]]
+    assert np.allclose(results["distances"][0], [0.0, 0.25, 1.0])
+
+
+def test_equality_and_ranges(index):
+    assert ids_where(index, {"type": "standing"}) == ["c"]
+    assert ids_where(index, {"date_int": {"$gte": 20260110}}) == ["b"]
+    assert ids_where(index, {"$and": [{"team_key": "RMVOLLEY18"}, {"date_int": {"$lt": 20260110}}]}) == ["a"]
+    assert ids_where(index, {"$or": [{"type": "standing"}, {"team_key": "RMVOLLEY1"}]}) == ["b", "c"]
+
+
+def test_negative_operators_skip_documents_without_the_key(index):
+    # The standing has no team_key or date_int, like in ChromaDB it never matches
+    assert ids_where(index, {"team_key": {"$ne": "RMVOLLEY1"}}) == ["a", "d"]
+    assert ids_where(index, {"team_key": {"$nin": ["RMVOLLEY1"]}}) == ["a", "d"]
+    # Numeric $ne skips the string date as well
+    assert ids_where(index, {"date_int": {"$ne": 20260105}}) == ["b"]
+    assert ids_where(index, {"unknown": {"$ne": "x"}}) == []
+
+
+def test_returned_metadata_are_copies(index):
+    metadata = index.query(query_embeddings=[[1.0, 0.0]], n_results=1)["metadatas"][0][0]
+    metadata["_parsed_date"] = "annotated"
+    index.get(ids=["a"])["metadatas"][0]["extra"] = 1
+
+    assert index.get(ids=["a"])["metadatas"][0] == {
+        "type": "match", "team_key": "RMVOLLEY18", "date_int": 20260105}
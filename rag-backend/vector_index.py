@@ -0,0 +1,266 @@
+"""
+Vector Index Module
+In-memory exact search over a ChromaDB collection with NumPy
+"""
+
+import os
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+# Backend and matrix precision - can be overridden via VECTOR_BACKEND / VECTOR_DTYPE
+DEFAULT_VECTOR_BACKEND = "chroma"
+DEFAULT_VECTOR_DTYPE = "float32"
+
+# Rows read from ChromaDB per get() call while loading
+LOAD_BATCH_SIZE = 5000
+
+# Comparison operators of ChromaDB where filters
+COMPARISONS = {
+    "$eq": np.equal,
+    "$ne": np.not_equal,
+    "$gt": np.greater,
+    "$gte": np.greater_equal,
+    "$lt": np.less,
+    "$lte": np.less_equal,
+}
+
+
+def get_vector_backend() -> str:
+    """Configured retrieval backend: chroma (default) or numpy"""
+    backend = os.getenv("VECTOR_BACKEND", DEFAULT_VECTOR_BACKEND).lower()
+    if backend not in ("chroma", "numpy"):
+        print(f"⚠️  Unknown VECTOR_BACKEND '{backend}', using chroma")
+        return "chroma"
+    return backend
+
+
+class MetadataColumn:
+    """One metadata key across all documents, stored column-wise"""
+
+    def __init__(self, values: List[Any]):
+        """
+        Build the column
+
+        Args:
+            values: Value of the key for each document (None where missing)
+        """
+        self.present = np.array([value is not None for value in values], dtype=bool)
+        self.values = np.empty(len(values), dtype=object)
+        self.values[:] = values
+
+        # Numeric copy for range filters (bools are kept apart, as in ChromaDB)
+        numeric = [
+            float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else np.nan
+            for value in values
+        ]
+        self.numbers = np.array(numeric, dtype=np.float64)
+
+    def compare(self, operator: str, operand: Any) -> np.ndarray:
+        """
+        Boolean mask of the documents satisfying `key <operator> operand`
+
+        As in ChromaDB, documents without the key (or, for comparisons, with
+        a value of another type) never match, $ne and $nin included.
+        """
+        if operator == "$in":
+            return self.present & np.isin(self.values, list(operand))
+        if operator == "$nin":
+            return self.present & ~np.isin(self.values, list(operand))
+
+        if operator not in COMPARISONS:
+            raise ValueError(f"Unsupported where operator: {operator}")
+
+        if isinstance(operand, (int, float)) and not isinstance(operand, bool):
+            with np.errstate(invalid="ignore"):
+                mask = COMPARISONS[operator](self.numbers, float(operand))
+            # NaN (missing or not a number) only satisfies !=
+            return mask if operator != "$ne" else mask & ~np.isnan(self.numbers)
+        if operator not in ("$eq", "$ne"):
+            raise ValueError(f"{operator} needs a number, got {operand!r}")
+
+        # Exact type match: True must not equal 1, "1" must not equal 1
+        same_type = np.fromiter((type(value) is type(operand) for value in self.values),
+                                dtype=bool, count=len(self.values))
+        equal = np.fromiter(
+            (type(value) is type(operand) and value == operand for value in self.values),
+            dtype=bool, count=len(self.values))
+        return equal if operator == "$eq" else same_type & ~equal
+
+
+class NumpyVectorIndex:
+    """
+    Brute-force exact search over a snapshot of a ChromaDB collection
+
+    All embeddings are held in one contiguous matrix with precomputed squared
+    norms, metadata in per-key columns. A query is one matrix-vector product,
+    a vectorized where mask and an argpartition. Distances are squared L2,
+    like ChromaDB's default space, so they are interchangeable with the
+    Chroma path.
+
+    Exposes the subset of the ChromaDB Collection API used by VectorRetriever
+    (query, get, count); the ChromaDB collection stays the source of truth.
+    """
+
+    def __init__(self, collection, dtype: str = None):
+        """
+        Load a collection into memory
+
+        Args:
+            collection: ChromaDB collection to snapshot
+            dtype: Matrix precision, float32 or float16 (default: from .env or float32)
+        """
+        self.name = collection.name
+        self.dtype = np.dtype(dtype or os.getenv("VECTOR_DTYPE", DEFAULT_VECTOR_DTYPE))
+        if self.dtype not in (np.float32, np.float16):
+            raise ValueError(f"VECTOR_DTYPE must be float32 or float16, got {self.dtype}")
+
+        ids, documents, metadatas, embeddings = [], [], [], []
+        total = collection.count()
+        for offset in range(0, total, LOAD_BATCH_SIZE):
+            batch = collection.get(
+                include=["documents", "metadatas", "embeddings"],
+                limit=LOAD_BATCH_SIZE,
+                offset=offset
+            )
+            ids += batch["ids"]
+            documents += batch["documents"]
+            metadatas += batch["metadatas"]
+            embeddings += list(batch["embeddings"])
+
+        self.ids = ids
+        self.documents = documents
+        self.metadatas = [metadata or {} for metadata in metadatas]
+
+        dimension = len(embeddings[0]) if embeddings else 0
+        matrix = np.asarray(embeddings, dtype=np.float32).reshape(len(ids), dimension)
+        # Norms from the float32 values, products in the stored precision
+        self.norms = np.einsum("ij,ij->i", matrix, matrix)
+        self.matrix = np.ascontiguousarray(matrix, dtype=self.dtype)
+
+        keys = sorted({key for metadata in self.metadatas for key in metadata})
+        self.columns = {
+            key: MetadataColumn([metadata.get(key) for metadata in self.metadatas])
+            for key in keys
+        }
+
+    def count(self) -> int:
+        """Number of documents in the index"""
+        return len(self.ids)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get index statistics"""
+        return {
+            "backend": "numpy",
+            "dtype": self.dtype.name,
+            "documents": self.count(),
+            "matrix_mb": round((self.matrix.nbytes + self.norms.nbytes) / 1024 / 1024, 2)
+        }
+
+    def where_mask(self, where: Optional[Dict[str, Any]]) -> np.ndarray:
+        """
+        Evaluate a ChromaDB where filter over all documents
+
+        Args:
+            where: Filter such as {"type": "match"} or {"$and": [...]}
+
+        Returns:
+            Boolean mask with one entry per document
+        """
+        mask = np.ones(self.count(), dtype=bool)
+        for key, condition in (where or {}).items():
+            if key in ("$and", "$or"):
+                masks = [self.where_mask(clause) for clause in condition]
+                combined = np.logical_and.reduce(masks) if key == "$and" else np.logical_or.reduce(masks)
+                mask &= combined
+                continue
+
+            column = self.columns.get(key)
+            if not isinstance(condition, dict):
+                condition = {"$eq": condition}
+            for operator, operand in condition.items():
+                if column is None:
+                    # No document has the key: nothing matches, $ne and $nin included
+                    mask[:] = False
+                else:
+                    mask &= column.compare(operator, operand)
+        return mask
+
+    def query(self,
+              query_embeddings: List[List[float]],
+              n_results: int = 10,
+              where: Optional[Dict[str, Any]] = None,
+              **kwargs) -> Dict[str, List[List[Any]]]:
+        """
+        Exact nearest neighbours, in the ChromaDB query() result format
+
+        Args:
+            query_embeddings: Query vectors
+            n_results: Number of results per query
+            where: Optional metadata filter
+
+        Returns:
+            Dictionary of ids, documents, metadatas and distances (one list per query)
+        """
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        candidates = np.flatnonzero(self.where_mask(where))
+        k = min(n_results, len(candidates))
+        # Unfiltered queries use the matrix in place instead of a gathered copy
+        matrix, norms = (self.matrix, self.norms) if len(candidates) == self.count() else \
+            (self.matrix[candidates], self.norms[candidates])
+
+        results = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+        for query in queries:
+            if k == 0:
+                top, distances = np.array([], dtype=int), np.array([])
+            else:
+                # |x - q|^2 = |x|^2 - 2 x.q + |q|^2
+                scores = matrix @ query.astype(self.dtype)
+                distances = norms - 2 * scores.astype(np.float32) + query @ query
+                top = np.argpartition(distances, k - 1)[:k] if k < len(candidates) else np.arange(k)
+                top = top[np.argsort(distances[top], kind="stable")]
+                distances = np.maximum(distances[top], 0.0)
+                top = candidates[top]
+
+            results["ids"].append([self.ids[i] for i in top])
+            results["documents"].append([self.documents[i] for i in top])
+            # Copies: callers annotate results, the snapshot must stay intact
+            results["metadatas"].append([dict(self.metadatas[i]) for i in top])
+            results["distances"].append([float(d) for d in distances])
+        return results
+
+    def get(self,
+            ids: Optional[List[str]] = None,
+            where: Optional[Dict[str, Any]] = None,
+            limit: Optional[int] = None,
+            offset: int = 0,
+            include: Optional[List[str]] = None) -> Dict[str, List[Any]]:
+        """
+        Documents matching ids and/or a where filter, in the ChromaDB get() result format
+
+        Args:
+            ids: Optional document ids
+            where: Optional metadata filter
+            limit: Maximum number of documents
+            offset: Documents to skip
+            include: Fields to return (documents, metadatas, embeddings)
+
+        Returns:
+            Dictionary of ids plus the included fields
+        """
+        include = include if include is not None else ["documents", "metadatas"]
+        mask = self.where_mask(where)
+        if ids is not None:
+            mask &= np.isin(np.array(self.ids, dtype=object), list(ids))
+        selected = np.flatnonzero(mask)[offset:]
+        if limit is not None:
+            selected = selected[:limit]
+
+        result = {"ids": [self.ids[i] for i in selected]}
+        if "documents" in include:
+            result["documents"] = [self.documents[i] for i in selected]
+        if "metadatas" in include:
+            result["metadatas"] = [dict(self.metadatas[i]) for i in selected]
+        if "embeddings" in include:
+            result["embeddings"] = self.matrix[selected].astype(np.float32).tolist()
+        return result
@@ -108,8 +108,11 @@ async function sendQuestion(question) {
     // Add loading message
     const loadingId = addLoadingMessage();
 
+    let messageDiv = null;
+    let answer = '';
+
     try {
-        const response = await fetch(`${API_BASE_URL}/ask`, {
+        const response = await fetch(`${API_BASE_URL}/ask/stream`, {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',
@@ -127,24 +130,34 @@ async function sendQuestion(question) {
             throw new Error(errorData.detail || 'API request failed');
         }
 
-        const data = await response.json();
-
-        // Remove loading message
-        removeMessage(loadingId);
-
-        // Add assistant response
-        addAssistantMessage(data.answer, data.sources);
+        // Sources arrive first, then the answer token by token
+        for await (const { event, data } of readServerSentEvents(response)) {
+            if (event === 'sources') {
+                removeMessage(loadingId);
+                messageDiv = addAssistantMessage('', data.sources);
+            } else if (event === 'token') {
+                answer += data.text;
+                updateAssistantMessage(messageDiv, answer);
+            } else if (event === 'done') {
+                console.log(`Risposta: primo token ${data.ttft_ms} ms, totale ${data.total_ms} ms`);
+            } else if (event === 'error') {
+                throw new Error(data.detail);
+            }
+        }
 
         // Save to history
         conversationHistory.push({
             question: question,
-            answer: data.answer,
+            answer: answer,
             timestamp: new Date().toISOString()
         });
 
     } catch (error) {
         console.error('Error asking question:', error);
         removeMessage(loadingId);
+        if (messageDiv && !answer) {
+            messageDiv.remove();
+        }
 
         if (error.name === 'TimeoutError') {
             addErrorMessage('La richiesta ha impiegato troppo tempo. Riprova.');
@@ -160,6 +173,35 @@ async function sendQuestion(question) {
     }
 }
 
+/**
+ * Parse a Server-Sent Events response body into {event, data} objects
+ */
+async function* readServerSentEvents(response) {
+    const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+    let buffer = '';
+
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += value;
+
+        // Events are separated by a blank line
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const block = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+
+            let event = 'message';
+            let data = '';
+            block.split('\n').forEach(line => {
+                if (line.startsWith('event:')) event = line.slice(6).trim();
+                else if (line.startsWith('data:')) data += line.slice(5).trim();
+            });
+            yield { event, data: data ? JSON.parse(data) : {} };
+        }
+    }
+}
+
 /**
  * Add user message to chat
  */
@@ -249,6 +291,15 @@ function addAssistantMessage(text, sources = []) {
 
     messagesDiv.appendChild(messageDiv);
     scrollToBottom();
+    return messageDiv;
+}
+
+/**
+ * Replace the text of an assistant message (while the answer streams in)
+ */
+function updateAssistantMessage(messageDiv, text) {
+    messageDiv.querySelector('.message-content').innerHTML = formatMessage(text);
+    scrollToBottom();
 }
 
 /**
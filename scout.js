@@ -3,6 +3,7 @@
 // ====================================
 
 import { getCurrentUser } from './auth-simple.js';
+import { loadMatchRows } from './utils.js';
 import {
     initializeFirebase,
     saveScoutSession,
@@ -79,14 +80,10 @@ function populatePlayerRoles() {
     }
 }
 
-// Load matches from Gare.xls
+// Load matches (JSON artifact, Gare.xls as fallback)
 async function loadMatches() {
     try {
-        const response = await fetch('Gare.xls');
-        const arrayBuffer = await response.arrayBuffer();
-        const workbook = XLSX.read(arrayBuffer, { type: 'array' });
-        const firstSheet = workbook.Sheets[workbook.SheetNames[0]];
-        const data = XLSX.utils.sheet_to_json(firstSheet);
+        const data = await loadMatchRows();
 
         // Get today's date in DD/MM/YYYY format
         const today = new Date();
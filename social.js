@@ -3,6 +3,7 @@
 // ====================================
 
 import { getCurrentUser } from './auth-simple.js';
+import { loadMatchRows } from './utils.js';
 
 let config = null;
 let allMatches = [];
@@ -31,18 +32,11 @@ document.addEventListener('DOMContentLoaded', async () => {
     }
 });
 
-// Load all matches from Gare.xls
+// Load all matches (JSON artifact, Gare.xls as fallback)
 async function loadMatches() {
     try {
-        console.log('📥 Loading Gare.xls...');
-        const response = await fetch('Gare.xls');
-        if (!response.ok) {
-            throw new Error(`HTTP error! status: ${response.status}`);
-        }
-        const arrayBuffer = await response.arrayBuffer();
-        const workbook = XLSX.read(arrayBuffer, { type: 'array' });
-        const firstSheet = workbook.Sheets[workbook.SheetNames[0]];
-        allMatches = XLSX.utils.sheet_to_json(firstSheet);
+        console.log('📥 Loading matches...');
+        allMatches = await loadMatchRows();
 
         console.log(`✅ Loaded ${allMatches.length} matches`);
         if (allMatches.length > 0) {
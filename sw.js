@@ -1,8 +1,8 @@
 // RM Volley Dashboard - Enhanced Service Worker
 // Strategic caching for offline capability
 
-const STATIC_CACHE = 'rm-volley-static-v6';
-const DATA_CACHE = 'rm-volley-data-v6';
+const STATIC_CACHE = 'rm-volley-static-v7';
+const DATA_CACHE = 'rm-volley-data-v7';
 
 // Critical static assets that should be cached immediately
 const staticAssets = [
@@ -72,7 +72,10 @@ self.addEventListener('fetch', event => {
   const url = new URL(request.url);
   
   // Handle different request types with different strategies
-  if (isDataRequest(request.url)) {
+  if (isImmutableDataRequest(request.url)) {
+    // Content-hashed data artifacts never change: serve from cache when present
+    event.respondWith(cacheFirstStrategy(request, DATA_CACHE));
+  } else if (isDataRequest(request.url)) {
     // Network-first for data files to ensure freshness
     event.respondWith(networkFirstStrategy(request));
   } else if (isStaticRequest(request.url)) {
@@ -84,6 +87,11 @@ self.addEventListener('fetch', event => {
   }
 });
 
+// Check if request is for a content-hashed artifact (e.g. /data/matches.<hash>.json)
+function isImmutableDataRequest(url) {
+  return /\/data\/.+\.[0-9a-f]{12}\.json$/.test(new URL(url).pathname);
+}
+
 // Check if request is for data files
 function isDataRequest(url) {
   return dataAssets.some(asset => url.includes(asset)) || 
@@ -131,8 +139,8 @@ function networkFirstStrategy(request) {
     });
 }
 
-// Cache-first strategy (for static assets)
-function cacheFirstStrategy(request) {
+// Cache-first strategy (for static assets and hashed data artifacts)
+function cacheFirstStrategy(request, cacheName = STATIC_CACHE) {
   return caches.match(request)
     .then(response => {
       if (response) {
@@ -143,7 +151,7 @@ function cacheFirstStrategy(request) {
       return fetch(request).then(response => {
         if (response.ok) {
           const responseToCache = response.clone();
-          caches.open(STATIC_CACHE).then(cache => {
+          caches.open(cacheName).then(cache => {
             cache.put(request, responseToCache);
           });
         }
@@ -152,12 +160,6 @@ function cacheFirstStrategy(request) {
     });
 }
 
-          return response;
-        });
-      })
-  );
-});
-
 // Activate event - clean up old caches
 self.addEventListener('activate', event => {
   console.log('🔄 Service Worker activating...');
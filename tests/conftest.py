@@ -0,0 +1,24 @@
+"""Shared fixtures for the update_gare.py tests"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import update_gare  # noqa: E402
+
+
+@pytest.fixture
+def config(monkeypatch):
+    """Minimal config.json content, with fast download settings"""
+    settings = {
+        'team': {'name': 'RM Volley'},
+        'dataSources': [],
+        'leagues': {},
+        'output': {'matchesFile': 'Gare.xls', 'standingsFile': 'classifica.json'},
+        'fetch': {'maxWorkers': 4, 'maxPerHost': 4, 'hostDelay': 0, 'timeout': 5, 'deadline': 0.5}
+    }
+    monkeypatch.setattr(update_gare, 'config', settings)
+    return settings
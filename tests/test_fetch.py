@@ -0,0 +1,61 @@
+"""Tests for the concurrent downloads of update_gare.py"""
+
+import time
+
+import update_gare
+from update_gare import FETCH_CHANGED, FETCH_FAILED
+
+
+def test_run_concurrently_keeps_order(config):
+    urls = ['http://a/1', 'http://b/2', 'http://a/3']
+    results = update_gare.run_concurrently(urls, lambda index, url, deadline: url.upper())
+    assert results == ['HTTP://A/1', 'HTTP://B/2', 'HTTP://A/3']
+
+
+def test_run_concurrently_ignores_results_after_deadline(config):
+    late = []
+
+    def worker(index, url, deadline):
+        if index == 1:
+            time.sleep(1.0)
+            late.append(url)
+        return index
+
+    results = update_gare.run_concurrently(['http://a/0', 'http://b/1'], worker, default='timeout')
+    assert results == [0, 'timeout']
+
+    time.sleep(1.0)
+    assert late == ['http://b/1']
+    assert results == [0, 'timeout']
+
+
+def test_download_all_leaves_shared_state_to_main_thread(config, monkeypatch, tmp_path):
+    fetch_state = {'http://a/0': {'sha256': 'old'}}
+    urls = ['http://a/0', 'http://b/1']
+
+    def fake_download(url, filename, timeout=30, deadline=None, fetch_state=None):
+        if url == 'http://b/1':
+            time.sleep(1.0)  # finishes after the deadline
+        fetch_state[url] = {'sha256': 'new ' + url}
+        return FETCH_CHANGED
+
+    monkeypatch.setattr(update_gare, 'download_excel', fake_download)
+    results, downloads = update_gare.download_all(urls, [str(tmp_path / 'f0'), str(tmp_path / 'f1')], fetch_state)
+
+    assert results == [FETCH_CHANGED, FETCH_FAILED]
+    assert downloads == {'http://a/0': {'sha256': 'new http://a/0'}}
+    time.sleep(1.0)
+    # Neither the finished nor the late download touched the shared state
+    assert fetch_state == {'http://a/0': {'sha256': 'old'}}
+
+
+def test_commit_fetch_state_updates_cached_copy(monkeypatch, tmp_path):
+    monkeypatch.setattr(update_gare, 'get_cached_copy_path', lambda url: tmp_path / 'cache' / 'copy.xls')
+    downloaded = tmp_path / 'Gare_temp_1.xls'
+    downloaded.write_bytes(b'content')
+    fetch_state = {}
+
+    update_gare.commit_fetch_state(fetch_state, {'http://a/0': {'sha256': 'abc'}}, {'http://a/0': str(downloaded)})
+
+    assert fetch_state == {'http://a/0': {'sha256': 'abc'}}
+    assert (tmp_path / 'cache' / 'copy.xls').read_bytes() == b'content'
@@ -0,0 +1,110 @@
+"""Tests for the SQLite match store of update_gare.py"""
+
+import pandas as pd
+import pytest
+
+import update_gare
+
+SOURCE_A = 'https://example.org/a/esporta'
+SOURCE_B = 'https://example.org/b/esporta'
+NOW = '2026-01-10T08:00:00'
+
+
+def make_row(gara, date='10/01/2026', result=None, home='RMVOLLEY#16', away='PONTENURE'):
+    return {'Campionato': 'UNDER 16', 'Gara N': gara, 'Data': date, 'Ora': '18:00',
+            'SquadraCasa': home, 'SquadraOspite': away, 'Risultato': result, 'Parziali': None,
+            'StatoDescrizione': 'da disputare', 'Impianto': 'PALESTRA'}
+
+
+@pytest.fixture
+def store(tmp_path, config):
+    connection = update_gare.open_match_store(str(tmp_path / 'matches.db'))
+    yield connection
+    connection.close()
+
+
+def active_matches(store):
+    return {r['gara_n']: r['source'] for r in store.execute('SELECT gara_n, source FROM matches WHERE active = 1')}
+
+
+def test_import_match_files_reports_unreadable_sources(store, tmp_path):
+    good = tmp_path / 'good.xlsx'
+    pd.DataFrame([make_row(101)]).to_excel(good, index=False)
+    bad = tmp_path / 'bad.xls'
+    bad.write_bytes(b'not a spreadsheet')
+
+    failed = []
+    changes = update_gare.import_match_files(store, {SOURCE_A: str(good), SOURCE_B: str(bad)},
+                                             [SOURCE_A, SOURCE_B], failed_sources=failed)
+
+    assert changes == 1
+    assert failed == [SOURCE_B]
+    assert active_matches(store) == {'101': SOURCE_A}
+
+
+def upsert(store, rows, source, events=None):
+    return update_gare.upsert_matches(store, pd.DataFrame(rows), source, [SOURCE_A, SOURCE_B], NOW, events)
+
+
+def test_upsert_matches_inserts_updates_and_skips_unchanged(store):
+    assert upsert(store, [make_row(101), make_row(102)], SOURCE_A)['inserted'] == 2
+
+    events = []
+    stats = upsert(store, [make_row(101, result='3-0'), make_row(102)], SOURCE_A, events)
+
+    assert (stats['updated'], stats['unchanged']) == (1, 1)
+    assert [e['type'] for e in events] == ['match_result']
+
+
+def test_upsert_matches_first_source_wins_duplicates(store):
+    upsert(store, [make_row(101)], SOURCE_A)
+    stats = upsert(store, [make_row(101, date='11/01/2026'), make_row(201)], SOURCE_B)
+
+    assert stats['skipped'] == 1
+    assert active_matches(store) == {'101': SOURCE_A, '201': SOURCE_B}
+
+
+def test_upsert_matches_falls_back_to_lower_priority_source(store):
+    upsert(store, [make_row(101), make_row(102)], SOURCE_A)
+    upsert(store, [make_row(101, date='11/01/2026')], SOURCE_B)
+
+    events = []
+    stats = upsert(store, [make_row(102)], SOURCE_A, events)
+
+    # 101 disappeared from A but B still lists it: B's row takes over
+    assert (stats['updated'], stats['deactivated']) == (1, 0)
+    assert active_matches(store) == {'101': SOURCE_B, '102': SOURCE_A}
+    row = store.execute("SELECT data, data_iso FROM matches WHERE gara_n = '101'").fetchone()
+    assert (row['data'], row['data_iso']) == ('11/01/2026', '2026-01-11')
+    assert [e['type'] for e in events] == ['match_rescheduled']
+
+
+def test_upsert_matches_deactivates_when_no_source_lists_the_match(store):
+    upsert(store, [make_row(101), make_row(102)], SOURCE_A)
+
+    events = []
+    stats = upsert(store, [make_row(102)], SOURCE_A, events)
+
+    assert stats['deactivated'] == 1
+    assert active_matches(store) == {'102': SOURCE_A}
+    assert [e['type'] for e in events] == ['match_removed']
+
+
+def test_deactivate_removed_sources_falls_back(store):
+    upsert(store, [make_row(101)], SOURCE_A)
+    upsert(store, [make_row(101)], SOURCE_B)
+
+    changes = update_gare.deactivate_removed_sources(store, [SOURCE_B], NOW)
+
+    assert changes == 1
+    assert active_matches(store) == {'101': SOURCE_B}
+    assert not update_gare.store_has_source(store, SOURCE_A)
+
+
+def test_diff_match_rows_classifies_changes():
+    old = make_row(101)
+    assert update_gare.diff_match_rows(old, make_row(101, result='3-0'), '101', NOW)['type'] == 'match_result'
+    rescheduled = update_gare.diff_match_rows(old, make_row(101, date='12/01/2026'), '101', NOW)
+    assert rescheduled['type'] == 'match_rescheduled'
+    assert rescheduled['changes'] == {'Data': ['10/01/2026', '12/01/2026']}
+    assert update_gare.diff_match_rows(old, make_row(101, away='ALTRA'), '101', NOW)['type'] == 'match_updated'
@@ -0,0 +1,75 @@
+"""Tests for the in-process readers of the FIPAV exports"""
+
+import pandas as pd
+import pytest
+
+import update_gare
+
+SPREADSHEET_XML = """<?xml version="1.0"?>
+<Workbook xmlns="urn:schemas-microsoft-com:office:spreadsheet"
+          xmlns:ss="urn:schemas-microsoft-com:office:spreadsheet">
+ <Worksheet ss:Name="Gare">
+  <Table>
+   <Row><Cell><Data ss:Type="String">Gara N</Data></Cell><Cell><Data ss:Type="String">Data</Data></Cell>
+        <Cell><Data ss:Type="String">Risultato</Data></Cell></Row>
+   <Row><Cell><Data ss:Type="Number">101</Data></Cell><Cell><Data ss:Type="String">10/01/2026</Data></Cell>
+        <Cell><Data ss:Type="String">3-1</Data></Cell></Row>
+   <Row><Cell><Data ss:Type="Number">102</Data></Cell><Cell ss:Index="3"><Data ss:Type="String">0-3</Data></Cell></Row>
+  </Table>
+ </Worksheet>
+</Workbook>
+"""
+
+HTML_TABLE = """<html><body><table>
+<tr><td>Gara N</td><td>Data</td></tr>
+<tr><td>101</td><td>10/01/2026</td></tr>
+</table></body></html>"""
+
+
+@pytest.mark.parametrize('content, expected', [
+    (update_gare.BIFF_MAGIC + b'\x00' * 16, 'biff'),
+    (update_gare.XLSX_MAGIC + b'\x00' * 16, 'xlsx'),
+    (SPREADSHEET_XML.encode('utf-8'), 'xml2003'),
+    (b'\xef\xbb\xbf  ' + HTML_TABLE.encode('utf-8'), 'html'),
+    (HTML_TABLE.encode('utf-16'), 'html'),
+])
+def test_detect_file_format(tmp_path, content, expected):
+    path = tmp_path / 'Gare.xls'
+    path.write_bytes(content)
+    assert update_gare.detect_file_format(str(path)) == expected
+
+
+def test_detect_file_format_rejects_unknown_content(tmp_path):
+    path = tmp_path / 'Gare.xls'
+    path.write_bytes(b'%PDF-1.4')
+    with pytest.raises(ValueError):
+        update_gare.detect_file_format(str(path))
+
+
+def test_read_spreadsheet_xml_fills_skipped_cells(tmp_path):
+    path = tmp_path / 'Gare.xls'
+    path.write_text(SPREADSHEET_XML, encoding='utf-8')
+
+    df = update_gare.read_match_file(str(path))
+
+    assert list(df.columns) == ['Gara N', 'Data', 'Risultato']
+    assert df['Gara N'].tolist() == [101, 102]
+    assert pd.isna(df.iloc[1]['Data'])
+    assert df.iloc[1]['Risultato'] == '0-3'
+
+
+def test_read_html_export_uses_first_row_as_header(tmp_path):
+    path = tmp_path / 'Gare.xls'
+    path.write_text(HTML_TABLE, encoding='utf-8')
+
+    df = update_gare.read_match_file(str(path))
+
+    assert list(df.columns) == ['Gara N', 'Data']
+    assert df['Gara N'].tolist() == [101]
+
+
+def test_read_xlsx_export(tmp_path):
+    path = tmp_path / 'Gare.xls'
+    pd.DataFrame({'Gara N': [101], 'Data': ['10/01/2026']}).to_excel(path, index=False, engine='openpyxl')
+    assert update_gare.detect_file_format(str(path)) == 'xlsx'
+    assert update_gare.read_match_file(str(path))['Gara N'].tolist() == [101]
@@ -92,14 +92,30 @@ def check_and_setup_environment():
         if not install_in_venv(missing_packages):
             sys.exit(1)
 
-# Setup ambiente
-check_and_setup_environment()
+# Setup ambiente solo quando eseguito come script: importare il modulo (test,
+# validazione nella CI) non deve creare venv né riavviare il processo
+if __name__ == "__main__":
+    check_and_setup_environment()
 
 # Ora importa i moduli (dopo la configurazione)
 import requests
 import pandas as pd
 from datetime import datetime
 import json
+import hashlib
+import re
+import sqlite3
+import unicodedata
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from io import StringIO
+from urllib.parse import urlparse
+from requests.adapters import HTTPAdapter
+import lxml.html
+from lxml import etree
 
 # Configuration file path
 CONFIG_FILE = 'config.json'
@@ -107,6 +123,50 @@ CONFIG_FILE = 'config.json'
 # Global config (loaded from file)
 config = None
 
+# Impostazioni predefinite dei download (sovrascrivibili dalla sezione "fetch" di config.json)
+DEFAULT_FETCH_SETTINGS = {
+    'maxWorkers': 4,     # download simultanei in totale
+    'maxPerHost': 3,     # download simultanei verso lo stesso host
+    'hostDelay': 0.5,    # secondi minimi tra due richieste allo stesso host
+    'timeout': 30,       # timeout di connessione/lettura della singola richiesta
+    'deadline': 120      # secondi massimi per l'intera fase di download
+}
+
+# Stato dei download precedenti (ETag / Last-Modified / SHA-256 per URL) e copie dei file
+FETCH_STATE_FILE = '.fetch_state.json'
+FETCH_CACHE_DIR = '.fetch_cache'
+
+# Esiti di un download
+FETCH_CHANGED = 'changed'
+FETCH_UNCHANGED = 'unchanged'
+FETCH_FAILED = 'failed'
+
+# Archivio SQLite delle gare (sovrascrivibile con output.storeFile)
+DEFAULT_STORE_FILE = 'matches.db'
+
+# Registro JSONL delle variazioni tra un aggiornamento e l'altro (sovrascrivibile con output.changesFile)
+DEFAULT_CHANGES_FILE = 'changes.jsonl'
+
+# Campi che, se cambiano, indicano una gara spostata (data, ora o campo)
+RESCHEDULE_COLUMNS = ['Data', 'Ora', 'Impianto', 'IndirizzoImpianto']
+
+# Artefatti JSON per il frontend (directory predefinita, sovrascrivibile con output.artifactsDir)
+DEFAULT_ARTIFACTS_DIR = 'data'
+ARTIFACT_FORMAT_VERSION = 1
+
+# Colonne codificate con dizionari di stringhe negli artefatti (colonna -> dizionario)
+DICTIONARY_COLUMNS = {
+    'Campionato': 'leagues',
+    'SquadraCasa': 'teams',
+    'SquadraOspite': 'teams',
+    'Impianto': 'venues',
+    'IndirizzoImpianto': 'addresses'
+}
+
+# Sessione HTTP condivisa (connection pool riutilizzato tra i thread)
+_http_session = None
+_http_session_lock = threading.Lock()
+
 def load_config():
     """Load configuration from config.json"""
     global config
@@ -151,8 +211,95 @@ def load_config():
         print(f"❌ Errore nel caricamento della configurazione: {e}")
         sys.exit(1)
 
-def download_excel(url, filename):
-    """Scarica un file Excel dall'URL specificato"""
+def get_fetch_settings():
+    """Restituisce le impostazioni dei download unendo i default con config.json"""
+    settings = dict(DEFAULT_FETCH_SETTINGS)
+    if config:
+        settings.update(config.get('fetch', {}))
+    return settings
+
+def get_http_session():
+    """Restituisce la sessione HTTP condivisa, creandola al primo utilizzo"""
+    global _http_session
+    with _http_session_lock:
+        if _http_session is None:
+            pool_size = max(int(get_fetch_settings()['maxWorkers']), 1)
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            session = requests.Session()
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _http_session = session
+        return _http_session
+
+class HostLimiter:
+    """Limita le richieste simultanee e la frequenza verso ciascun host"""
+
+    def __init__(self, max_per_host=1, min_delay=1.0):
+        self.max_per_host = max(int(max_per_host), 1)
+        self.min_delay = max(float(min_delay), 0.0)
+        self._lock = threading.Lock()
+        self._semaphores = {}
+        self._next_slot = {}
+
+    @contextmanager
+    def slot(self, url):
+        """Attende il turno per l'host dell'URL e lo occupa per la durata del blocco"""
+        host = urlparse(url).netloc
+        with self._lock:
+            semaphore = self._semaphores.setdefault(host, threading.BoundedSemaphore(self.max_per_host))
+
+        with semaphore:
+            # Prenota il prossimo istante libero per l'host, poi attende fuori dal lock
+            with self._lock:
+                now = time.monotonic()
+                start_at = max(now, self._next_slot.get(host, now))
+                self._next_slot[host] = start_at + self.min_delay
+            if start_at > now:
+                time.sleep(start_at - now)
+            yield
+
+def load_fetch_state():
+    """Carica lo stato dei download precedenti"""
+    state_path = Path(__file__).parent / FETCH_STATE_FILE
+    if not state_path.exists():
+        return {}
+    try:
+        with open(state_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (json.JSONDecodeError, OSError) as e:
+        print(f"⚠️  Stato download non leggibile, verrà ricreato: {e}")
+        return {}
+
+def save_fetch_state(fetch_state, urls):
+    """Salva lo stato dei download (solo per gli URL ancora configurati)"""
+    state_path = Path(__file__).parent / FETCH_STATE_FILE
+    state = {url: fetch_state[url] for url in urls if url in fetch_state}
+    temp_path = state_path.with_suffix('.tmp')
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    os.replace(temp_path, state_path)
+
+def get_cached_copy_path(url):
+    """Percorso della copia locale dell'ultimo file scaricato da un URL"""
+    url_key = hashlib.sha256(url.encode('utf-8')).hexdigest()[:16]
+    return Path(__file__).parent / FETCH_CACHE_DIR / f"{url_key}.xls"
+
+def download_excel(url, filename, timeout=30, deadline=None, fetch_state=None):
+    """
+    Scarica un file Excel dall'URL specificato
+
+    Se viene passato un deadline (time.monotonic()), il download viene
+    interrotto quando il tempo a disposizione è esaurito.
+
+    Se viene passato fetch_state, la richiesta è condizionale (ETag /
+    Last-Modified) e il contenuto viene confrontato con l'hash SHA-256
+    dell'ultimo download; fetch_state[url] viene aggiornato. La copia locale
+    per le risposte 304 non viene toccata: la aggiorna chi accetta il nuovo
+    stato (vedi commit_fetch_state).
+
+    Returns:
+        FETCH_CHANGED, FETCH_UNCHANGED oppure FETCH_FAILED
+    """
     try:
         print(f"📥 Download in corso da: {url}")
         
@@ -165,144 +312,1101 @@ def download_excel(url, filename):
             'Referer': url.split('/esporta')[0]
         }
         
-        response = requests.get(url, headers=headers, timeout=30, allow_redirects=True)
-        response.raise_for_status()
+        # Richiesta condizionale solo se abbiamo ancora la copia del file precedente
+        previous = (fetch_state or {}).get(url, {})
+        cached_copy = get_cached_copy_path(url)
+        if previous and cached_copy.exists():
+            if previous.get('etag'):
+                headers['If-None-Match'] = previous['etag']
+            if previous.get('last_modified'):
+                headers['If-Modified-Since'] = previous['last_modified']
         
-        # Verifica che sia un file Excel valido
-        content_type = response.headers.get('Content-Type', '')
-        if 'excel' not in content_type.lower() and 'octet-stream' not in content_type.lower():
-            print(f"⚠️  Warning: Content-Type inaspettato: {content_type}")
+        if deadline is not None:
+            timeout = min(timeout, max(deadline - time.monotonic(), 0.1))
+        
+        session = get_http_session()
+        with session.get(url, headers=headers, timeout=timeout, allow_redirects=True, stream=True) as response:
+            if response.status_code == 304:
+                shutil.copyfile(cached_copy, filename)
+                print(f"✅ Non modificato (304): {filename} dalla copia locale")
+                return FETCH_UNCHANGED
+            
+            response.raise_for_status()
+            
+            # Verifica che sia un file Excel valido
+            content_type = response.headers.get('Content-Type', '')
+            if 'excel' not in content_type.lower() and 'octet-stream' not in content_type.lower():
+                print(f"⚠️  Warning: Content-Type inaspettato: {content_type}")
+            
+            # Leggi il contenuto a blocchi rispettando il deadline globale
+            chunks = []
+            for chunk in response.iter_content(chunk_size=64 * 1024):
+                if deadline is not None and time.monotonic() > deadline:
+                    print(f"⏱️  Tempo massimo superato, download interrotto: {url}")
+                    return FETCH_FAILED
+                chunks.append(chunk)
+            content = b''.join(chunks)
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
         
         # Salva il file
         with open(filename, 'wb') as f:
-            f.write(response.content)
+            f.write(content)
         
-        file_size = len(response.content)
-        print(f"✅ File scaricato: {filename} ({file_size:,} bytes)")
+        file_size = len(content)
+        content_hash = hashlib.sha256(content).hexdigest()
+        unchanged = content_hash == previous.get('sha256')
         
-        return True
+        if fetch_state is not None:
+            fetch_state[url] = {
+                'etag': etag,
+                'last_modified': last_modified,
+                'sha256': content_hash,
+                'size': file_size,
+                'changed_at': previous.get('changed_at') if unchanged else datetime.now().isoformat(timespec='seconds')
+            }
+        
+        if unchanged:
+            print(f"✅ File scaricato: {filename} ({file_size:,} bytes, contenuto invariato)")
+            return FETCH_UNCHANGED
+        
+        print(f"✅ File scaricato: {filename} ({file_size:,} bytes)")
+        return FETCH_CHANGED
         
     except requests.exceptions.RequestException as e:
         print(f"❌ Errore durante il download: {e}")
-        return False
+        return FETCH_FAILED
     except Exception as e:
         print(f"❌ Errore inaspettato: {e}")
-        return False
+        return FETCH_FAILED
+
+def run_concurrently(urls, worker, default=None, label="Download"):
+    """
+    Esegue worker(index, url, deadline) per ogni URL in un pool di thread limitato
+
+    Rispetta i limiti per host e il deadline globale della sezione "fetch"
+    di config.json; i lavori non completati in tempo restituiscono default.
+    I thread ancora in esecuzione dopo il deadline non vengono attesi: il
+    worker non deve quindi modificare stato condiviso, ma restituire il
+    proprio risultato (quelli arrivati in ritardo vengono ignorati).
+
+    Returns:
+        Lista dei risultati, nello stesso ordine degli URL
+    """
+    settings = get_fetch_settings()
+    limiter = HostLimiter(settings['maxPerHost'], settings['hostDelay'])
+    started = time.monotonic()
+    deadline = started + float(settings['deadline'])
+    results = [default] * len(urls)
+
+    def run(index, url):
+        with limiter.slot(url):
+            if time.monotonic() > deadline:
+                print(f"⏱️  [{index+1}/{len(urls)}] Tempo massimo superato, saltato: {url}")
+                return default
+            return worker(index, url, deadline)
 
-def merge_excel_files(files, output_file):
-    """Unisce più file Excel in uno solo"""
+    max_workers = max(min(int(settings['maxWorkers']), len(urls)), 1)
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='fetch')
     try:
-        print(f"\n🔄 Unione dei file in corso...")
-        
-        all_data = []
-        
-        for i, file in enumerate(files):
-            if not os.path.exists(file):
-                print(f"⚠️  File non trovato: {file}")
-                continue
-                
+        futures = {executor.submit(run, i, url): i for i, url in enumerate(urls)}
+        done, not_done = wait(futures, timeout=max(deadline - time.monotonic(), 0))
+
+        for future in done:
             try:
-                # Prova a leggere con diversi engine
-                try:
-                    df = pd.read_excel(file, engine='xlrd')
-                except:
-                    # Converti a xlsx se necessario
-                    import subprocess
-                    temp_xlsx = file.replace('.xls', '_temp.xlsx')
-                    subprocess.run(['libreoffice', '--headless', '--convert-to', 'xlsx', file], 
-                                 capture_output=True)
-                    df = pd.read_excel(temp_xlsx, engine='openpyxl')
-                    os.remove(temp_xlsx)
-                
-                print(f"  ✓ Letto {file}: {len(df)} righe, {len(df.columns)} colonne")
-                all_data.append(df)
-                
+                results[futures[future]] = future.result()
             except Exception as e:
-                print(f"  ✗ Errore nella lettura di {file}: {e}")
-                continue
-        
-        if not all_data:
-            print("❌ Nessun dato da unire!")
+                print(f"❌ Errore inaspettato ({label} {futures[future]+1}): {e}")
+
+        for future in not_done:
+            future.cancel()
+            print(f"⏱️  {label} {futures[future]+1} non completato entro {settings['deadline']}s")
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    print(f"\n⏱️  {label} completati in {time.monotonic() - started:.1f}s "
+          f"({max_workers} worker, max {settings['maxPerHost']} per host)")
+    return results
+
+def download_all(urls, filenames, fetch_state=None):
+    """
+    Scarica tutte le sorgenti in parallelo
+
+    Ogni thread lavora su una copia locale dello stato della propria sorgente
+    e la restituisce: solo il thread principale aggiorna fetch_state (vedi
+    commit_fetch_state), con i download completati entro il deadline.
+
+    Returns:
+        Tupla (esiti, download): lista degli esiti (FETCH_CHANGED /
+        FETCH_UNCHANGED / FETCH_FAILED) per ciascun URL e dizionario
+        {url: nuovo stato} dei download riusciti
+    """
+    timeout = get_fetch_settings()['timeout']
+    fetch_state = {} if fetch_state is None else fetch_state
+
+    def fetch(index, url, deadline):
+        print(f"\n[{index+1}/{len(urls)}] Download file...")
+        local_state = {url: fetch_state[url]} if url in fetch_state else {}
+        status = download_excel(url, filenames[index], timeout=timeout,
+                                deadline=deadline, fetch_state=local_state)
+        return status, local_state.get(url)
+
+    outcomes = run_concurrently(urls, fetch, default=(FETCH_FAILED, None), label="Download")
+    results = [status for status, _ in outcomes]
+    downloads = {url: entry for url, (status, entry) in zip(urls, outcomes)
+                 if status != FETCH_FAILED and entry is not None}
+    return results, downloads
+
+def commit_fetch_state(fetch_state, downloads, files_by_url):
+    """
+    Accetta nello stato i download indicati (solo dal thread principale)
+
+    Aggiorna anche la copia locale di ogni file, usata per rispondere alle
+    future risposte 304, così copia e ETag/hash salvati restano coerenti.
+
+    Args:
+        fetch_state: Stato dei download, aggiornato sul posto
+        downloads: Dizionario {url: nuovo stato} restituito da download_all
+        files_by_url: Dizionario {url: file scaricato}
+    """
+    for url, entry in downloads.items():
+        cached_copy = get_cached_copy_path(url)
+        cached_copy.parent.mkdir(exist_ok=True)
+        shutil.copyfile(files_by_url[url], cached_copy)
+        fetch_state[url] = entry
+
+# Firme dei formati che FIPAV esporta con estensione .xls
+BIFF_MAGIC = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'  # Excel 97-2003 (contenitore OLE2)
+XLSX_MAGIC = b'PK\x03\x04'                          # Excel 2007+ (archivio zip)
+SPREADSHEET_XML_NS = 'urn:schemas-microsoft-com:office:spreadsheet'
+
+def detect_file_format(path):
+    """
+    Riconosce il formato reale di un file "xls" dai primi byte
+
+    Returns:
+        'biff', 'xlsx', 'xml2003' oppure 'html'
+    """
+    with open(path, 'rb') as f:
+        head = f.read(4096)
+
+    if head.startswith(BIFF_MAGIC):
+        return 'biff'
+    if head.startswith(XLSX_MAGIC):
+        return 'xlsx'
+
+    # Formati testuali: normalizza BOM, UTF-16 e spazi iniziali
+    if head.startswith((b'\xff\xfe', b'\xfe\xff')):
+        text = head.decode('utf-16', errors='ignore')
+    else:
+        text = head.decode('utf-8', errors='ignore')
+    text = text.lstrip('\ufeff \t\r\n').lower()
+
+    if text.startswith('<?xml') and SPREADSHEET_XML_NS in text:
+        return 'xml2003'
+    if text.startswith('<') or '<table' in text:
+        return 'html'
+
+    raise ValueError(f"Formato non riconosciuto per {path} (primi byte: {head[:8]!r})")
+
+def read_spreadsheet_xml(path):
+    """Legge un file Excel XML 2003 (SpreadsheetML) come DataFrame"""
+    ns = {'ss': SPREADSHEET_XML_NS}
+    index_attr = f'{{{SPREADSHEET_XML_NS}}}Index'
+    tree = etree.parse(path)
+    rows = []
+    for row in tree.iterfind('.//ss:Worksheet[1]/ss:Table/ss:Row', ns):
+        values = []
+        for cell in row.iterfind('ss:Cell', ns):
+            # ss:Index indica celle vuote saltate (indice a base 1)
+            if cell.get(index_attr):
+                values.extend([None] * (int(cell.get(index_attr)) - 1 - len(values)))
+            data = cell.find('ss:Data', ns)
+            value = None
+            if data is not None and data.text is not None:
+                value = data.text
+                if data.get(f'{{{SPREADSHEET_XML_NS}}}Type') == 'Number':
+                    number = float(value)
+                    value = int(number) if number.is_integer() else number
+            values.append(value)
+        rows.append(values)
+
+    if not rows:
+        return pd.DataFrame()
+    width = max(len(r) for r in rows)
+    rows = [r + [None] * (width - len(r)) for r in rows]
+    return pd.DataFrame(rows[1:], columns=rows[0])
+
+def read_html_export(path):
+    """Legge un export HTML mascherato da .xls (tabella delle gare)"""
+    tables = pd.read_html(path, flavor='lxml')
+
+    # Preferisce la tabella con la colonna 'Gara N', altrimenti la più grande
+    df = next((t for t in tables if 'Gara N' in [str(c) for c in t.columns]), None)
+    if df is None:
+        df = max(tables, key=len)
+
+    # Tabelle senza <th>: la prima riga contiene le intestazioni
+    if all(isinstance(c, int) for c in df.columns):
+        df.columns = [str(c) for c in df.iloc[0]]
+        df = df.iloc[1:].reset_index(drop=True)
+        for column in df.columns:
+            try:
+                df[column] = pd.to_numeric(df[column])
+            except (ValueError, TypeError):
+                pass
+    return df
+
+def read_match_file(path, file_format=None):
+    """
+    Legge un export delle gare FIPAV senza conversioni esterne
+
+    Args:
+        path: Percorso del file scaricato
+        file_format: Formato già rilevato (default: rilevato da detect_file_format)
+
+    Returns:
+        DataFrame con le gare
+    """
+    file_format = file_format or detect_file_format(path)
+
+    if file_format == 'biff':
+        return pd.read_excel(path, engine='xlrd')
+    if file_format == 'xlsx':
+        # pandas apre il workbook openpyxl in modalità read-only
+        return pd.read_excel(path, engine='openpyxl')
+    if file_format == 'xml2003':
+        return read_spreadsheet_xml(path)
+    return read_html_export(path)
+
+# Colonne di Gare.xls salvate anche come colonne indicizzabili nell'archivio SQLite
+STORE_COLUMNS = {
+    'Campionato': 'campionato',
+    'Data': 'data',
+    'Ora': 'ora',
+    'SquadraCasa': 'squadra_casa',
+    'SquadraOspite': 'squadra_ospite',
+    'Risultato': 'risultato',
+    'Parziali': 'parziali',
+    'StatoDescrizione': 'stato',
+    'Impianto': 'impianto'
+}
+
+STORE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS matches (
+    gara_n TEXT PRIMARY KEY,
+    source TEXT NOT NULL,
+    campionato TEXT,
+    data TEXT,
+    data_iso TEXT,
+    ora TEXT,
+    squadra_casa TEXT,
+    squadra_ospite TEXT,
+    risultato TEXT,
+    parziali TEXT,
+    stato TEXT,
+    impianto TEXT,
+    row_json TEXT NOT NULL,
+    row_hash TEXT NOT NULL,
+    active INTEGER NOT NULL DEFAULT 1,
+    first_seen TEXT NOT NULL,
+    last_changed TEXT NOT NULL,
+    last_seen TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_matches_date ON matches (data_iso);
+CREATE INDEX IF NOT EXISTS idx_matches_home ON matches (squadra_casa);
+CREATE INDEX IF NOT EXISTS idx_matches_away ON matches (squadra_ospite);
+CREATE INDEX IF NOT EXISTS idx_matches_league ON matches (campionato);
+CREATE INDEX IF NOT EXISTS idx_matches_source ON matches (source, active);
+
+-- Ultimo export di ogni sorgente, anche le gare scartate come duplicate:
+-- se una gara sparisce dalla sorgente prioritaria si ripiega su queste
+CREATE TABLE IF NOT EXISTS source_matches (
+    source TEXT NOT NULL,
+    gara_n TEXT NOT NULL,
+    row_json TEXT NOT NULL,
+    PRIMARY KEY (source, gara_n)
+);
+CREATE INDEX IF NOT EXISTS idx_source_matches_gara ON source_matches (gara_n);
+
+CREATE TABLE IF NOT EXISTS standings (
+    league TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    team TEXT,
+    row_json TEXT NOT NULL,
+    PRIMARY KEY (league, position)
+);
+
+CREATE TABLE IF NOT EXISTS store_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+def get_store_path():
+    """Percorso dell'archivio SQLite delle gare (output.storeFile di config.json)"""
+    return config['output'].get('storeFile', DEFAULT_STORE_FILE)
+
+def open_match_store(path=None):
+    """Apre (e se necessario crea) l'archivio SQLite delle gare in modalità WAL"""
+    connection = sqlite3.connect(path or get_store_path())
+    connection.row_factory = sqlite3.Row
+    connection.execute('PRAGMA journal_mode=WAL')
+    connection.execute('PRAGMA synchronous=NORMAL')
+    connection.executescript(STORE_SCHEMA)
+    return connection
+
+def store_has_source(store, source):
+    """Verifica se l'archivio contiene già l'export di una sorgente"""
+    row = store.execute('SELECT 1 FROM source_matches WHERE source = ? LIMIT 1', (source,)).fetchone()
+    return row is not None
+
+def get_date_iso(value):
+    """Data gg/mm/aaaa in formato ISO (None se mancante o non valida)"""
+    try:
+        return datetime.strptime(str(value).strip(), '%d/%m/%Y').strftime('%Y-%m-%d')
+    except ValueError:
+        return None
+
+def write_match_row(store, gara_n, source, row, row_json, row_hash, date_iso, now):
+    """Inserisce o sostituisce la riga attiva di una gara"""
+    indexed = {name: (None if row.get(column) is None else str(row.get(column)))
+               for column, name in STORE_COLUMNS.items()}
+    store.execute(f"""
+        INSERT INTO matches (gara_n, source, {', '.join(indexed)}, data_iso, row_json, row_hash,
+                             active, first_seen, last_changed, last_seen)
+        VALUES (?, ?, {', '.join('?' for _ in indexed)}, ?, ?, ?, 1, ?, ?, ?)
+        ON CONFLICT (gara_n) DO UPDATE SET
+            source = excluded.source,
+            {', '.join(f'{name} = excluded.{name}' for name in indexed)},
+            data_iso = excluded.data_iso,
+            row_json = excluded.row_json,
+            row_hash = excluded.row_hash,
+            active = 1,
+            last_changed = excluded.last_changed,
+            last_seen = excluded.last_seen
+    """, (gara_n, source, *indexed.values(), date_iso, row_json, row_hash, now, now, now))
+
+def match_event(event_type, gara_n, row, now, changes=None):
+    """Costruisce un evento del registro delle variazioni per una gara"""
+    event = {
+        'run': now,
+        'type': event_type,
+        'gara': gara_n,
+        'league': row.get('Campionato'),
+        'date': row.get('Data'),
+        'time': row.get('Ora'),
+        'home': row.get('SquadraCasa'),
+        'away': row.get('SquadraOspite')
+    }
+    if changes:
+        event['changes'] = changes
+    return event
+
+def diff_match_rows(old_row, new_row, gara_n, now):
+    """
+    Classifica la variazione di una gara già presente nell'archivio
+
+    Returns:
+        Evento 'match_result' se è comparso il risultato, 'match_rescheduled'
+        se sono cambiati data, ora o campo, altrimenti 'match_updated'
+    """
+    changes = {column: [old_row.get(column), new_row.get(column)]
+               for column in dict.fromkeys([*old_row, *new_row])
+               if old_row.get(column) != new_row.get(column)}
+    if not old_row.get('Risultato') and new_row.get('Risultato'):
+        event_type = 'match_result'
+    elif any(column in changes for column in RESCHEDULE_COLUMNS):
+        event_type = 'match_rescheduled'
+    else:
+        event_type = 'match_updated'
+    return match_event(event_type, gara_n, new_row, now, changes)
+
+def upsert_matches(store, df, source, sources, now, events=None):
+    """
+    Inserisce o aggiorna nell'archivio le gare lette da una sorgente
+
+    Le righe invariate (stesso hash) non vengono toccate. Come nella vecchia
+    unione, se la stessa 'Gara N' arriva da più sorgenti vince la prima in
+    ordine di config['dataSources']; l'export completo di ogni sorgente resta
+    in source_matches. Le gare della sorgente che non compaiono più
+    nell'export passano alla sorgente successiva che le contiene ancora, o
+    vengono disattivate. Se events è una lista, vi vengono aggiunte le
+    variazioni rilevate (vedi diff_match_rows).
+
+    Returns:
+        Dizionario con i conteggi inserted / updated / unchanged / deactivated / skipped
+    """
+    stats = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'deactivated': 0, 'skipped': 0}
+    if 'Gara N' not in df.columns:
+        raise ValueError("Colonna 'Gara N' mancante nell'export")
+
+    priority = {url: i for i, url in enumerate(sources)}
+    columns = [str(c) for c in df.columns]
+    dates = pd.to_datetime(df['Data'], format='%d/%m/%Y', errors='coerce') if 'Data' in df.columns else None
+    seen = set()
+    source_rows = []
+
+    for position, values in enumerate(df.itertuples(index=False, name=None)):
+        row = {column: to_json_value(value) for column, value in zip(columns, values)}
+        if row['Gara N'] is None:
+            continue
+        gara_n = str(row['Gara N'])
+        if gara_n in seen:
+            stats['skipped'] += 1
+            continue
+        seen.add(gara_n)
+
+        row_json = json.dumps(row, ensure_ascii=False, sort_keys=True)
+        row_hash = hashlib.sha256(row_json.encode('utf-8')).hexdigest()
+        source_rows.append((source, gara_n, row_json))
+        existing = store.execute('SELECT source, row_json, row_hash, active FROM matches WHERE gara_n = ?',
+                                 (gara_n,)).fetchone()
+
+        if (existing is not None and existing['active'] and existing['source'] != source
+                and priority.get(existing['source'], len(sources)) < priority.get(source, len(sources))):
+            stats['skipped'] += 1
+            continue
+
+        if existing is not None and existing['row_hash'] == row_hash and existing['active']:
+            store.execute('UPDATE matches SET last_seen = ?, source = ? WHERE gara_n = ?', (now, source, gara_n))
+            stats['unchanged'] += 1
+            continue
+
+        date_iso = None
+        if dates is not None and not pd.isna(dates.iloc[position]):
+            date_iso = dates.iloc[position].strftime('%Y-%m-%d')
+        write_match_row(store, gara_n, source, row, row_json, row_hash, date_iso, now)
+        stats['inserted' if existing is None else 'updated'] += 1
+
+        if events is not None:
+            if existing is None or not existing['active']:
+                events.append(match_event('match_added', gara_n, row, now))
+            else:
+                events.append(diff_match_rows(json.loads(existing['row_json']), row, gara_n, now))
+
+    # Export completo della sorgente (anche le gare scartate come duplicate)
+    store.execute('DELETE FROM source_matches WHERE source = ?', (source,))
+    store.executemany('INSERT INTO source_matches (source, gara_n, row_json) VALUES (?, ?, ?)', source_rows)
+
+    # Gare sparite dall'export di questa sorgente
+    stale = [r for r in store.execute(
+        'SELECT gara_n, row_json FROM matches WHERE source = ? AND active = 1', (source,))
+        if r['gara_n'] not in seen]
+    stale, reassigned = fall_back_to_other_sources(store, stale, sources, now, events)
+    stats['updated'] += reassigned
+    stats['deactivated'] = deactivate_matches(store, stale, now, events)
+
+    store.execute('INSERT OR REPLACE INTO store_meta (key, value) VALUES (?, ?)',
+                  ('columns', json.dumps(columns, ensure_ascii=False)))
+    return stats
+
+def deactivate_matches(store, rows, now, events=None):
+    """Disattiva le gare indicate (righe con gara_n e row_json) registrandone la rimozione"""
+    store.executemany('UPDATE matches SET active = 0, last_changed = ? WHERE gara_n = ?',
+                      [(now, r['gara_n']) for r in rows])
+    if events is not None:
+        events.extend(match_event('match_removed', r['gara_n'], json.loads(r['row_json']), now) for r in rows)
+    return len(rows)
+
+def fall_back_to_other_sources(store, rows, sources, now, events=None):
+    """
+    Passa le gare indicate alla sorgente configurata più prioritaria che le contiene ancora
+
+    Args:
+        rows: Righe attive (gara_n, row_json) sparite dalla propria sorgente
+        sources: Sorgenti configurate, in ordine di priorità
+
+    Returns:
+        Tupla (righe che nessun'altra sorgente contiene, da disattivare;
+        numero di gare passate a un'altra sorgente)
+    """
+    priority = {url: i for i, url in enumerate(sources)}
+    remaining = []
+    for r in rows:
+        # La sorgente da cui la gara è sparita non la contiene più in source_matches
+        candidates = [c for c in store.execute(
+            'SELECT source, row_json FROM source_matches WHERE gara_n = ?', (r['gara_n'],))
+            if c['source'] in priority]
+        if not candidates:
+            remaining.append(r)
+            continue
+
+        fallback = min(candidates, key=lambda c: priority[c['source']])
+        row = json.loads(fallback['row_json'])
+        row_hash = hashlib.sha256(fallback['row_json'].encode('utf-8')).hexdigest()
+        write_match_row(store, r['gara_n'], fallback['source'], row, fallback['row_json'], row_hash,
+                        get_date_iso(row.get('Data')), now)
+        if events is not None and fallback['row_json'] != r['row_json']:
+            events.append(diff_match_rows(json.loads(r['row_json']), row, r['gara_n'], now))
+    return remaining, len(rows) - len(remaining)
+
+def deactivate_removed_sources(store, sources, now, events=None):
+    """
+    Gare di sorgenti non più presenti in config['dataSources']: passano a una
+    sorgente ancora configurata che le contiene, altrimenti vengono disattivate
+    """
+    placeholders = ', '.join('?' for _ in sources)
+    rows = store.execute(
+        f'SELECT gara_n, row_json FROM matches WHERE active = 1 AND source NOT IN ({placeholders})',
+        sources).fetchall()
+    store.execute(f'DELETE FROM source_matches WHERE source NOT IN ({placeholders})', sources)
+    rows, reassigned = fall_back_to_other_sources(store, rows, sources, now, events)
+    return reassigned + deactivate_matches(store, rows, now, events)
+
+def load_active_matches(store):
+    """
+    Legge dall'archivio le gare attive nello stesso formato di Gare.xls
+
+    Returns:
+        DataFrame ordinato per data (le gare senza data in fondo)
+    """
+    meta = store.execute("SELECT value FROM store_meta WHERE key = 'columns'").fetchone()
+    rows = [json.loads(r['row_json']) for r in store.execute("""
+        SELECT row_json FROM matches
+        WHERE active = 1
+        ORDER BY data_iso IS NULL, data_iso, ora, CAST(gara_n AS INTEGER), gara_n
+    """)]
+    columns = json.loads(meta['value']) if meta else (list(rows[0]) if rows else [])
+    return pd.DataFrame(rows, columns=columns)
+
+def import_match_files(store, files_by_source, sources, events=None, failed_sources=None):
+    """
+    Importa nell'archivio gli export scaricati (solo le sorgenti indicate)
+
+    Le variazioni vengono aggiunte a events, tranne alla prima importazione
+    di una sorgente (archivio vuoto o ricostruito): lì ogni gara sarebbe
+    "nuova" e il registro si riempirebbe di eventi falsi.
+
+    Args:
+        files_by_source: Dizionario {url sorgente: file scaricato}
+        sources: Tutte le sorgenti configurate, in ordine di priorità
+        events: Lista opzionale in cui raccogliere le variazioni
+        failed_sources: Lista opzionale in cui raccogliere le sorgenti non leggibili
+
+    Returns:
+        Numero di gare inserite, modificate o disattivate (None in caso di errore)
+    """
+    try:
+        print(f"\n🔄 Aggiornamento archivio gare ({get_store_path()})...")
+        now = datetime.now().isoformat(timespec='seconds')
+        changes = 0
+
+        with store:
+            changes += deactivate_removed_sources(store, sources, now, events)
+
+            # In ordine di priorità, così a parità di 'Gara N' vince la prima sorgente
+            for source in sorted(files_by_source, key=sources.index):
+                file = files_by_source[source]
+                try:
+                    # Legge il file nel formato reale (BIFF, XLSX, HTML o XML 2003)
+                    file_format = detect_file_format(file)
+                    df = read_match_file(file, file_format)
+                    print(f"  ✓ Letto {file} ({file_format}): {len(df)} righe, {len(df.columns)} colonne")
+                except Exception as e:
+                    print(f"  ✗ Errore nella lettura di {file}: {e}")
+                    if failed_sources is not None:
+                        failed_sources.append(source)
+                    continue
+
+                baseline = not store_has_source(store, source)
+                stats = upsert_matches(store, df, source, sources, now, None if baseline else events)
+                changes += stats['inserted'] + stats['updated'] + stats['deactivated']
+                print(f"    ➕ {stats['inserted']} nuove, ✏️  {stats['updated']} modificate, "
+                      f"= {stats['unchanged']} invariate, ➖ {stats['deactivated']} rimosse"
+                      + (f", {stats['skipped']} duplicate" if stats['skipped'] else ""))
+
+        return changes
+
+    except Exception as e:
+        print(f"❌ Errore durante l'aggiornamento dell'archivio: {e}")
+        import traceback
+        traceback.print_exc()
+        return None
+
+def export_matches_file(store, output_file):
+    """Esporta le gare attive dell'archivio in Gare.xls e negli artefatti JSON"""
+    try:
+        merged_df = load_active_matches(store)
+        if merged_df.empty:
+            print("❌ Nessuna gara nell'archivio da esportare!")
             return False
-        
-        # Unisci tutti i dataframe
-        merged_df = pd.concat(all_data, ignore_index=True)
-        
-        # Rimuovi eventuali duplicati (stessa Gara N)
-        if 'Gara N' in merged_df.columns:
-            initial_rows = len(merged_df)
-            merged_df = merged_df.drop_duplicates(subset=['Gara N'], keep='first')
-            duplicates_removed = initial_rows - len(merged_df)
-            if duplicates_removed > 0:
-                print(f"  ℹ️  Rimossi {duplicates_removed} duplicati")
-        
-        # Ordina per data se presente
-        if 'Data' in merged_df.columns:
-            merged_df['Data_Sort'] = pd.to_datetime(merged_df['Data'], format='%d/%m/%Y', errors='coerce')
-            merged_df = merged_df.sort_values('Data_Sort')
-            merged_df = merged_df.drop('Data_Sort', axis=1)
-        
+
         # Salva il file unito
         merged_df.to_excel(output_file, index=False, engine='openpyxl')
-        
-        print(f"\n✅ File unito creato: {output_file}")
+
+        print(f"\n✅ File esportato dall'archivio: {output_file}")
         print(f"   📊 Totale righe: {len(merged_df)}")
         print(f"   📊 Totale colonne: {len(merged_df.columns)}")
         print(f"   📊 Dimensione: {os.path.getsize(output_file):,} bytes")
-        
+
+        # Esporta anche gli artefatti JSON precalcolati per il frontend
+        export_match_artifacts(merged_df)
+
         return True
-        
+
     except Exception as e:
-        print(f"❌ Errore durante l'unione: {e}")
+        print(f"❌ Errore durante l'esportazione: {e}")
         import traceback
         traceback.print_exc()
         return False
 
-def update_classifica():
-    """Scarica e aggiorna le classifiche"""
+def to_json_value(value):
+    """Converte un valore pandas/numpy in un valore serializzabile in JSON (None se vuoto)"""
+    if value is None:
+        return None
+    if isinstance(value, (pd.Timestamp, datetime)):
+        return value.strftime('%d/%m/%Y')
+    try:
+        if pd.isna(value):
+            return None
+    except (TypeError, ValueError):
+        pass
+    if hasattr(value, 'item'):
+        return value.item()
+    return value
+
+def parse_set_scores(result, partials):
+    """
+    Estrae i punteggi numerici di una gara
+
+    Returns:
+        (set casa, set ospite, lista dei parziali [[casa, ospite], ...]);
+        None per i valori non disponibili
+    """
+    home_sets = away_sets = None
+    match = re.match(r'^\s*(\d+)\s*-\s*(\d+)\s*$', str(result)) if result is not None else None
+    if match:
+        home_sets, away_sets = int(match.group(1)), int(match.group(2))
+    set_scores = None
+    if partials is not None:
+        set_scores = [[int(h), int(a)] for h, a in re.findall(r'(\d+)\s*-\s*(\d+)', str(partials))] or None
+    return home_sets, away_sets, set_scores
+
+def build_match_artifact(df):
+    """
+    Costruisce l'artefatto colonnare delle gare
+
+    Le colonne originali restano invariate (stessi valori di Gare.xls); quelle
+    ripetitive sono codificate come indici in dizionari di stringhe condivisi.
+    In "derived" ci sono date ISO e punteggi numerici già calcolati.
+    """
+    columns = [str(c) for c in df.columns]
+    data = {}
+    dictionaries = {}
+    encoded = {}
+
+    for column in columns:
+        values = [to_json_value(v) for v in df[column].tolist()]
+        dictionary_name = DICTIONARY_COLUMNS.get(column)
+        if dictionary_name:
+            dictionary = dictionaries.setdefault(dictionary_name, [])
+            positions = {value: i for i, value in enumerate(dictionary)}
+            codes = []
+            for value in values:
+                if value is None:
+                    codes.append(None)
+                    continue
+                if value not in positions:
+                    positions[value] = len(dictionary)
+                    dictionary.append(value)
+                codes.append(positions[value])
+            data[column] = codes
+            encoded[column] = dictionary_name
+        else:
+            data[column] = values
+
+    derived = {}
+    if 'Data' in df.columns:
+        dates = pd.to_datetime(df['Data'], format='%d/%m/%Y', errors='coerce')
+        derived['date'] = [d.strftime('%Y-%m-%d') if not pd.isna(d) else None for d in dates]
+    results = data.get('Risultato', [None] * len(df))
+    partials = data.get('Parziali', [None] * len(df))
+    scores = [parse_set_scores(r, p) for r, p in zip(results, partials)]
+    derived['homeSets'] = [s[0] for s in scores]
+    derived['awaySets'] = [s[1] for s in scores]
+    derived['setScores'] = [s[2] for s in scores]
+
+    return {
+        'version': ARTIFACT_FORMAT_VERSION,
+        'count': len(df),
+        'columns': columns,
+        'dictionaries': dictionaries,
+        'encoded': encoded,
+        'data': data,
+        'derived': derived
+    }
+
+def write_hashed_json(payload, directory, prefix):
+    """
+    Scrive un JSON compatto con l'hash del contenuto nel nome del file
+
+    Returns:
+        (percorso relativo con '/', hash SHA-256 completo)
+    """
+    content = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    content_hash = hashlib.sha256(content).hexdigest()
+    path = Path(directory) / f"{prefix}.{content_hash[:12]}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if not path.exists():
+        with open(path, 'wb') as f:
+            f.write(content)
+    return path.as_posix(), content_hash
+
+def get_artifacts_dir():
+    """Directory degli artefatti JSON (output.artifactsDir di config.json)"""
+    return config['output'].get('artifactsDir', DEFAULT_ARTIFACTS_DIR)
+
+def get_manifest_path():
+    """Percorso del manifest degli artefatti JSON"""
+    return Path(get_artifacts_dir()) / 'manifest.json'
+
+def load_manifest():
+    """Carica il manifest corrente (dizionario vuoto se assente o non valido)"""
+    manifest_path = get_manifest_path()
+    if not manifest_path.exists():
+        return {}
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (json.JSONDecodeError, OSError):
+        return {}
+
+def remove_stale_artifacts(keep_files, pattern):
+    """Rimuove i file con hash non più referenziati (tiene anche quelli del manifest precedente)"""
+    for path in Path(get_artifacts_dir()).glob(pattern):
+        if path.as_posix() not in keep_files:
+            try:
+                path.unlink()
+            except OSError as e:
+                print(f"⚠️  Impossibile rimuovere {path}: {e}")
+
+def slugify(text):
+    """Converte un nome (squadra, campionato) in una chiave sicura per i nomi dei file"""
+    text = unicodedata.normalize('NFKD', str(text)).encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r'[^a-z0-9]+', '-', text.lower()).strip('-') or 'sconosciuto'
+
+def is_rm_team(team_name):
+    """Verifica se una squadra è di RM Volley (team.matchPatterns di config.json)"""
+    if team_name is None or (isinstance(team_name, float) and pd.isna(team_name)):
+        return False
+    normalized = re.sub(r'\s+', ' ', str(team_name).upper())
+    return any(re.sub(r'\s+', ' ', pattern.upper()) in normalized
+               for pattern in config['team']['matchPatterns'])
+
+def get_team_category(team_name):
+    """
+    Categoria di una squadra RM Volley dal numero nel nome (es. "RMVOLLEY#18")
+
+    Le squadre senza numero o con un numero non mappato in config['categories']
+    usano il proprio nome come categoria.
+    """
+    number = re.search(r'#\s*(\d+)', str(team_name))
+    if number and number.group(1) in config['categories']:
+        return config['categories'][number.group(1)]
+    return str(team_name).strip()
+
+def build_shard_index(df):
+    """
+    Raggruppa le righe delle gare per categoria della squadra RM e per campionato
+
+    Returns:
+        {'teams': {chiave: (etichetta, squadre, indici)}, 'leagues': {chiave: (etichetta, [], indici)}}
+    """
+    teams = {}
+    leagues = {}
+
+    for position, (home, away, league) in enumerate(zip(
+            df.get('SquadraCasa', pd.Series([None] * len(df))),
+            df.get('SquadraOspite', pd.Series([None] * len(df))),
+            df.get('Campionato', pd.Series([None] * len(df))))):
+        for team in (home, away):
+            if is_rm_team(team):
+                category = get_team_category(team)
+                label, team_names, rows = teams.setdefault(slugify(category), (category, set(), []))
+                team_names.add(str(team).strip())
+                # Un derby tra due squadre RM della stessa categoria compare una sola volta
+                if not rows or rows[-1] != position:
+                    rows.append(position)
+        if league is not None and not pd.isna(league):
+            leagues.setdefault(slugify(league), (str(league), set(), []))[2].append(position)
+
+    return {'teams': teams, 'leagues': leagues}
+
+def export_match_shards(df, previous_manifest):
+    """
+    Esporta un artefatto per ogni categoria di squadra RM e per ogni campionato
+
+    Returns:
+        Sezione "shards" del manifest
+    """
+    shards = {}
+    keep_files = set()
+    previous_shards = previous_manifest.get('shards', {})
+
+    for kind, groups in build_shard_index(df).items():
+        shards[kind] = {}
+        for key, (label, team_names, rows) in sorted(groups.items()):
+            shard_df = df.iloc[rows]
+            shard_file, shard_hash = write_hashed_json(
+                build_match_artifact(shard_df), Path(get_artifacts_dir()) / kind, key)
+            entry = {'label': label, 'file': shard_file, 'sha256': shard_hash, 'count': len(shard_df)}
+            if team_names:
+                entry['teams'] = sorted(team_names)
+            shards[kind][key] = entry
+            keep_files.add(shard_file)
+
+        # Mantieni anche i file del manifest precedente per i client con cache
+        keep_files.update(entry['file'] for entry in previous_shards.get(kind, {}).values())
+        remove_stale_artifacts(keep_files, f'{kind}/*.json')
+
+    return shards
+
+def export_match_artifacts(df):
+    """
+    Esporta le gare come JSON colonnare con hash nel nome e aggiorna il manifest
+
+    I client leggono data/manifest.json (piccolo, sempre rivalidato) e poi il
+    file con hash, che non cambia mai e può restare in cache a lungo.
+    """
+    try:
+        previous_manifest = load_manifest()
+        matches_file, matches_hash = write_hashed_json(build_match_artifact(df), get_artifacts_dir(), 'matches')
+
+        manifest = {
+            'version': ARTIFACT_FORMAT_VERSION,
+            'generated': datetime.now().isoformat(timespec='seconds'),
+            'matches': {'file': matches_file, 'sha256': matches_hash, 'count': len(df)},
+            'standings': {'file': config['output']['standingsFile']},
+            'shards': export_match_shards(df, previous_manifest)
+        }
+        write_if_changed(get_manifest_path(), json.dumps(manifest, ensure_ascii=False, indent=2))
+
+        # I client con il manifest precedente in cache possono ancora scaricare il vecchio file
+        keep_files = {matches_file, previous_manifest.get('matches', {}).get('file')}
+        remove_stale_artifacts(keep_files, 'matches.*.json')
+
+        print(f"   📦 Artefatto JSON: {matches_file} ({os.path.getsize(matches_file):,} bytes)")
+        print(f"   📦 Shard: {len(manifest['shards']['teams'])} categorie, "
+              f"{len(manifest['shards']['leagues'])} campionati")
+        return True
+
+    except Exception as e:
+        print(f"⚠️  Errore nell'esportazione degli artefatti JSON: {e}")
+        return False
+
+def write_if_changed(path, content):
+    """
+    Scrive un file di testo solo se il contenuto è cambiato
+
+    Returns:
+        True se il file è stato (ri)scritto
+    """
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            if f.read() == content:
+                return False
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    return True
+
+def get_changes_path():
+    """Percorso del registro JSONL delle variazioni (output.changesFile di config.json)"""
+    return Path(config['output'].get('changesFile', DEFAULT_CHANGES_FILE))
+
+def append_change_events(events, path=None):
+    """
+    Aggiunge gli eventi in coda al registro JSONL delle variazioni
+
+    Ogni evento riceve un numero progressivo 'seq' (continua dall'ultima riga
+    del file), così chi lo legge può ripartire dall'ultimo evento elaborato.
+
+    Returns:
+        Numero di eventi scritti
+    """
+    path = Path(path or get_changes_path())
+    if not events:
+        return 0
+
+    last_seq = 0
+    if path.exists():
+        with open(path, 'rb') as f:
+            lines = f.read().splitlines()
+        for line in reversed(lines):
+            if line.strip():
+                last_seq = json.loads(line).get('seq', 0)
+                break
+
+    with open(path, 'a', encoding='utf-8') as f:
+        for seq, event in enumerate(events, last_seq + 1):
+            f.write(json.dumps({'seq': seq, **event}, ensure_ascii=False) + '\n')
+    return len(events)
+
+def write_change_log(events):
+    """Scrive le variazioni dell'esecuzione nel registro e ne espone il numero al workflow"""
+    try:
+        written = append_change_events(events)
+        if written:
+            print(f"\n📝 {written} variazioni aggiunte a {get_changes_path()}")
+    except Exception as e:
+        written = 0
+        print(f"⚠️  Impossibile aggiornare il registro delle variazioni: {e}")
+    write_github_output('change_events', written)
+
+def write_github_output(name, value):
+    """Espone un valore agli step successivi del workflow GitHub Actions"""
+    output_path = os.environ.get('GITHUB_OUTPUT')
+    if output_path:
+        with open(output_path, 'a', encoding='utf-8') as f:
+            f.write(f"{name}={value}\n")
+
+def find_standings_table(html):
+    """
+    Individua nella pagina solo la tabella della classifica
+
+    Cerca, tra le tabelle non annidate, quella la cui intestazione contiene
+    "squadra" e "punti" e converte in DataFrame solo quella.
+
+    Returns:
+        DataFrame della classifica, oppure None se non trovata
+    """
+    document = lxml.html.fromstring(html)
+    for table in document.xpath('//table[not(.//table)]'):
+        header_row = table.xpath('(.//tr)[1]')
+        if not header_row:
+            continue
+        header = header_row[0].text_content().lower()
+        if 'squadra' in header and 'punti' in header:
+            table_html = lxml.html.tostring(table, encoding='unicode')
+            return pd.read_html(StringIO(table_html), flavor='lxml')[0]
+    return None
+
+def fetch_standings(league_name, url, timeout=30):
+    """
+    Scarica e analizza la classifica di un campionato
+
+    Returns:
+        Lista di dizionari (una riga per squadra), oppure None in caso di errore
+    """
+    started = time.monotonic()
+    try:
+        headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+            'Accept-Language': 'it-IT,it;q=0.9,en-US;q=0.8,en;q=0.7'
+        }
+        response = get_http_session().get(url, headers=headers, timeout=timeout)
+        response.raise_for_status()
+        downloaded = time.monotonic()
+
+        classifica_df = find_standings_table(response.text)
+
+        if classifica_df is None:
+            # Nessuna tabella riconosciuta: usa la prima tabella della pagina
+            dfs = pd.read_html(StringIO(response.text))
+            if not dfs:
+                print(f"    ❌ {league_name}: nessuna tabella trovata")
+                return None
+            classifica_df = dfs[0]
+
+        # Pulisci i dati
+        classifica_df = classifica_df.dropna(axis=1, how='all')
+
+        # Converti in lista di dizionari
+        records = classifica_df.to_dict('records')
+        finished = time.monotonic()
+        print(f"    ✅ {league_name}: {len(records)} squadre "
+              f"(download {downloaded - started:.2f}s, parsing {finished - downloaded:.2f}s)")
+        return records
+
+    except Exception as e:
+        print(f"    ❌ {league_name}: errore dopo {time.monotonic() - started:.2f}s: {e}")
+        return None
+
+def diff_standings(league_name, old_positions, new_positions, now):
+    """
+    Confronta due classifiche ({squadra: posizione, 1 = prima})
+
+    Returns:
+        Evento 'standings_changed' con le squadre che hanno cambiato posizione
+        (from/to a None per squadre entrate o uscite), oppure None
+    """
+    moves = [{'team': team, 'from': old_positions.get(team), 'to': new_positions.get(team)}
+             for team in dict.fromkeys([*new_positions, *old_positions])
+             if old_positions.get(team) != new_positions.get(team)]
+    if not moves:
+        return None
+    return {'run': now, 'type': 'standings_changed', 'league': league_name, 'moves': moves}
+
+def save_standings(store, league_name, records, events=None):
+    """Sostituisce nell'archivio la classifica di un campionato (e ne registra i cambi di posizione)"""
+    rows = []
+    for position, record in enumerate(records):
+        row = {str(k): to_json_value(v) for k, v in record.items()}
+        rows.append((league_name, position, row.get('Squadra'), json.dumps(row, ensure_ascii=False)))
+
+    if events is not None:
+        old_positions = {r['team']: r['position'] + 1 for r in store.execute(
+            'SELECT team, position FROM standings WHERE league = ?', (league_name,))}
+        # Nessun evento alla prima classifica salvata di un campionato
+        if old_positions:
+            event = diff_standings(league_name, old_positions,
+                                   {team: position + 1 for _, position, team, _ in rows},
+                                   datetime.now().isoformat(timespec='seconds'))
+            if event:
+                events.append(event)
+
+    with store:
+        store.execute('DELETE FROM standings WHERE league = ?', (league_name,))
+        store.executemany('INSERT INTO standings (league, position, team, row_json) VALUES (?, ?, ?, ?)', rows)
+
+def load_standings(store, league_names):
+    """Legge dall'archivio le classifiche dei campionati indicati, nell'ordine dato"""
+    standings = {}
+    for league_name in league_names:
+        rows = store.execute('SELECT row_json FROM standings WHERE league = ? ORDER BY position',
+                             (league_name,)).fetchall()
+        if rows:
+            standings[league_name] = [json.loads(r['row_json']) for r in rows]
+    return standings
+
+def update_classifica(store, events=None):
+    """
+    Scarica le classifiche, le salva nell'archivio ed esporta classifica.json
+
+    Se un campionato non si scarica resta l'ultima classifica nota. I cambi di
+    posizione vengono aggiunti a events.
+
+    Returns:
+        True se classifica.json è stato modificato
+    """
     print(f"\n🏆 Aggiornamento classifiche...")
     
-    all_standings = {}
     leagues = config['leagues']
     standings_file = config['output']['standingsFile']
+    league_names = list(leagues)
+    urls = [leagues[name] for name in league_names]
+    timeout = get_fetch_settings()['timeout']
     
-    for league_name, url in leagues.items():
-        print(f"  ⏳ Scaricamento {league_name}...")
-        try:
-            # Leggi le tabelle dalla pagina
-            dfs = pd.read_html(url)
-            
-            if not dfs:
-                print(f"    ❌ Nessuna tabella trovata per {league_name}")
-                continue
-                
-            # La classifica è solitamente la prima tabella o quella con colonne specifiche
-            classifica_df = None
-            for df in dfs:
-                # Normalizza i nomi delle colonne
-                cols = [str(c).lower() for c in df.columns]
-                if any('squadra' in c for c in cols) and any('punti' in c for c in cols):
-                    classifica_df = df
-                    break
-            
-            if classifica_df is None:
-                classifica_df = dfs[0]
-                
-            # Pulisci i dati
-            classifica_df = classifica_df.dropna(axis=1, how='all')
-            
-            # Converti in lista di dizionari
-            records = classifica_df.to_dict('records')
-            all_standings[league_name] = records
-            print(f"    ✅ OK: {len(records)} squadre")
-            
-        except Exception as e:
-            print(f"    ❌ Errore: {e}")
+    def fetch(index, url, deadline):
+        remaining = max(deadline - time.monotonic(), 0.1)
+        return fetch_standings(league_names[index], url, timeout=min(timeout, remaining))
+    
+    # Scarica le classifiche in parallelo
+    results = run_concurrently(urls, fetch, label="Classifiche")
+    
+    for league_name, records in zip(league_names, results):
+        if records is not None:
+            save_standings(store, league_name, records, events)
+    
+    # Esporta nell'ordine dei campionati di config.json
+    all_standings = load_standings(store, league_names)
     
     try:
-        # Salva in JSON
-        with open(standings_file, 'w', encoding='utf-8') as f:
-            json.dump(all_standings, f, ensure_ascii=False, indent=2)
+        # Salva in JSON (solo se qualcosa è cambiato)
+        content = json.dumps(all_standings, ensure_ascii=False, indent=2)
+        if not write_if_changed(standings_file, content):
+            print(f"\nℹ️  Classifiche invariate: {standings_file} non riscritto")
+            return False
             
         print(f"\n✅ Tutte le classifiche salvate in: {standings_file}")
         print(f"   📊 Campionati: {len(all_standings)}")
@@ -339,12 +1443,16 @@ def main():
     output_file = config['output']['matchesFile']
     temp_files = [f'Gare_temp_{i+1}.xls' for i in range(len(urls))]
     
-    # Download dei file
-    success_count = 0
-    for i, url in enumerate(urls):
-        print(f"\n[{i+1}/{len(urls)}] Download file...")
-        if download_excel(url, temp_files[i]):
-            success_count += 1
+    # Pulisci eventuali file temporanei di esecuzioni precedenti
+    cleanup_temp_files(temp_files)
+    
+    # Stato dei download precedenti (richieste condizionali e confronto hash)
+    force_update = '--force' in sys.argv or os.environ.get('FORCE_UPDATE', '').lower() == 'true'
+    fetch_state = load_fetch_state()
+    
+    # Download dei file (in parallelo)
+    results, downloads = download_all(urls, temp_files, fetch_state)
+    success_count = sum(1 for status in results if status != FETCH_FAILED)
     
     if success_count == 0:
         print("\n❌ Nessun file scaricato con successo!")
@@ -353,32 +1461,55 @@ def main():
     
     print(f"\n✓ Scaricati {success_count}/{len(urls)} file")
     
-    # Unione dei file
-    if merge_excel_files(temp_files, output_file):
-        print(f"\n🎉 Aggiornamento partite completato con successo!")
-        print(f"   File pronto: {output_file}")
+    store = open_match_store()
+    events = []
+    try:
+        # Importa solo le sorgenti cambiate (o non ancora presenti nell'archivio)
+        files_by_source = {
+            url: file for url, file, status in zip(urls, temp_files, results)
+            if status == FETCH_CHANGED
+            or (status == FETCH_UNCHANGED and (force_update or not store_has_source(store, url)))
+        }
+        failed_sources = []
+        changes = import_match_files(store, files_by_source, urls, events, failed_sources)
+        if changes is None:
+            print("\n❌ Errore durante l'aggiornamento dell'archivio gare")
+            return 1
         
-        # Backup del file precedente
-        if os.path.exists(output_file):
-            backup_name = f"Gare_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xls"
-            try:
-                import shutil
-                # Non fare backup se è appena stato creato
-                if os.path.exists(f"{output_file}.old"):
-                    shutil.copy2(f"{output_file}.old", backup_name)
-                    print(f"   💾 Backup creato: {backup_name}")
-            except:
-                pass
-    else:
-        print("\n❌ Errore durante l'unione dei file")
-        return 1
-    
-    # Aggiornamento classifica
-    update_classifica()
+        # Gare.xls e gli artefatti si riesportano solo se l'archivio è cambiato
+        matches_changed = (changes > 0 or force_update or not os.path.exists(output_file)
+                           or not get_manifest_path().exists())
+        if not matches_changed:
+            print(f"\nℹ️  Nessuna gara modificata: esportazione di {output_file} saltata")
+        elif export_matches_file(store, output_file):
+            print(f"\n🎉 Aggiornamento partite completato con successo!")
+            print(f"   File pronto: {output_file} ({changes} gare cambiate)")
+        else:
+            print("\n❌ Errore durante l'esportazione delle gare")
+            return 1
+        
+        # Lo stato si salva solo dopo un aggiornamento riuscito dell'archivio, e
+        # solo per le sorgenti importate: chi non si è letto tiene lo stato
+        # precedente, così alla prossima esecuzione risulta ancora cambiato
+        accepted = {url: entry for url, entry in downloads.items() if url not in failed_sources}
+        commit_fetch_state(fetch_state, accepted, dict(zip(urls, temp_files)))
+        save_fetch_state(fetch_state, urls)
+        
+        # Aggiornamento classifica
+        standings_changed = update_classifica(store, events)
+    finally:
+        store.close()
+        # Registro delle variazioni (anche se l'esportazione fallisce: l'archivio è già aggiornato)
+        write_change_log(events)
     
     # Pulizia file temporanei
     cleanup_temp_files(temp_files)
     
+    data_changed = matches_changed or standings_changed
+    write_github_output('data_changed', str(data_changed).lower())
+    if not data_changed:
+        print("\nℹ️  Nessun dato modificato: commit e re-indicizzazione non necessari")
+    
     print("\n" + "=" * 60)
     return 0
 
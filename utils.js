@@ -118,3 +118,72 @@ export function memoize(func) {
 export function deepEqual(obj1, obj2) {
     return JSON.stringify(obj1) === JSON.stringify(obj2);
 }
+
+/**
+ * Decode the columnar match artifact written by update_gare.py into row objects
+ * shaped like XLSX.utils.sheet_to_json output (empty cells are omitted)
+ * @param {Object} artifact - Parsed data/matches.<hash>.json
+ * @param {boolean} withDerived - Also attach DataISO, SetCasa, SetOspite and Set
+ * @returns {Array} Array of match objects
+ */
+export function decodeMatchArtifact(artifact, withDerived = false) {
+    const { count, columns, data, dictionaries, encoded, derived } = artifact;
+    const rows = new Array(count);
+
+    for (let i = 0; i < count; i++) {
+        const row = {};
+        for (const column of columns) {
+            let value = data[column][i];
+            if (value === null || value === undefined) continue;
+            if (encoded[column]) value = dictionaries[encoded[column]][value];
+            row[column] = value;
+        }
+        if (withDerived && derived) {
+            if (derived.date && derived.date[i]) row.DataISO = derived.date[i];
+            if (derived.homeSets && derived.homeSets[i] !== null) row.SetCasa = derived.homeSets[i];
+            if (derived.awaySets && derived.awaySets[i] !== null) row.SetOspite = derived.awaySets[i];
+            if (derived.setScores && derived.setScores[i]) row.Set = derived.setScores[i];
+        }
+        rows[i] = row;
+    }
+
+    return rows;
+}
+
+/**
+ * Load the data manifest written by update_gare.py (always revalidated)
+ * @returns {Promise<Object|null>} Manifest, or null when not available
+ */
+export async function loadMatchManifest() {
+    const response = await fetch('data/manifest.json', { cache: 'no-cache' });
+    return response.ok ? response.json() : null;
+}
+
+/**
+ * Load all matches, preferring the pre-parsed JSON artifact over Gare.xls
+ * Falls back to SheetJS parsing when the artifact is not available
+ * @param {Object} options - { withDerived: boolean }
+ * @returns {Promise<Array>} Array of match objects
+ */
+export async function loadMatchRows({ withDerived = false } = {}) {
+    try {
+        const manifest = await loadMatchManifest();
+        if (manifest) {
+            const response = await fetch(manifest.matches.file);
+            if (response.ok) {
+                return decodeMatchArtifact(await response.json(), withDerived);
+            }
+        }
+    } catch (error) {
+        console.warn('Match artifact not available, falling back to Gare.xls:', error.message);
+    }
+
+    const response = await fetch('Gare.xls');
+    if (!response.ok) {
+        throw new Error(`HTTP error! status: ${response.status}`);
+    }
+    const arrayBuffer = await response.arrayBuffer();
+    const workbook = XLSX.read(arrayBuffer, { type: 'array' });
+    const firstSheet = workbook.Sheets[workbook.SheetNames[0]];
+    return XLSX.utils.sheet_to_json(firstSheet);
+}